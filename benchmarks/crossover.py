@@ -0,0 +1,140 @@
+"""Compares mutation-only evolution with evolution using crossover operators.
+
+For every variant the benchmark records the best fitness of each generation and
+reports how many generations and how much wall time it took to reach the final
+fitness of the mutation-only run.
+
+Example:
+    python -m benchmarks.crossover --scale 10 --generations 100
+"""
+
+from __future__ import annotations
+
+import time
+from argparse import ArgumentParser, Namespace
+
+import yaml
+
+from src.crossover import DayCrossover, GroupBlockCrossover
+from src.fitness import WeightedFitness
+from src.genetic import GeneticSchedule
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.schedule import Schedule
+from src.selection import TournamentSelector
+from src.types import Group, Hall, Lecturer, Subject, TimeSlot
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser()
+
+    parser.add_argument("-c", "--config", type=str, default="assets/config.yaml")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=10,
+        help="Number of copies of every group, lecturer and hall of the config.",
+    )
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args()
+
+
+def load_scaled_parameters(config: str, scale: int) -> Parameters:
+    """Loads a config and replicates its groups, lecturers and halls `scale`
+    times. Subjects and time slots are shared by the copies."""
+    with open(config, "r") as file:
+        data = yaml.safe_load(file)
+
+    def copies(entities: list[dict]) -> list[dict]:
+        return [
+            {**entity, "name": f"{entity['name']} #{copy}"}
+            for copy in range(scale)
+            for entity in entities
+        ]
+
+    return Parameters(
+        [TimeSlot(**time_slot) for time_slot in data["time_slots"]],
+        [Subject(**subject) for subject in data["subjects"]],
+        [Group(**group) for group in copies(data["groups"])],
+        [Lecturer(**lecturer) for lecturer in copies(data["lecturers"])],
+        [Hall(**hall) for hall in copies(data["halls"])],
+    )
+
+
+def run(
+    parameters: Parameters, evolution_params: EvolutionParameters, seed: int
+) -> tuple[list[float], list[float]]:
+    """Runs one evolution, returns the best fitness and the elapsed wall time
+    after every generation."""
+    best_fitness = []
+    elapsed = []
+    start = time.perf_counter()
+
+    def record(
+        generation: int, population: list[Schedule], fitness_scores: list[float]
+    ) -> tuple[list[Schedule], list[float]]:
+        best_fitness.append(max(fitness_scores))
+        elapsed.append(time.perf_counter() - start)
+        return population, fitness_scores
+
+    GeneticSchedule(parameters, rng=RandomStream(seed)).evolve(
+        evolution_params, migrate=record
+    )
+
+    return best_fitness, elapsed
+
+
+def main(config: str, scale: int, generations: int, population: int, seed: int) -> None:
+    parameters = load_scaled_parameters(config, scale)
+    base_params = EvolutionParameters(
+        population_size=population,
+        num_of_generations=generations,
+        mut_prob=0.1,
+        hall_prob=0.2,
+        lecturer_prob=0.2,
+        time_slot_prob=0.2,
+        fitness_func=WeightedFitness(10, 7, 5, 20),
+        selector_func=TournamentSelector(),
+        verbose=False,
+    )
+
+    variants = {
+        "mutation only": base_params,
+        "group block crossover": EvolutionParameters(
+            **{**vars(base_params), "crossover_func": GroupBlockCrossover()}
+        ),
+        "day crossover": EvolutionParameters(
+            **{**vars(base_params), "crossover_func": DayCrossover()}
+        ),
+    }
+
+    results = {
+        name: run(parameters, evolution_params, seed)
+        for name, evolution_params in variants.items()
+    }
+    target = results["mutation only"][0][-1]
+
+    print(f"Target fitness (final mutation-only fitness): {target:.3f}")
+    print(
+        f"{'variant':<24}{'final':>10}{'gens to target':>16}"
+        f"{'time to target':>16}{'total time':>12}"
+    )
+    for name, (best_fitness, elapsed) in results.items():
+        reached = next(
+            (gen for gen, fitness in enumerate(best_fitness) if fitness >= target),
+            None,
+        )
+        gens_to_target = "-" if reached is None else str(reached + 1)
+        time_to_target = "-" if reached is None else f"{elapsed[reached]:.2f}s"
+        print(
+            f"{name:<24}{best_fitness[-1]:>10.3f}{gens_to_target:>16}"
+            f"{time_to_target:>16}{elapsed[-1]:>11.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    main(**dict(args._get_kwargs()))
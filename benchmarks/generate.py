@@ -0,0 +1,190 @@
+"""Generates synthetic configs in the schema read by `GeneticSchedule.from_yaml`.
+
+The size is set by the number of groups; halls and lecturers are scaled so that
+`tightness` is the share of every group's week, and of the hall and lecturer
+time, that the lessons occupy.
+
+Example:
+    python -m benchmarks.generate --groups 200 --tightness 0.7 -o big.yaml
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from argparse import ArgumentParser, Namespace
+
+import yaml
+
+WEEKDAYS = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser()
+
+    parser.add_argument("-o", "--output", type=str, default="synthetic.yaml")
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--subjects", type=int, default=None)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--slots-per-day", type=int, default=6)
+    parser.add_argument(
+        "--tightness",
+        type=float,
+        default=0.7,
+        help="Share of the week occupied by lessons, between 0 and 1.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args()
+
+
+def generate_config(
+    groups: int,
+    subjects: int | None = None,
+    days: int = 5,
+    slots_per_day: int = 6,
+    tightness: float = 0.7,
+    seed: int = 0,
+) -> dict:
+    """Generates a random but reproducible config.
+
+    Parameters
+    ----------
+    groups : int
+        Number of groups.
+    subjects : int, optional
+        Number of subjects, `groups // 2 + 5` by default.
+    days : int, default=5
+        Number of days, at most 7.
+    slots_per_day : int, default=6
+    tightness : float, default=0.7
+        Share of every group's week occupied by its lessons. The numbers of
+        halls and lecturers are chosen so that they are occupied to the same
+        extent.
+    seed : int, default=0
+
+    Returns
+    -------
+    dict
+        Config with `time_slots`, `subjects`, `groups`, `lecturers` and `halls`.
+    """
+    if not 0 < tightness <= 1:
+        raise ValueError("Tightness must be in (0, 1].")
+    if not 0 < days <= len(WEEKDAYS):
+        raise ValueError(f"Number of days must be between 1 and {len(WEEKDAYS)}.")
+
+    rng = random.Random(seed)
+    num_time_slots = days * slots_per_day
+    num_subjects = subjects or groups // 2 + 5
+    weekly_load = max(1, round(tightness * num_time_slots))
+
+    time_slots = [
+        {"day": f"{day + 1}. {WEEKDAYS[day]}", "time": time + 1}
+        for day in range(days)
+        for time in range(slots_per_day)
+    ]
+    subject_data = [
+        {"name": f"Subject {subject:03d}", "hours": rng.randint(1, 4)}
+        for subject in range(num_subjects)
+    ]
+
+    # Every group takes subjects until its week is as full as requested.
+    group_data = []
+    demand = [0] * num_subjects
+    for group in range(groups):
+        load = 0
+        chosen = []
+        for subject in rng.sample(range(num_subjects), num_subjects):
+            hours = subject_data[subject]["hours"]
+            if load + hours <= weekly_load:
+                chosen.append(subject)
+                demand[subject] += hours
+                load += hours
+            if load == weekly_load:
+                break
+
+        group_data.append(
+            {
+                "name": f"G-{group:03d}",
+                "capacity": rng.randint(10, 35),
+                "subject_names": [subject_data[s]["name"] for s in chosen],
+            }
+        )
+
+    # Enough lecturers for every subject to be taught with the requested
+    # tightness, some of them can teach a few more subjects.
+    available_hours = tightness * num_time_slots
+    lecturer_data = []
+    for subject, hours in enumerate(demand):
+        for _ in range(math.ceil(hours / available_hours)):
+            extra = rng.sample(range(num_subjects), rng.randint(0, 2))
+            lecturer_data.append(
+                {
+                    "name": f"Lecturer {len(lecturer_data):03d}",
+                    "can_teach_subjects_names": [
+                        subject_data[s]["name"]
+                        for s in dict.fromkeys([subject, *extra])
+                    ],
+                }
+            )
+
+    total_lessons = sum(demand)
+    hall_data = [
+        {"name": f"Hall {hall:03d}", "capacity": rng.randint(10, 45)}
+        for hall in range(max(1, math.ceil(total_lessons / available_hours)))
+    ]
+
+    return {
+        "time_slots": time_slots,
+        "subjects": subject_data,
+        "groups": group_data,
+        "lecturers": lecturer_data,
+        "halls": hall_data,
+    }
+
+
+def main(
+    output: str,
+    groups: int,
+    subjects: int | None,
+    days: int,
+    slots_per_day: int,
+    tightness: float,
+    seed: int,
+) -> None:
+    config = generate_config(
+        groups=groups,
+        subjects=subjects,
+        days=days,
+        slots_per_day=slots_per_day,
+        tightness=tightness,
+        seed=seed,
+    )
+
+    with open(output, "w") as file:
+        yaml.safe_dump(config, file, sort_keys=False)
+
+    lessons = sum(
+        subject["hours"]
+        for group in config["groups"]
+        for subject in config["subjects"]
+        if subject["name"] in group["subject_names"]
+    )
+    print(
+        f"Written {output}: {len(config['groups'])} groups,"
+        f" {len(config['lecturers'])} lecturers, {len(config['halls'])} halls,"
+        f" {lessons} lessons."
+    )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    main(**dict(args._get_kwargs()))
@@ -0,0 +1,165 @@
+"""Measures the speedup of mutating and scoring the population in worker processes.
+
+Every variant evolves the same population for the same generations with the
+same seeds, so they do the same work and give the same population. The report
+shows the wall time per generation, the cost per individual and the speedup
+over the serial path, and what shipping one individual costs: as a genome that
+the worker indexes again, or with its index, see `Schedule.to_state`.
+
+Example:
+    python -m benchmarks.parallel --groups 100 --workers 2 4 8
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import pickle
+import time
+from argparse import ArgumentParser, Namespace
+
+import yaml
+
+from benchmarks.generate import generate_config
+from benchmarks.suite import measure
+from src.config import parse_config
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
+from src.parallel import PopulationExecutor, construct_population
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.schedule import Schedule
+from src.selection import FittestSelector
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser()
+
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--tightness", type=float, default=0.7)
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[2, 4],
+        help="Pool sizes compared with the serial path.",
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args()
+
+
+def run(
+    parameters: Parameters,
+    evolution_params: EvolutionParameters,
+    population: list[Schedule],
+    generations: int,
+    seed: int,
+) -> tuple[float, list[bytes]]:
+    """Mutates and scores copies of `population` every generation.
+
+    Returns
+    -------
+    tuple[float, list[bytes]]
+        Wall time per generation, without starting the pool, and the genomes
+        of the last population.
+    """
+    rng = RandomStream(seed)
+    population = [individual.clone() for individual in population]
+
+    with PopulationExecutor(parameters, evolution_params) as executor:
+        # Start the workers before timing, like a long run amortizes it.
+        executor.mutate_and_score(
+            [individual.clone() for individual in population],
+            rng.seeds(len(population)),
+        )
+
+        start = time.perf_counter()
+        for _ in range(generations):
+            population, _ = executor.mutate_and_score(
+                population, rng.seeds(len(population))
+            )
+        seconds = (time.perf_counter() - start) / generations
+
+    return seconds, [individual.to_genome() for individual in population]
+
+
+def shipping_costs(
+    parameters: Parameters, schedule: Schedule, repeat: int
+) -> dict[str, float]:
+    """Seconds a round trip of one individual costs the two processes,
+    pickling included."""
+
+    def genome_round_trip() -> None:
+        genome = pickle.loads(pickle.dumps(schedule.to_genome()))
+        Schedule.from_genome(parameters, genome).build_index()
+
+    def state_round_trip() -> None:
+        state = pickle.loads(pickle.dumps(schedule.to_state()))
+        Schedule.from_state(parameters, state)
+
+    return {
+        "genome": measure(genome_round_trip, repeat)["median"],
+        "state": measure(state_round_trip, repeat)["median"],
+    }
+
+
+def main(
+    groups: int,
+    tightness: float,
+    population: int,
+    generations: int,
+    workers: list[int],
+    repeat: int,
+    seed: int,
+) -> None:
+    config = generate_config(groups=groups, tightness=tightness, seed=seed)
+    parameters = parse_config(yaml.safe_dump(config).encode())
+    initial = construct_population(parameters, RandomStream(seed).seeds(population))
+    evolution_params = EvolutionParameters(
+        population_size=population,
+        num_of_generations=generations,
+        mut_prob=0.1,
+        hall_prob=0.2,
+        lecturer_prob=0.2,
+        time_slot_prob=0.2,
+        fitness_func=WeightedFitness(**DEFAULT_WEIGHTS),
+        selector_func=FittestSelector(),
+        verbose=False,
+    )
+
+    print(
+        f"{groups} groups, {len(initial[0])} lessons, {population} individuals,"
+        f" {os.cpu_count()} CPUs"
+    )
+    costs = shipping_costs(parameters, initial[0], repeat)
+    print(
+        f"Shipping one individual: {costs['genome'] * 1e3:.2f} ms as a genome,"
+        f" {costs['state'] * 1e3:.2f} ms with its index"
+    )
+
+    serial, expected = run(parameters, evolution_params, initial, generations, seed)
+    print(f"{'workers':>8}{'ms/generation':>16}{'ms/individual':>16}{'speedup':>10}")
+    print(f"{1:>8}{serial * 1e3:>16.1f}{serial / population * 1e3:>16.3f}{1.0:>10.2f}")
+
+    for num_workers in workers:
+        seconds, genomes = run(
+            parameters,
+            dataclasses.replace(evolution_params, num_workers=num_workers),
+            initial,
+            generations,
+            seed,
+        )
+        if genomes != expected:
+            raise RuntimeError(f"{num_workers} workers gave another population.")
+        print(
+            f"{num_workers:>8}{seconds * 1e3:>16.1f}"
+            f"{seconds / population * 1e3:>16.3f}{serial / seconds:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    main(**dict(args._get_kwargs()))
@@ -0,0 +1,299 @@
+"""Times the main operations of the engine on synthetic configs of growing size.
+
+Every timing is repeated and summarized by its median and minimum. Results are
+written as JSON, a previous result file can be passed as a baseline to flag
+regressions.
+
+Example:
+    python -m benchmarks.suite --scales 10 50 200 -o results.json
+    python -m benchmarks.suite --scales 10 50 200 --baseline results.json
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Callable
+
+import yaml
+
+from benchmarks.generate import generate_config
+from src import batch
+from src.fitness import WeightedFitness, evaluate_population
+from src.genetic import GeneticSchedule
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.schedule import Schedule
+from src.selection import SELECTORS, FittestSelector
+
+COUNT_FUNCTIONS = (
+    "count_total_windows",
+    "count_total_lecturer_windows",
+    "count_total_non_profile_slots",
+    "count_capacity_overflows",
+    "count_time_slot_lessons",
+    "count_conflicts",
+)
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser()
+
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[10, 50, 200],
+        help="Numbers of groups of the generated configs.",
+    )
+    parser.add_argument("--tightness", type=float, default=0.7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--population", type=int, default=20)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=str, default="benchmark.json")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Earlier result file to compare against.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown of a median reported as a regression.",
+    )
+
+    return parser.parse_args()
+
+
+def load_parameters(config: dict) -> Parameters:
+    """Goes through `GeneticSchedule.from_yaml`, so the generated config is
+    checked against the real loader."""
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "config.yaml")
+        with open(file_path, "w") as file:
+            yaml.safe_dump(config, file)
+
+        return GeneticSchedule.from_yaml(file_path).parameters
+
+
+def measure(
+    function: Callable[[], object],
+    repeat: int,
+    setup: Callable[[], object] | None = None,
+    number: int = 1,
+) -> dict:
+    """Times `function` `repeat` times, `setup` runs untimed before each call and
+    its result is passed to `function`. Very fast functions are called `number`
+    times per repetition and the time of one call is reported."""
+    timings = []
+    for _ in range(repeat):
+        if setup is None:
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+        else:
+            argument = setup()
+            start = time.perf_counter()
+            function(argument)
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "repeat": repeat,
+    }
+
+
+def run_scale(
+    parameters: Parameters,
+    population_size: int,
+    generations: int,
+    repeat: int,
+    seed: int,
+) -> dict[str, dict]:
+    """Times every benchmarked operation on one config."""
+    rng = RandomStream(seed)
+    fitness_func = WeightedFitness(10, 7, 5, 20)
+    evolution_params = EvolutionParameters(
+        population_size=population_size,
+        num_of_generations=generations,
+        mut_prob=0.1,
+        hall_prob=0.2,
+        lecturer_prob=0.2,
+        time_slot_prob=0.2,
+        fitness_func=fitness_func,
+        selector_func=FittestSelector(),
+        verbose=False,
+    )
+    timings = {}
+
+    # Lessons that do not fit are reported on stdout, keep the output clean.
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings["create_basic_schedule"] = measure(
+            lambda: Schedule.create_basic_schedule(parameters, rng), repeat
+        )
+        timings["create_constructive_schedule"] = measure(
+            lambda: Schedule.create_constructive_schedule(parameters, rng), repeat
+        )
+        schedule = Schedule.create_basic_schedule(parameters, rng)
+        population = [
+            Schedule.create_basic_schedule(parameters, rng)
+            for _ in range(population_size)
+        ]
+
+    genome = schedule.to_genome()
+    timings["build_index"] = measure(
+        lambda restored: restored.build_index(),
+        repeat,
+        setup=lambda: Schedule.from_genome(parameters, genome),
+    )
+    timings["mutate"] = measure(
+        lambda individual: individual.mutate(evolution_params, rng),
+        repeat,
+        setup=schedule.clone,
+    )
+    for name in COUNT_FUNCTIONS:
+        timings[name] = measure(getattr(schedule, name), repeat, number=1000)
+
+    timings["fitness"] = measure(lambda: fitness_func(schedule), repeat, number=1000)
+    if batch.is_available():
+        genomes = [individual.to_genome() for individual in population]
+        timings["population_penalties"] = measure(
+            lambda restored: evaluate_population(fitness_func, restored),
+            repeat,
+            setup=lambda: [Schedule.from_genome(parameters, g) for g in genomes],
+        )
+
+    scores = [fitness_func(individual) for individual in population]
+    for name, selector in SELECTORS.items():
+        timings[f"{name}_selector"] = measure(
+            lambda selector=selector(): selector(population, scores, rng), repeat
+        )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings["evolve"] = measure(
+            lambda: GeneticSchedule(parameters, rng=rng).evolve(evolution_params),
+            max(1, repeat // 2),
+        )
+
+    return timings
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lists timings whose median got slower than the baseline by more than
+    `tolerance`."""
+    baseline_scales = {entry["groups"]: entry for entry in baseline["results"]}
+    regressions = []
+
+    for entry in results["results"]:
+        previous = baseline_scales.get(entry["groups"])
+        if previous is None:
+            continue
+
+        for name, timing in entry["timings"].items():
+            before = previous["timings"].get(name)
+            if before is None or not before["median"]:
+                continue
+
+            ratio = timing["median"] / before["median"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{entry['groups']} groups, {name}: {before['median']:.6f}s"
+                    f" -> {timing['median']:.6f}s ({ratio:.2f}x)"
+                )
+
+    return regressions
+
+
+def main(
+    scales: list[int],
+    tightness: float,
+    repeat: int,
+    population: int,
+    generations: int,
+    seed: int,
+    output: str,
+    baseline: str | None,
+    tolerance: float,
+) -> None:
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": batch.is_available(),
+            "tightness": tightness,
+            "repeat": repeat,
+            "population": population,
+            "generations": generations,
+            "seed": seed,
+        },
+        "results": [],
+    }
+
+    for groups in scales:
+        parameters = load_parameters(
+            generate_config(groups=groups, tightness=tightness, seed=seed)
+        )
+        timings = run_scale(parameters, population, generations, repeat, seed)
+        hours = {subject.name: subject.hours for subject in parameters.subjects}
+        results["results"].append(
+            {
+                "groups": groups,
+                "lecturers": len(parameters.lecturers),
+                "halls": len(parameters.halls),
+                "time_slots": len(parameters.time_slots),
+                "lessons": sum(
+                    hours[name]
+                    for group in parameters.groups
+                    for name in group.subject_names
+                ),
+                "timings": timings,
+            }
+        )
+
+        print(f"{groups} groups:")
+        for name, timing in timings.items():
+            print(f"  {name:<32}{timing['median'] * 1e6:>14.1f} us")
+
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output}.")
+
+    if baseline is not None:
+        with open(baseline, "r") as file:
+            regressions = compare(results, json.load(file), tolerance)
+
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    main(**dict(args._get_kwargs()))
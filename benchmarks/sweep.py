@@ -0,0 +1,168 @@
+"""Tunes the evolution parameters and fitness weights with a parallel sweep.
+
+Trials come from a grid or random search space, run in a process pool that
+parses the config once and stop early by successive halving: every trial gets
+`--min-generations`, only the best third (see `--eta`) continues with three
+times more, until the survivors reach `--generations`. Trials are compared by
+the objective weights of the space, the default command line weights unless
+given. Every trial at every budget becomes one row of the CSV table.
+
+Example search space:
+    search: random
+    samples: 27
+    parameters:
+      mut_prob: [0.05, 0.1, 0.2]
+      crossover: [null, group_block, day]
+      time_slot_prob: {low: 0.1, high: 0.6}
+      capacity_overflow_weight: {low: 5, high: 80, log: true}
+
+Example:
+    python -m benchmarks.sweep --space space.yaml -w 4 -o sweep.csv
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser, Namespace
+
+from src.config import load_config
+from src.crossover import CROSSOVERS
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
+from src.parameters import EvolutionParameters
+from src.rng import RandomStream
+from src.selection import SELECTORS
+from src.sweep import (
+    SearchSpace,
+    SuccessiveHalving,
+    TrialResult,
+    run_sweep,
+    write_table,
+)
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser()
+
+    parser.add_argument("-c", "--config", type=str, default="assets/config.yaml")
+    parser.add_argument(
+        "--space", type=str, required=True, help="YAML file of the search space."
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes running trials.",
+    )
+    parser.add_argument(
+        "--generations",
+        type=int,
+        default=50,
+        help="Budget of the trials that survive every rung.",
+    )
+    parser.add_argument(
+        "--min-generations",
+        type=int,
+        default=5,
+        help="Budget of every trial in the first rung.",
+    )
+    parser.add_argument(
+        "--eta",
+        type=int,
+        default=3,
+        help="Only the best 1 / eta trials of a rung are promoted.",
+    )
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument(
+        "--selector", type=str, choices=tuple(SELECTORS), default="fittest"
+    )
+    parser.add_argument(
+        "--crossover",
+        type=str,
+        choices=tuple(CROSSOVERS),
+        default=None,
+        help="Crossover operator of trials that do not sweep `crossover`.",
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=1,
+        help="Number of seeds every trial is averaged over.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=str, default="sweep.csv")
+    parser.add_argument("--top", type=int, default=5, help="Number of trials shown.")
+
+    return parser.parse_args()
+
+
+def report_rung(rung: int, results: list[TrialResult]) -> None:
+    best = max(results, key=lambda result: result.score)
+    seconds = sum(result.seconds for result in results)
+    print(
+        f"Rung {rung + 1}: {len(results)} trials x {results[0].generations}"
+        f" generations in {seconds:.1f}s of work,"
+        f" best {best.score:.3f} (trial {best.trial})"
+    )
+
+
+def main(
+    config: str,
+    space: str,
+    workers: int,
+    generations: int,
+    min_generations: int,
+    eta: int,
+    population: int,
+    selector: str,
+    crossover: str | None,
+    seeds: int,
+    seed: int,
+    output: str,
+    top: int,
+) -> None:
+    parameters = load_config(config)
+    search_space = SearchSpace.from_yaml(space)
+    rng = RandomStream(seed)
+    trials = search_space.trials(rng)
+
+    base = EvolutionParameters(
+        population_size=population,
+        num_of_generations=generations,
+        mut_prob=0.1,
+        hall_prob=0.2,
+        lecturer_prob=0.2,
+        time_slot_prob=0.2,
+        fitness_func=WeightedFitness(**DEFAULT_WEIGHTS),
+        selector_func=SELECTORS[selector](),
+        crossover_func=None if crossover is None else CROSSOVERS[crossover](),
+        verbose=False,
+    )
+
+    results = run_sweep(
+        parameters,
+        base,
+        trials,
+        search_space.objective_fitness(),
+        halving=SuccessiveHalving(generations, min(min_generations, generations), eta),
+        seeds=rng.seeds(seeds),
+        num_workers=workers,
+        on_rung=report_rung,
+    )
+    write_table(results, output)
+
+    final = [result for result in results if result.generations == generations]
+    final.sort(key=lambda result: (-result.score, result.trial))
+    names = list(search_space.parameters)
+    print(f"{'trial':>6}{'score':>12}  " + "  ".join(names))
+    for result in final[:top]:
+        values = "  ".join(
+            f"{value:.4g}" if isinstance(value, float) else str(value)
+            for value in map(result.values.get, names)
+        )
+        print(f"{result.trial:>6}{result.score:>12.3f}  {values}")
+    print(f"{len(results)} results of {len(trials)} trials written to {output}.")
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    main(**dict(args._get_kwargs()))
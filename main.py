@@ -1,14 +1,37 @@
-import copy
+import asyncio
+import dataclasses
+import os
 import random
+import sys
 from argparse import ArgumentParser, Namespace
 from typing import Callable
 
+from src.cache import FitnessCache
+from src.checkpoint import CheckpointError, load_checkpoint
+from src.config import ConfigError, default_cache_dir
+from src.crossover import CROSSOVERS
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
 from src.genetic import GeneticSchedule
+from src.io.export import FORMATS
 from src.io.yaml import save_results
+from src.island import TOPOLOGIES, evolve_islands
+from src.local_search import STRATEGIES, LocalSearch
 from src.parameters import EvolutionParameters
+from src.profiling import Profiler
+from src.rng import RandomStream
 from src.schedule import Schedule
-
-random.seed(0)
+from src.selection import SELECTORS, FittestSelector, TournamentSelector
+from src.service import serve
+from src.telemetry import SINKS, create_sink
+from src.termination import BestSoFar
+from src.validation import validate
+from src.warm_start import (
+    WarmStart,
+    genome_lessons,
+    load_genome,
+    load_result_lessons,
+    save_genome,
+)
 
 
 def parse_arguments() -> Namespace:
@@ -21,13 +44,232 @@ def parse_arguments() -> Namespace:
         default="assets/config.yaml",
         help="Configuration file that contains info about upcoming schedule.",
     )
+    parser.add_argument(
+        "--config-cache",
+        type=str,
+        nargs="?",
+        const=default_cache_dir(),
+        default=None,
+        help=(
+            "Reuse configs parsed by earlier runs from this directory, by default"
+            f" {default_cache_dir()}. It must be private to you, configs are not"
+            " cached without this option."
+        ),
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the run, the result does not depend on the number of workers.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to mutate and score the population.",
+    )
+    parser.add_argument(
+        "--islands",
+        type=int,
+        default=1,
+        help="Number of populations evolved in parallel processes. Checkpoints, "
+        "warm starts, jsonl metrics and profiling need a single one.",
+    )
+    parser.add_argument(
+        "--migration-interval",
+        type=int,
+        default=10,
+        help="Number of generations between migrations of the islands.",
+    )
+    parser.add_argument(
+        "--migration-size",
+        type=int,
+        default=2,
+        help="Number of individuals every island sends to its neighbours.",
+    )
+    parser.add_argument(
+        "--topology",
+        choices=TOPOLOGIES,
+        default="ring",
+        help="Migration topology of the islands.",
+    )
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        default=None,
+        help="Wall time budget of the evolution in seconds.",
+    )
+    parser.add_argument(
+        "--target-fitness",
+        type=float,
+        default=None,
+        help="Stop as soon as a schedule reaches this fitness.",
+    )
+    parser.add_argument(
+        "--stagnation",
+        type=int,
+        default=None,
+        help="Stop after this many generations without improvement.",
+    )
+    parser.add_argument(
+        "--selector",
+        choices=SELECTORS,
+        default="fittest",
+        help="Selection operator, see src.selection.",
+    )
+    parser.add_argument(
+        "--crossover",
+        choices=CROSSOVERS,
+        default=None,
+        help="Crossover operator, see src.crossover. Without it offspring are "
+        "only mutated.",
+    )
+    parser.add_argument(
+        "--crossover-prob",
+        type=float,
+        default=0.8,
+        help="Probability of a pair of selected schedules to be recombined.",
+    )
+    parser.add_argument(
+        "--conflict-weight",
+        type=float,
+        default=DEFAULT_WEIGHTS["conflict_weight"],
+        help="Weight of group, lecturer and hall double bookings in the fitness.",
+    )
+    parser.add_argument(
+        "--local-search-top",
+        type=int,
+        default=0,
+        help="Number of selected schedules improved by local search every "
+        "generation, 0 disables it.",
+    )
+    parser.add_argument(
+        "--local-search-strategy",
+        choices=STRATEGIES,
+        default="first",
+        help="Make the first improving move found or the best move of a lesson.",
+    )
+    parser.add_argument(
+        "--local-search-share",
+        type=float,
+        default=None,
+        help="Share of the wall time local search may take.",
+    )
+    parser.add_argument(
+        "--metrics",
+        choices=SINKS,
+        default="tty",
+        help="Where per-generation statistics go: a status line, a JSON Lines "
+        "file or nowhere.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default="metrics.jsonl",
+        help="Output file of the jsonl metrics.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time the phases of the evolution and print a report at the end.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="File the state of the evolution is periodically saved to, nothing "
+        "is saved without it.",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=10,
+        help="Number of generations between checkpoints, 0 disables them.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the run saved in the checkpoint file, including the "
+        "lessons a warm start may move.",
+    )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--warm-start",
+        type=str,
+        default=None,
+        help="Earlier solution to start from: one of the final_*_schedule.yaml "
+        "files or a saved genome. Only lessons affected by config changes move. "
+        "Ignored with --resume.",
+    )
+    parser.add_argument(
+        "--previous-config",
+        type=str,
+        default=None,
+        help="Config the warm start solution was evolved with, needed for "
+        "genomes. Lessons whose lecturer or hall no longer suits them are only "
+        "moved when it is given.",
+    )
+    parser.add_argument(
+        "--genome",
+        type=str,
+        default=None,
+        help="File the genome of the final schedule is saved to, relative to the "
+        "output directory, e.g. for a later --warm-start. Nothing is saved "
+        "without it.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=str,
+        default=".",
+        help="Directory the final schedules are written to.",
+    )
+    parser.add_argument(
+        "--formats",
+        choices=FORMATS,
+        nargs="+",
+        default=["yaml"],
+        help="Formats of the final schedules.",
+    )
+    parser.add_argument(
+        "--per-entity",
+        action="store_true",
+        help="Write one file per group, lecturer and hall.",
+    )
+    parser.add_argument(
+        "--serve",
+        type=str,
+        default=None,
+        metavar="ADDRESS",
+        help="Run the scheduling service on HOST:PORT or unix:PATH instead of "
+        "one schedule, --workers jobs evolve at the same time.",
+    )
+
+    args = parser.parse_args()
+    if args.islands > 1:
+        # Islands evolve in their own processes, which report nothing but their
+        # fittest schedule.
+        unsupported = [
+            flag
+            for flag, used in (
+                ("--checkpoint", args.checkpoint is not None),
+                ("--resume", args.resume),
+                ("--warm-start", args.warm_start is not None),
+                ("--metrics jsonl", args.metrics == "jsonl"),
+                ("--profile", args.profile),
+            )
+            if used
+        ]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --islands.")
+
+    return args
 
 
 def generate_selection_function(
     elitism_ratio: float = 0.1, tournament_size: int = 3
-) -> Callable[[list[Schedule], Callable], list[Schedule]]:
+) -> Callable[[list[Schedule], list[float], random.Random], list[Schedule]]:
     """Creates a selection function for a population with elitism and tournament
     selection.
 
@@ -40,49 +282,30 @@ def generate_selection_function(
 
     Returns
     -------
-    Callable[[list[Schedule], Callable], list[Schedule]]
-        A function that returns the selected population.
+    Callable[[list[Schedule], list[float], random.Random], list[Schedule]]
+        A function that returns the selected population given the population,
+        its fitness scores and a random stream.
     """
 
-    def selector(population: list[Schedule], fitness_func: Callable) -> list[Schedule]:
-        population.sort(key=fitness_func, reverse=True)
-
-        elitism_count = int(elitism_ratio * len(population))
-        new_population = population[:elitism_count]
-
-        while len(new_population) < len(population):
-            tournament = random.sample(population, tournament_size)
-            tournament.sort(key=fitness_func, reverse=True)
-            new_population.append(copy.deepcopy(tournament[0]))
-
-        return new_population
-
-    return selector
+    return TournamentSelector(
+        elitism_ratio=elitism_ratio, tournament_size=tournament_size
+    )
 
 
-def create_fittest_selector() -> Callable[[list[Schedule], Callable], list[Schedule]]:
+def create_fittest_selector() -> (
+    Callable[[list[Schedule], list[float], random.Random], list[Schedule]]
+):
     """Creates a selection function that selects the fittest individual and replicates
     it to generate the entire new population.
 
     Returns
     -------
-    Callable[[list[Schedule], Callable], list[Schedule]]
+    Callable[[list[Schedule], list[float], random.Random], list[Schedule]]
         A function that returns a new population containing only copies
         of the fittest individual.
     """
 
-    def selector(population: list[Schedule], fitness_func: Callable) -> list[Schedule]:
-        population.sort(key=fitness_func, reverse=True)
-
-        fittest_individual = population[0]
-
-        new_population = [
-            copy.deepcopy(fittest_individual) for _ in range(len(population))
-        ]
-
-        return new_population
-
-    return selector
+    return FittestSelector()
 
 
 def generate_fitness_function(
@@ -91,6 +314,7 @@ def generate_fitness_function(
     non_profile_slot_weight: float,
     capacity_overflow_weight: float,
     distribution_penalty_weight: float = 0,
+    conflict_weight: float = 0,
 ) -> Callable[[Schedule], float]:
     """Generate a function that will calculate the score of a specific
     schedule based on provided weights.
@@ -102,6 +326,7 @@ def generate_fitness_function(
     non_profile_slot_weight : float
     capacity_overflow_weight : float
     distribution_penalty_weight : float, default=0
+    conflict_weight : float, default=0
 
     Returns
     -------
@@ -109,52 +334,65 @@ def generate_fitness_function(
         Score function.
     """
 
-    def fitness(schedule: Schedule) -> float:
-        total_group_windows = schedule.count_total_windows()
-        total_lecturer_windows = schedule.count_total_lecturer_windows()
-        total_non_profile_slots = schedule.count_total_non_profile_slots()
-        total_capacity_overflow = schedule.count_capacity_overflows()
-
-        time_slot_counts = dict.fromkeys(schedule.parameters.time_slots, 0)
-
-        for slot in schedule.grid:
-            time_slot_counts[slot.time_slot] += 1
-
-        lesson_counts = list(time_slot_counts.values())
-        max_count = max(lesson_counts)
-        min_count = min(lesson_counts)
-
-        distribution_penalty = max_count - min_count
-
-        fitness_score = (
-            group_window_weight * total_group_windows
-            + lecturer_window_weight * total_lecturer_windows
-            + non_profile_slot_weight * total_non_profile_slots
-            + capacity_overflow_weight * total_capacity_overflow
-            + distribution_penalty_weight * distribution_penalty
-        ) / (
-            group_window_weight
-            + lecturer_window_weight
-            + non_profile_slot_weight
-            + capacity_overflow_weight
-            + distribution_penalty_weight
-        )
-
-        return -1 * fitness_score
-
-    return fitness
+    return WeightedFitness(
+        group_window_weight=group_window_weight,
+        lecturer_window_weight=lecturer_window_weight,
+        non_profile_slot_weight=non_profile_slot_weight,
+        capacity_overflow_weight=capacity_overflow_weight,
+        distribution_penalty_weight=distribution_penalty_weight,
+        conflict_weight=conflict_weight,
+    )
 
 
-def main(config: str) -> None:
-    genetic_schedule = GeneticSchedule.from_yaml(file_path=config)
-    fitness_func = generate_fitness_function(
-        group_window_weight=10,
-        lecturer_window_weight=7,
-        non_profile_slot_weight=5,
-        capacity_overflow_weight=20,
-        distribution_penalty_weight=0,
+def main(
+    config: str,
+    config_cache: str,
+    seed: int,
+    workers: int,
+    islands: int,
+    migration_interval: int,
+    migration_size: int,
+    topology: str,
+    max_time: float | None,
+    target_fitness: float | None,
+    stagnation: int | None,
+    selector: str,
+    crossover: str | None,
+    crossover_prob: float,
+    conflict_weight: float,
+    local_search_top: int,
+    local_search_strategy: str,
+    local_search_share: float | None,
+    checkpoint: str | None,
+    checkpoint_interval: int,
+    resume: bool,
+    warm_start: str | None,
+    previous_config: str | None,
+    genome: str | None,
+    output_dir: str,
+    formats: list[str],
+    per_entity: bool,
+    metrics: str,
+    metrics_file: str,
+    profile: bool,
+) -> None:
+    if resume and checkpoint is None:
+        raise CheckpointError("--resume needs the --checkpoint file to resume from.")
+
+    rng = RandomStream(seed)
+    genetic_schedule = GeneticSchedule.from_yaml(
+        file_path=config, cache_dir=config_cache or None, rng=rng
     )
-    selector_func = create_fittest_selector()
+    fitness_func = FitnessCache(
+        generate_fitness_function(
+            **{**DEFAULT_WEIGHTS, "conflict_weight": conflict_weight}
+        ),
+        max_size=10000,
+    )
+    selector_func = (
+        create_fittest_selector() if selector == "fittest" else SELECTORS[selector]()
+    )
+    best_so_far = BestSoFar()
 
     evolution_parameters = EvolutionParameters(
         population_size=100,
@@ -162,22 +400,143 @@ def main(config: str) -> None:
         mut_prob=0.1,
         fitness_func=fitness_func,
         selector_func=selector_func,
+        crossover_func=None if crossover is None else CROSSOVERS[crossover](),
+        crossover_prob=crossover_prob,
         hall_prob=0.2,
         lecturer_prob=0.2,
         time_slot_prob=0.2,
+        num_workers=workers,
+        max_wall_time=max_time,
+        target_fitness=target_fitness,
+        stagnation_generations=stagnation,
+        local_search=(
+            LocalSearch(
+                top_k=local_search_top,
+                strategy=local_search_strategy,
+                time_share=local_search_share,
+            )
+            if local_search_top > 0
+            else None
+        ),
+        on_best=best_so_far,
+        checkpoint_path=checkpoint if checkpoint_interval > 0 else None,
+        checkpoint_interval=checkpoint_interval,
+        profiler=Profiler() if profile else None,
     )
 
-    final_schedule = genetic_schedule.evolve(evolution_parameters)
+    initial_population = None
+    warm = None
+    if warm_start is not None and not resume:
+        previous_parameters = None
+        if previous_config is not None:
+            previous_parameters = GeneticSchedule.from_yaml(
+                previous_config, cache_dir=config_cache or None
+            ).parameters
+
+        if warm_start.endswith((".yaml", ".yml")):
+            previous_lessons = load_result_lessons(warm_start)
+        elif previous_parameters is not None:
+            previous_lessons = genome_lessons(
+                previous_parameters, load_genome(warm_start)
+            )
+        else:
+            raise ConfigError("A warm start genome needs --previous-config.")
+
+        warm = WarmStart.build(
+            genetic_schedule.parameters,
+            previous_lessons,
+            rng,
+            previous_parameters=previous_parameters,
+        )
+        print(f"Warm start: {warm}.")
+        evolution_parameters.mutable_lessons = warm.mutable_lessons
+        initial_population = [
+            warm.schedule.clone() for _ in range(evolution_parameters.population_size)
+        ]
 
-    save_results(final_schedule)
+    if islands > 1:
+        try:
+            final_schedule = evolve_islands(
+                genetic_schedule.parameters,
+                [
+                    dataclasses.replace(
+                        evolution_parameters, verbose=False, on_best=None
+                    )
+                    for _ in range(islands)
+                ],
+                migration_interval=migration_interval,
+                migration_size=migration_size,
+                topology=topology,
+                rng=rng,
+            )
+        except KeyboardInterrupt:
+            # The islands only report their fittest schedule once they finish.
+            print("Interrupted islands keep no best schedule, nothing was saved.")
+            raise
+    else:
+        try:
+            with create_sink(metrics, metrics_file) as metrics_sink:
+                final_schedule = genetic_schedule.evolve(
+                    dataclasses.replace(
+                        evolution_parameters, metrics_sink=metrics_sink
+                    ),
+                    checkpoint=(
+                        load_checkpoint(
+                            checkpoint,
+                            genetic_schedule.parameters,
+                            evolution_parameters.population_size,
+                        )
+                        if resume
+                        else None
+                    ),
+                    initial_population=initial_population,
+                )
+        except KeyboardInterrupt:
+            # Keep the best schedule found before the interruption.
+            if best_so_far.schedule is not None:
+                save_results(
+                    best_so_far.schedule, output_dir, tuple(formats), per_entity
+                )
+                print(
+                    "Saved the best schedule of generation"
+                    f" {best_so_far.generation} ({best_so_far.fitness:.2f})."
+                )
+            raise
+        finally:
+            if evolution_parameters.profiler is not None:
+                print(evolution_parameters.profiler.report())
+        print(f"Fitness cache: {fitness_func}")
+
+    if warm is not None:
+        moved = warm.count_moved(final_schedule)
+        print(f"Lessons moved from the earlier solution: {moved}.")
+
+    print(validate(final_schedule).format(final_schedule))
+
+    save_results(final_schedule, output_dir, tuple(formats), per_entity)
+    if genome is not None:
+        save_genome(final_schedule, os.path.join(output_dir, genome))
 
 
 if __name__ == "__main__":
     args = parse_arguments()
+    kwargs = dict(args._get_kwargs())
+    address = kwargs.pop("serve")
+
+    if address is not None:
+        try:
+            asyncio.run(serve(address, num_workers=args.workers))
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+        except KeyboardInterrupt:
+            print("Service had been stopped.")
+        sys.exit()
 
     try:
-        main(**dict(args._get_kwargs()))
+        main(**kwargs)
     except KeyboardInterrupt:
         print("Process had been interrupted by the user.")
+    except (ConfigError, CheckpointError) as e:
+        sys.exit(f"Error: {e}")
     else:
         print("Schedule had been generated.")
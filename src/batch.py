@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from src.parameters import Parameters
+from src.schedule import Schedule
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is an optional speed-up
+    np = None
+
+# Columns of the matrix returned by `population_penalties`.
+PENALTY_COLUMNS = (
+    "group_windows",
+    "lecturer_windows",
+    "non_profile_slots",
+    "capacity_overflow",
+    "distribution_penalty",
+    "conflicts",
+)
+
+
+def is_available() -> bool:
+    """Whether NumPy is installed and population kernels can be used."""
+    return np is not None
+
+
+def can_stack(population: list[Schedule]) -> bool:
+    """Checks whether the population can be stacked into one matrix, i.e. all
+    schedules list the same lessons (groups and subjects) in the same order.
+
+    Parameters
+    ----------
+    population : list[Schedule]
+
+    Returns
+    -------
+    bool
+    """
+    if not population:
+        return False
+
+    first = population[0]
+    return all(
+        schedule.group_ids == first.group_ids
+        and schedule.subject_ids == first.subject_ids
+        for schedule in population
+    )
+
+
+def _stack(population: list[Schedule], attribute: str) -> np.ndarray:
+    data = b"".join(getattr(schedule, attribute).tobytes() for schedule in population)
+    return np.frombuffer(data, dtype=np.intc).reshape(len(population), -1)
+
+
+def _count_windows(
+    parameters: Parameters, owner_ids: np.ndarray, time_slot_ids: np.ndarray
+) -> np.ndarray:
+    """Counts windows of every owner (group or lecturer) for every individual.
+
+    Parameters
+    ----------
+    parameters : Parameters
+    owner_ids : np.ndarray
+        (population x lessons) owner of every lesson.
+    time_slot_ids : np.ndarray
+        (population x lessons) time slot of every lesson.
+
+    Returns
+    -------
+    np.ndarray
+        Total windows of each individual.
+    """
+    num_individuals = len(time_slot_ids)
+    num_owners = int(owner_ids.max(initial=0)) + 1
+    num_time_slots = len(parameters.time_slots)
+
+    # The extra always free time slot pads days with fewer slots below.
+    occupied = np.zeros((num_individuals, num_owners, num_time_slots + 1), bool)
+    occupied[np.arange(num_individuals)[:, None], owner_ids, time_slot_ids] = True
+
+    # Lay the time slots out as (day, position in the day) ordered by time.
+    slots_by_day = [[] for _ in parameters.days]
+    for time_slot_id, day in enumerate(parameters.time_slot_days):
+        slots_by_day[day].append(time_slot_id)
+
+    day_length = max(len(slots) for slots in slots_by_day)
+    day_slots = np.full((len(slots_by_day), day_length), num_time_slots)
+    day_times = np.zeros((len(slots_by_day), day_length), dtype=np.int64)
+    for day, slots in enumerate(slots_by_day):
+        slots.sort(key=parameters.time_slot_times.__getitem__)
+        day_slots[day, : len(slots)] = slots
+        day_times[day, : len(slots)] = [parameters.time_slot_times[s] for s in slots]
+
+    by_day = occupied[:, :, day_slots]
+
+    lesson_counts = by_day.sum(axis=3)
+    big = np.iinfo(np.int64).max // 4
+    first_time = np.where(by_day, day_times, big).min(axis=3)
+    last_time = np.where(by_day, day_times, -big).max(axis=3)
+
+    windows = np.where(lesson_counts > 0, last_time - first_time + 1 - lesson_counts, 0)
+    return windows.sum(axis=(1, 2))
+
+
+def _count_conflicts(
+    owner_ids: np.ndarray, time_slot_ids: np.ndarray, num_time_slots: int
+) -> np.ndarray:
+    """Counts lessons sharing their owner and time slot with another lesson, all
+    but one per occupied (owner, time slot) pair, for every individual."""
+    cells = np.sort(owner_ids * num_time_slots + time_slot_ids, axis=1)
+    return (np.diff(cells, axis=1) == 0).sum(axis=1)
+
+
+def population_penalties(
+    parameters: Parameters, population: list[Schedule]
+) -> np.ndarray:
+    """Calculates all standard penalties of a whole population at once.
+
+    Parameters
+    ----------
+    parameters : Parameters
+        Parameters shared by the population.
+    population : list[Schedule]
+        Schedules accepted by `can_stack`.
+
+    Returns
+    -------
+    np.ndarray
+        (population x 6) matrix, columns are listed in `PENALTY_COLUMNS` and
+        match the corresponding `Schedule.count_*` methods.
+    """
+    group_ids = np.frombuffer(population[0].group_ids.tobytes(), dtype=np.intc)
+    subject_ids = np.frombuffer(population[0].subject_ids.tobytes(), dtype=np.intc)
+    lecturer_ids = _stack(population, "lecturer_ids")
+    hall_ids = _stack(population, "hall_ids")
+    time_slot_ids = _stack(population, "time_slot_ids")
+
+    num_individuals = len(population)
+    num_time_slots = len(parameters.time_slots)
+    penalties = np.zeros((num_individuals, len(PENALTY_COLUMNS)))
+
+    if not len(group_ids):
+        return penalties
+
+    penalties[:, 0] = _count_windows(
+        parameters, np.broadcast_to(group_ids, time_slot_ids.shape), time_slot_ids
+    )
+    penalties[:, 1] = _count_windows(parameters, lecturer_ids, time_slot_ids)
+
+    can_teach = np.zeros((len(parameters.lecturers), len(parameters.subjects)), bool)
+    for lecturer_id, subject_ids_taught in enumerate(parameters.lecturer_subject_ids):
+        can_teach[lecturer_id, list(subject_ids_taught)] = True
+    penalties[:, 2] = (~can_teach[lecturer_ids, subject_ids]).sum(axis=1)
+
+    group_sizes = np.array([group.capacity for group in parameters.groups])
+    hall_capacities = np.array([hall.capacity for hall in parameters.halls])
+    overflow = (
+        np.maximum(group_sizes[:, None] - hall_capacities[None, :], 0)
+        / hall_capacities[None, :]
+    )
+    penalties[:, 3] = overflow[group_ids, hall_ids].sum(axis=1)
+
+    cells = np.arange(num_individuals)[:, None] * num_time_slots + time_slot_ids
+    time_slot_counts = np.bincount(
+        cells.ravel(), minlength=num_individuals * num_time_slots
+    ).reshape(num_individuals, num_time_slots)
+    penalties[:, 4] = time_slot_counts.max(axis=1) - time_slot_counts.min(axis=1)
+
+    penalties[:, 5] = (
+        _count_conflicts(
+            np.broadcast_to(group_ids, time_slot_ids.shape),
+            time_slot_ids,
+            num_time_slots,
+        )
+        + _count_conflicts(lecturer_ids, time_slot_ids, num_time_slots)
+        + _count_conflicts(hall_ids, time_slot_ids, num_time_slots)
+    )
+
+    return penalties
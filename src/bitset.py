@@ -0,0 +1,55 @@
+import random
+
+
+def bit_positions(mask: int) -> list[int]:
+    """Lists positions of the set bits of a mask.
+
+    Parameters
+    ----------
+    mask : int
+        Non-negative integer used as a bitset.
+
+    Returns
+    -------
+    list[int]
+        Positions of the set bits in ascending order.
+    """
+    positions = []
+
+    while mask:
+        lowest_bit = mask & -mask
+        positions.append(lowest_bit.bit_length() - 1)
+        mask ^= lowest_bit
+
+    return positions
+
+
+def full_mask(size: int) -> int:
+    """Creates a mask with the `size` lowest bits set."""
+    return (1 << size) - 1
+
+
+def random_bit(mask: int, size: int, rng: random.Random) -> int:
+    """Picks the position of a random set bit of a non-empty mask.
+
+    Parameters
+    ----------
+    mask : int
+    size : int
+        Number of positions the mask covers.
+    rng : random.Random
+
+    Returns
+    -------
+    int
+    """
+    count = mask.bit_count()
+
+    # Dense masks are sampled by rejection, sparse ones are listed.
+    if 4 * count >= size:
+        while True:
+            position = rng.randrange(size)
+            if mask >> position & 1:
+                return position
+
+    return rng.choice(bit_positions(mask))
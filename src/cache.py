@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable
+
+from src.schedule import Schedule
+
+
+class FitnessCache:
+    """Memoizes a fitness function by the schedule's genome hash.
+
+    Identical genomes are common in a population (selectors copy the fittest
+    individuals), so the cache is meant to be shared by the whole population and
+    kept across generations. The least recently used entries are evicted once
+    `max_size` is reached.
+
+    Parameters
+    ----------
+    fitness_func : Callable[[Schedule], float]
+        Function used to score schedules that are not cached yet.
+    max_size : int, default=10000
+        Maximal number of cached scores.
+    """
+
+    def __init__(
+        self, fitness_func: Callable[[Schedule], float], max_size: int = 10000
+    ) -> None:
+        self.fitness_func = fitness_func
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._scores: OrderedDict[int, float] = OrderedDict()
+
+    def __call__(self, schedule: Schedule) -> float:
+        key = schedule.genome_hash()
+
+        fitness_score = self.get(key)
+        if fitness_score is None:
+            fitness_score = self.fitness_func(schedule)
+            self.put(key, fitness_score)
+
+        return fitness_score
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, key: int) -> float | None:
+        """Looks up a score and counts the hit or the miss.
+
+        Parameters
+        ----------
+        key : int
+            Genome hash of the schedule.
+
+        Returns
+        -------
+        float | None
+            Cached score or None if the genome has not been scored yet.
+        """
+        fitness_score = self._scores.get(key)
+
+        if fitness_score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._scores.move_to_end(key)
+
+        return fitness_score
+
+    def put(self, key: int, fitness_score: float) -> None:
+        """Stores a score evicting the least recently used one if the cache is
+        full.
+
+        Parameters
+        ----------
+        key : int
+            Genome hash of the schedule.
+        fitness_score : float
+        """
+        self._scores[key] = fitness_score
+        self._scores.move_to_end(key)
+
+        if len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
+
+    def items(self) -> list[tuple[int, float]]:
+        """Cached (genome hash, score) pairs from the least to the most recently
+        used one."""
+        return list(self._scores.items())
+
+    def update(self, items: list[tuple[int, float]]) -> None:
+        """Stores (genome hash, score) pairs in the given order, see `items`."""
+        for key, fitness_score in items:
+            self.put(key, fitness_score)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self)}/{self.max_size} entries, {self.hits} hits,"
+            f" {self.misses} misses ({self.hit_rate:.1%} hit rate)"
+        )
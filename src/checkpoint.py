@@ -0,0 +1,477 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import struct
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass
+from typing import Callable
+
+from src.cache import FitnessCache
+from src.parameters import Parameters
+from src.schedule import Schedule
+from src.termination import EvolutionController
+
+_MAGIC = b"GSCP"
+_VERSION = 2
+
+# magic, version, config fingerprint, lessons fingerprint, generation,
+# population size, genome size, best generation, best fitness, mutation
+# probability, elapsed seconds, flags, cache hits, cache misses, cache size,
+# number of mutable lessons, random state version, gauss_next.
+_HEADER = struct.Struct("<4sH16s16sIIIIdddBQQIIId")
+
+_HAS_BEST, _HAS_CACHE, _HAS_GAUSS, _HAS_MUTABLE = 1, 2, 4, 8
+
+
+class CheckpointError(ValueError):
+    """Raised when a checkpoint cannot be read or does not belong to the run
+    resuming it."""
+
+
+def config_fingerprint(parameters: Parameters) -> bytes:
+    """Hashes the entities of a config, equal configs give equal fingerprints
+    in any process."""
+    entities = (
+        parameters.time_slots,
+        parameters.subjects,
+        parameters.groups,
+        parameters.lecturers,
+        parameters.halls,
+    )
+    return hashlib.blake2b(repr(entities).encode(), digest_size=16).digest()
+
+
+def lessons_fingerprint(genome: bytes) -> bytes:
+    """Hashes the lesson list of a genome: its group and subject arrays, see
+    `Schedule.to_genome`."""
+    lessons = genome[: len(genome) // 5 * 2]
+    return hashlib.blake2b(lessons, digest_size=16).digest()
+
+
+@dataclass
+class Checkpoint:
+    """State of an evolution run at the start of a generation.
+
+    Parameters
+    ----------
+    config_fingerprint : bytes
+        See `config_fingerprint`, of the config the run evolves.
+    lessons_fingerprint : bytes
+        See `lessons_fingerprint`, shared by every genome.
+    generation : int
+        Number of generations already completed.
+    genomes : list[bytes]
+        Population packed with `Schedule.to_genome`.
+    genome_hashes : list[int]
+    indexed : list[bool]
+        Whether each individual had its occupancy index built. Restoring it
+        keeps the scoring path, and therefore every float, the same.
+    random_state : tuple
+        State of the root stream of the run, see `random.Random.getstate`.
+    best_genome : bytes | None
+        Best schedule found so far.
+    best_fitness : float
+    best_generation : int
+    mut_prob : float
+        Current, possibly adapted, mutation probability.
+    elapsed : float
+        Wall time spent before the checkpoint, in seconds.
+    cache_items : list[tuple[int, float]] | None
+        Contents of the fitness cache, None if the run has none.
+    cache_hits : int
+    cache_misses : int
+    mutable_lessons : list[int] | None
+        `EvolutionParameters.mutable_lessons` of the run, e.g. of a warm start.
+    """
+
+    config_fingerprint: bytes
+    lessons_fingerprint: bytes
+    generation: int
+    genomes: list[bytes]
+    genome_hashes: list[int]
+    indexed: list[bool]
+    random_state: tuple
+    best_genome: bytes | None
+    best_fitness: float
+    best_generation: int
+    mut_prob: float
+    elapsed: float
+    cache_items: list[tuple[int, float]] | None = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    mutable_lessons: list[int] | None = None
+
+    @classmethod
+    def capture(
+        cls,
+        generation: int,
+        population: list[Schedule],
+        controller: EvolutionController,
+        fitness_func: Callable[[Schedule], float],
+        rng: random.Random,
+        mutable_lessons: list[int] | None = None,
+    ) -> Checkpoint:
+        """Takes a checkpoint of a running evolution.
+
+        Parameters
+        ----------
+        generation : int
+            Number of generations already completed.
+        population : list[Schedule]
+            Population the next generation starts from.
+        controller : EvolutionController
+        fitness_func : Callable[[Schedule], float]
+            Fitness function of the run, its contents are saved if it is a
+            `FitnessCache`.
+        rng : random.Random
+            Root stream of the run, see `GeneticSchedule.rng`.
+        mutable_lessons : list[int], optional
+            Lessons mutation may change, all of them if None.
+
+        Returns
+        -------
+        Checkpoint
+        """
+        best_schedule = controller.best_schedule
+        genomes = [individual.to_genome() for individual in population]
+        checkpoint = cls(
+            config_fingerprint=config_fingerprint(population[0].parameters),
+            lessons_fingerprint=lessons_fingerprint(genomes[0]),
+            generation=generation,
+            genomes=genomes,
+            genome_hashes=[individual.genome_hash() for individual in population],
+            indexed=[individual.is_indexed() for individual in population],
+            random_state=rng.getstate(),
+            best_genome=None if best_schedule is None else best_schedule.to_genome(),
+            best_fitness=controller.best_fitness,
+            best_generation=controller.best_generation,
+            mut_prob=controller.mut_prob,
+            elapsed=controller.elapsed,
+            mutable_lessons=None if mutable_lessons is None else list(mutable_lessons),
+        )
+
+        if isinstance(fitness_func, FitnessCache):
+            checkpoint.cache_items = fitness_func.items()
+            checkpoint.cache_hits = fitness_func.hits
+            checkpoint.cache_misses = fitness_func.misses
+
+        return checkpoint
+
+    def check(self, parameters: Parameters, population_size: int | None = None) -> None:
+        """Checks that the checkpoint was taken from a run of the same config.
+
+        Parameters
+        ----------
+        parameters : Parameters
+            Parameters of the run resuming from the checkpoint.
+        population_size : int, optional
+            Population size of that run, not checked if None.
+
+        Raises
+        ------
+        CheckpointError
+            If the config, the lessons or the population size differ.
+        """
+        if self.config_fingerprint != config_fingerprint(parameters):
+            raise CheckpointError(
+                "The checkpoint was written by a run of another config."
+            )
+
+        num_lessons = len(parameters.required_lessons())
+        genome_size = 5 * array("i").itemsize * num_lessons
+        if any(len(genome) != genome_size for genome in self.genomes):
+            raise CheckpointError(
+                f"The checkpoint does not hold schedules of {num_lessons} lessons."
+            )
+        if any(
+            lessons_fingerprint(genome) != self.lessons_fingerprint
+            for genome in self.genomes
+        ):
+            raise CheckpointError("The schedules of the checkpoint differ in lessons.")
+        if population_size is not None and len(self.genomes) != population_size:
+            raise CheckpointError(
+                f"The checkpoint holds {len(self.genomes)} schedules, the run"
+                f" evolves {population_size}."
+            )
+        if self.mutable_lessons is not None and any(
+            not 0 <= lesson < num_lessons for lesson in self.mutable_lessons
+        ):
+            raise CheckpointError("The checkpoint has unknown mutable lessons.")
+
+    def restore(
+        self,
+        parameters: Parameters,
+        controller: EvolutionController,
+        fitness_func: Callable[[Schedule], float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        """Brings a new run to the state of the checkpoint.
+
+        Sets the state of the root stream, the controller and the fitness cache.
+
+        Parameters
+        ----------
+        parameters : Parameters
+            Parameters of the run the checkpoint was taken from.
+        controller : EvolutionController
+            Freshly created controller of the resumed run.
+        fitness_func : Callable[[Schedule], float]
+        rng : random.Random
+            Root stream of the resumed run.
+
+        Returns
+        -------
+        list[Schedule]
+            Population the next generation starts from.
+
+        Raises
+        ------
+        CheckpointError
+            If the checkpoint was taken from a run of another config, see
+            `check`.
+        """
+        self.check(parameters)
+
+        population = []
+        for genome, genome_hash, indexed in zip(
+            self.genomes, self.genome_hashes, self.indexed
+        ):
+            individual = Schedule.from_genome(parameters, genome, genome_hash)
+            if indexed:
+                individual.build_index()
+            population.append(individual)
+
+        controller.resume(
+            generation=self.generation,
+            best_schedule=(
+                None
+                if self.best_genome is None
+                else Schedule.from_genome(parameters, self.best_genome)
+            ),
+            best_fitness=self.best_fitness,
+            best_generation=self.best_generation,
+            mut_prob=self.mut_prob,
+            elapsed=self.elapsed,
+        )
+
+        if isinstance(fitness_func, FitnessCache) and self.cache_items is not None:
+            fitness_func.update(self.cache_items)
+            fitness_func.hits = self.cache_hits
+            fitness_func.misses = self.cache_misses
+
+        rng.setstate(self.random_state)
+        return population
+
+
+def _pack(typecode: str, values) -> bytes:
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(
+    typecode: str, data: memoryview, offset: int, count: int
+) -> tuple[array, int]:
+    unpacked = array(typecode)
+    end = offset + count * unpacked.itemsize
+    unpacked.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked, end
+
+
+def save_checkpoint(checkpoint: Checkpoint, file_path: str) -> None:
+    """Writes a checkpoint atomically: a crash while writing leaves the previous
+    checkpoint in place.
+
+    Parameters
+    ----------
+    checkpoint : Checkpoint
+    file_path : str
+
+    Notes
+    -----
+    The file is a fixed header followed by raw arrays: the random state, the
+    genome hashes, the index flags, the genomes, the best genome, the fitness
+    cache and the mutable lessons.
+    """
+    genome_size = len(checkpoint.genomes[0]) if checkpoint.genomes else 0
+    if any(len(genome) != genome_size for genome in checkpoint.genomes):
+        raise CheckpointError("All genomes of a checkpoint must have the same size.")
+
+    version, state, gauss_next = checkpoint.random_state
+    cache_items = checkpoint.cache_items or []
+    mutable_lessons = checkpoint.mutable_lessons or []
+
+    flags = 0
+    if checkpoint.best_genome is not None:
+        flags |= _HAS_BEST
+    if checkpoint.cache_items is not None:
+        flags |= _HAS_CACHE
+    if gauss_next is not None:
+        flags |= _HAS_GAUSS
+    if checkpoint.mutable_lessons is not None:
+        flags |= _HAS_MUTABLE
+
+    chunks = [
+        _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            checkpoint.config_fingerprint,
+            checkpoint.lessons_fingerprint,
+            checkpoint.generation,
+            len(checkpoint.genomes),
+            genome_size,
+            checkpoint.best_generation,
+            checkpoint.best_fitness,
+            checkpoint.mut_prob,
+            checkpoint.elapsed,
+            flags,
+            checkpoint.cache_hits,
+            checkpoint.cache_misses,
+            len(cache_items),
+            len(mutable_lessons),
+            version,
+            0.0 if gauss_next is None else gauss_next,
+        ),
+        struct.pack("<I", len(state)),
+        _pack("I", state),
+        _pack("Q", checkpoint.genome_hashes),
+        bytes(checkpoint.indexed),
+        *checkpoint.genomes,
+        checkpoint.best_genome or b"",
+        _pack("Q", [key for key, _ in cache_items]),
+        _pack("d", [fitness_score for _, fitness_score in cache_items]),
+        _pack("I", mutable_lessons),
+    ]
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=".checkpoint-", delete=False
+    ) as file:
+        try:
+            file.writelines(chunks)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+
+    os.replace(file.name, file_path)
+
+
+def load_checkpoint(
+    file_path: str,
+    parameters: Parameters | None = None,
+    population_size: int | None = None,
+) -> Checkpoint:
+    """Reads a checkpoint written by `save_checkpoint`.
+
+    Parameters
+    ----------
+    file_path : str
+    parameters : Parameters, optional
+        Parameters of the run that resumes, see `Checkpoint.check`.
+    population_size : int, optional
+        Population size of the run that resumes.
+
+    Returns
+    -------
+    Checkpoint
+
+    Raises
+    ------
+    CheckpointError
+        If the file is not a checkpoint, was written by another version or
+        does not belong to a run of `parameters`.
+    """
+    with open(file_path, "rb") as file:
+        data = memoryview(file.read())
+
+    if len(data) < _HEADER.size or data[:4] != _MAGIC:
+        raise CheckpointError(f"{file_path} is not a checkpoint.")
+
+    (
+        _,
+        version,
+        config_digest,
+        lessons_digest,
+        generation,
+        num_genomes,
+        genome_size,
+        best_generation,
+        best_fitness,
+        mut_prob,
+        elapsed,
+        flags,
+        cache_hits,
+        cache_misses,
+        cache_size,
+        num_mutable_lessons,
+        random_version,
+        gauss_next,
+    ) = _HEADER.unpack_from(data)
+    if version != _VERSION:
+        raise CheckpointError(
+            f"Unsupported checkpoint version {version} in {file_path}."
+        )
+
+    offset = _HEADER.size
+    (state_size,) = struct.unpack_from("<I", data, offset)
+    state, offset = _unpack("I", data, offset + 4, state_size)
+    genome_hashes, offset = _unpack("Q", data, offset, num_genomes)
+    indexed = [bool(flag) for flag in data[offset : offset + num_genomes]]
+    offset += num_genomes
+
+    genomes = []
+    for _ in range(num_genomes):
+        genomes.append(bytes(data[offset : offset + genome_size]))
+        offset += genome_size
+
+    best_genome = None
+    if flags & _HAS_BEST:
+        best_genome = bytes(data[offset : offset + genome_size])
+        offset += genome_size
+
+    keys, offset = _unpack("Q", data, offset, cache_size)
+    scores, offset = _unpack("d", data, offset, cache_size)
+    mutable_lessons, offset = _unpack("I", data, offset, num_mutable_lessons)
+    if offset != len(data):
+        raise CheckpointError(f"{file_path} is truncated or corrupted.")
+
+    checkpoint = Checkpoint(
+        config_fingerprint=config_digest,
+        lessons_fingerprint=lessons_digest,
+        generation=generation,
+        genomes=genomes,
+        genome_hashes=list(genome_hashes),
+        indexed=indexed,
+        random_state=(
+            random_version,
+            tuple(state),
+            gauss_next if flags & _HAS_GAUSS else None,
+        ),
+        best_genome=best_genome,
+        best_fitness=best_fitness,
+        best_generation=best_generation,
+        mut_prob=mut_prob,
+        elapsed=elapsed,
+        cache_items=list(zip(keys, scores)) if flags & _HAS_CACHE else None,
+        cache_hits=cache_hits,
+        cache_misses=cache_misses,
+        mutable_lessons=list(mutable_lessons) if flags & _HAS_MUTABLE else None,
+    )
+
+    if parameters is not None:
+        try:
+            checkpoint.check(parameters, population_size)
+        except CheckpointError as e:
+            raise CheckpointError(f"Cannot resume from {file_path}: {e}") from e
+
+    return checkpoint
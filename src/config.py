@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+
+import yaml
+
+from src.parameters import Parameters
+from src.types import Group, Hall, Lecturer, Subject, TimeSlot
+
+# libyaml is an optional extra of PyYAML, it parses about ten times faster.
+_Loader = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+# Bumped whenever `Parameters` or the entities change, older cache files are then
+# ignored.
+_CACHE_VERSION = 2
+
+_ENTITY_TYPES = {
+    "time_slots": TimeSlot,
+    "subjects": Subject,
+    "groups": Group,
+    "lecturers": Lecturer,
+    "halls": Hall,
+}
+
+
+class ConfigError(ValueError):
+    """Raised when a config file cannot be read or does not describe a valid
+    problem."""
+
+
+def parse_config(data: bytes, file_path: str = "<config>") -> Parameters:
+    """Builds the parameters described by the contents of a YAML config.
+
+    Parameters
+    ----------
+    data : bytes
+        Contents of the config.
+    file_path : str, default="<config>"
+        Name of the config used in error messages.
+
+    Returns
+    -------
+    Parameters
+
+    Raises
+    ------
+    ConfigError
+        If the YAML is malformed, a required key is missing or an entity has
+        wrong fields.
+    """
+    try:
+        config = yaml.load(data, Loader=_Loader)
+    except yaml.YAMLError as e:
+        raise ConfigError(f"Error parsing YAML file {file_path}: {e}") from e
+
+    if not isinstance(config, dict):
+        raise ConfigError(f"{file_path} does not contain a mapping.")
+
+    entities = {}
+    for key, entity_type in _ENTITY_TYPES.items():
+        if key not in config:
+            raise ConfigError(f"Missing required key: {key} in YAML file {file_path}.")
+
+        try:
+            entities[key] = [entity_type(**entry) for entry in config[key]]
+        except TypeError as e:
+            raise ConfigError(f"Invalid {key} entry in {file_path}: {e}") from e
+
+    return Parameters(**entities)
+
+
+def default_cache_dir() -> str:
+    """Per-user directory of parsed configs under `$XDG_CACHE_HOME`, which
+    defaults to ~/.cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "genetic-semester-scheduler", "configs")
+
+
+def _check_private(cache_dir: str) -> None:
+    """Creates `cache_dir` accessible only to the current user, or checks that an
+    existing one is owned by them and nobody else can write to it.
+
+    Raises
+    ------
+    ConfigError
+        If the directory cannot be created or others could plant cache files in
+        it.
+    """
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        status = os.stat(cache_dir)
+    except OSError as e:
+        raise ConfigError(f"Cannot create config cache {cache_dir}: {e}") from e
+
+    owned = not hasattr(os, "getuid") or status.st_uid == os.getuid()
+    if not owned or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise ConfigError(
+            f"Config cache {cache_dir} must be owned by you and not writable by"
+            " others, its files are unpickled."
+        )
+
+
+def load_config(file_path: str, cache_dir: str | None = None) -> Parameters:
+    """Loads a YAML config, reusing the parameters parsed by an earlier run.
+
+    Parameters
+    ----------
+    file_path : str
+    cache_dir : str, optional
+        Directory of the parsed configs, keyed by a hash of the file contents,
+        e.g. `default_cache_dir()`. Nothing is cached if None.
+
+    Returns
+    -------
+    Parameters
+
+    Raises
+    ------
+    ConfigError
+        If the file cannot be read or is not a valid config, or if `cache_dir`
+        is not private, see `_check_private`.
+
+    Notes
+    -----
+    Cached parameters are pickled, so a missing `cache_dir` is created with mode
+    0700 and an existing one others can write to is refused. Unreadable cache
+    files are parsed again.
+    """
+    try:
+        with open(file_path, "rb") as file:
+            data = file.read()
+    except OSError as e:
+        raise ConfigError(f"Cannot read config {file_path}: {e}") from e
+
+    if cache_dir is None:
+        return parse_config(data, file_path)
+
+    _check_private(cache_dir)
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    cache_path = os.path.join(cache_dir, f"config-{_CACHE_VERSION}-{digest}.pickle")
+
+    try:
+        with open(cache_path, "rb") as file:
+            parameters = pickle.load(file)
+        if isinstance(parameters, Parameters):
+            return parameters
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    parameters = parse_config(data, file_path)
+    _save_cached(parameters, cache_dir, cache_path)
+    return parameters
+
+
+def _save_cached(parameters: Parameters, cache_dir: str, cache_path: str) -> None:
+    """Writes the cache file atomically, a failure only costs the next run a
+    parse."""
+    with contextlib.suppress(OSError), tempfile.NamedTemporaryFile(
+        dir=cache_dir, prefix=".config-", delete=False
+    ) as file:
+        try:
+            pickle.dump(parameters, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.close()
+            os.replace(file.name, cache_path)
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+from src.schedule import Schedule
+
+
+def _same_lessons(parent: Schedule, other_parent: Schedule) -> bool:
+    return (
+        parent.group_ids == other_parent.group_ids
+        and parent.subject_ids == other_parent.subject_ids
+    )
+
+
+def _offspring(
+    parent: Schedule, other_parent: Schedule, lessons: list[int], rng: random.Random
+) -> Schedule:
+    """Copies `lessons` from the other parent into a clone of the first one.
+
+    Returns an unchanged clone of the first parent if `Schedule.repair_clashes`
+    leaves any of the copied lessons clashing, so crossover never adds double
+    bookings.
+    """
+    child = parent.clone()
+    child.copy_lessons(other_parent, lessons)
+    if child.repair_clashes(lessons, rng=rng):
+        return parent.clone()
+    return child
+
+
+@dataclass
+class GroupBlockCrossover:
+    """Crossover that takes the whole week of every group from one of the parents.
+
+    Lessons of a group never clash with each other in a valid parent, so only
+    halls and lecturers shared with the groups coming from the other parent
+    have to be repaired.
+
+    Parameters
+    ----------
+    swap_prob : float, default=0.5
+        Probability of a group to be taken from the second parent.
+    """
+
+    swap_prob: float = 0.5
+
+    def __call__(
+        self, parent: Schedule, other_parent: Schedule, rng: random.Random
+    ) -> Schedule:
+        if not _same_lessons(parent, other_parent):
+            return parent.clone()
+
+        swapped_groups = {
+            group_id
+            for group_id in range(len(parent.parameters.groups))
+            if rng.random() < self.swap_prob
+        }
+        lessons = [
+            lesson
+            for lesson, group_id in enumerate(parent.group_ids)
+            if group_id in swapped_groups
+        ]
+
+        return _offspring(parent, other_parent, lessons, rng)
+
+
+@dataclass
+class DayCrossover:
+    """Crossover that takes some days from the second parent: every lesson the
+    second parent places on one of those days gets its time slot, hall and
+    lecturer from the second parent.
+
+    Parameters
+    ----------
+    swap_prob : float, default=0.5
+        Probability of a day to be taken from the second parent.
+    """
+
+    swap_prob: float = 0.5
+
+    def __call__(
+        self, parent: Schedule, other_parent: Schedule, rng: random.Random
+    ) -> Schedule:
+        if not _same_lessons(parent, other_parent):
+            return parent.clone()
+
+        time_slot_days = parent.parameters.time_slot_days
+        swapped_days = {
+            day
+            for day in range(len(parent.parameters.days))
+            if rng.random() < self.swap_prob
+        }
+        lessons = [
+            lesson
+            for lesson, time_slot_id in enumerate(other_parent.time_slot_ids)
+            if time_slot_days[time_slot_id] in swapped_days
+        ]
+
+        return _offspring(parent, other_parent, lessons, rng)
+
+
+CROSSOVERS = {
+    "group_block": GroupBlockCrossover,
+    "day": DayCrossover,
+}
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from src import batch
+from src.cache import FitnessCache
+from src.schedule import Schedule
+
+# Default weights of `WeightedFitness`. The command line starts from them,
+# scheduling service jobs fill in the weights they leave out with them and
+# parameter sweeps use them as the objective.
+DEFAULT_WEIGHTS = {
+    "group_window_weight": 10,
+    "lecturer_window_weight": 7,
+    "non_profile_slot_weight": 5,
+    "capacity_overflow_weight": 20,
+    "distribution_penalty_weight": 0,
+    "conflict_weight": 50,
+}
+
+
+@dataclass
+class WeightedFitness:
+    """Scores a schedule as the negated weighted mean of its penalties.
+
+    Unlike a closure it can be pickled, so it can be shipped to worker processes.
+    """
+
+    group_window_weight: float
+    lecturer_window_weight: float
+    non_profile_slot_weight: float
+    capacity_overflow_weight: float
+    distribution_penalty_weight: float = 0
+    # Double bookings, see `Schedule.count_conflicts`. With the default weight
+    # they do not affect the score.
+    conflict_weight: float = 0
+
+    def __call__(self, schedule: Schedule) -> float:
+        lesson_counts = schedule.count_time_slot_lessons()
+
+        return self.score(
+            total_group_windows=schedule.count_total_windows(),
+            total_lecturer_windows=schedule.count_total_lecturer_windows(),
+            total_non_profile_slots=schedule.count_total_non_profile_slots(),
+            total_capacity_overflow=schedule.count_capacity_overflows(),
+            distribution_penalty=max(lesson_counts) - min(lesson_counts),
+            conflicts=schedule.count_conflicts(),
+        )
+
+    def score(
+        self,
+        total_group_windows,
+        total_lecturer_windows,
+        total_non_profile_slots,
+        total_capacity_overflow,
+        distribution_penalty,
+        conflicts=0,
+    ):
+        """Combines penalty totals into a fitness score. Works on scalars as well as
+        on NumPy arrays of totals of a whole population.
+        """
+        fitness_score = (
+            self.group_window_weight * total_group_windows
+            + self.lecturer_window_weight * total_lecturer_windows
+            + self.non_profile_slot_weight * total_non_profile_slots
+            + self.capacity_overflow_weight * total_capacity_overflow
+            + self.distribution_penalty_weight * distribution_penalty
+            + self.conflict_weight * conflicts
+        ) / (
+            self.group_window_weight
+            + self.lecturer_window_weight
+            + self.non_profile_slot_weight
+            + self.capacity_overflow_weight
+            + self.distribution_penalty_weight
+            + self.conflict_weight
+        )
+
+        return -1 * fitness_score
+
+
+def evaluate_population(
+    fitness_func: Callable[[Schedule], float], population: list[Schedule]
+) -> list[float]:
+    """Scores every individual of a population.
+
+    Parameters
+    ----------
+    fitness_func : Callable[[Schedule], float]
+        Fitness function, optionally wrapped in a `FitnessCache`.
+    population : list[Schedule]
+
+    Returns
+    -------
+    list[float]
+        Fitness score of each individual.
+
+    Notes
+    -----
+    Individuals with running totals are scored one by one, which is O(1) each.
+    When the fitness is a `WeightedFitness` and NumPy is installed, the
+    individuals without them, i.e. restored from genomes and not mutated since,
+    are scored together by the vectorized kernel in `src.batch`. Even a single
+    one is scored faster than its index is built, and individuals that are not
+    selected never need the index. A `FitnessCache` is looked up and filled
+    for them by genome hash.
+    """
+    weighted_fitness = fitness_func
+    fitness_cache = None
+    if isinstance(fitness_func, FitnessCache):
+        fitness_cache = fitness_func
+        weighted_fitness = fitness_func.fitness_func
+
+    if not isinstance(weighted_fitness, WeightedFitness) or not batch.is_available():
+        return [fitness_func(schedule) for schedule in population]
+
+    fitness_scores = [None] * len(population)
+    pending = []
+    for position, schedule in enumerate(population):
+        if schedule.is_indexed():
+            fitness_scores[position] = fitness_func(schedule)
+        elif fitness_cache is not None:
+            fitness_scores[position] = fitness_cache.get(schedule.genome_hash())
+
+        if fitness_scores[position] is None:
+            pending.append(position)
+
+    pending_schedules = [population[position] for position in pending]
+    if not batch.can_stack(pending_schedules):
+        for position, schedule in zip(pending, pending_schedules):
+            fitness_scores[position] = weighted_fitness(schedule)
+    else:
+        penalties = batch.population_penalties(
+            pending_schedules[0].parameters, pending_schedules
+        )
+        for position, fitness_score in zip(
+            pending, weighted_fitness.score(*penalties.T).tolist()
+        ):
+            fitness_scores[position] = fitness_score
+
+    if fitness_cache is not None:
+        for position in pending:
+            fitness_cache.put(
+                population[position].genome_hash(), fitness_scores[position]
+            )
+
+    return fitness_scores
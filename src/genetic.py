@@ -1,141 +1,307 @@
 from __future__ import annotations
 
-import yaml
-from prettytable import PrettyTable
+import contextlib
+import dataclasses
+import random
+import time
+from typing import Callable
 
+from src.checkpoint import Checkpoint, save_checkpoint
+from src.config import load_config
+from src.fitness import evaluate_population
+from src.parallel import PopulationExecutor, construct_population
 from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
 from src.schedule import Schedule
-from src.types import Group, Hall, Lecturer, Subject, TimeSlot
+from src.telemetry import GenerationRecord
+from src.termination import EvolutionController
+
+MigrationHook = Callable[
+    [int, list[Schedule], list[float]], tuple[list[Schedule], list[float]]
+]
 
 
 class GeneticSchedule:
-    def __init__(self, parameters: Parameters) -> None:
+    """Genetic algorithm over the schedules of one problem.
+
+    Parameters
+    ----------
+    parameters : Parameters
+    rng : RandomStream, optional
+        Root stream of the run, every random choice of the evolution is derived
+        from it. Seeded from the global `random` module if None.
+    """
+
+    def __init__(self, parameters: Parameters, rng: RandomStream | None = None) -> None:
         self.parameters = parameters
+        self.rng = RandomStream(random.getrandbits(64)) if rng is None else rng
 
     @classmethod
-    def from_yaml(cls, file_path: str) -> GeneticSchedule:
+    def from_yaml(
+        cls,
+        file_path: str,
+        cache_dir: str | None = None,
+        rng: RandomStream | None = None,
+    ) -> GeneticSchedule:
         """Loads YAML file configuration.
 
         Parameters
         ----------
         file_path : str
             Path to the yaml containing config.
+        cache_dir : str, optional
+            Directory of parsed configs reused by later runs, see
+            `src.config.load_config`.
+        rng : RandomStream, optional
+            Root stream of the run.
+
+        Raises
+        ------
+        ConfigError
+            If the file cannot be read or is not a valid config.
         """
-        try:
-            with open(file_path, "r") as file:
-                data = yaml.load(file, Loader=yaml.FullLoader)
-
-                required_keys = [
-                    "time_slots",
-                    "subjects",
-                    "groups",
-                    "lecturers",
-                    "halls",
-                ]
-                for key in required_keys:
-                    if key not in data:
-                        raise ValueError(f"Missing required key: {key} in YAML file.")
-
-                time_slots = [TimeSlot(**time_slot) for time_slot in data["time_slots"]]
-                subjects = [Subject(**subject) for subject in data["subjects"]]
-                groups = [Group(**group) for group in data["groups"]]
-                lecturers = [Lecturer(**lecturer) for lecturer in data["lecturers"]]
-                halls = [Hall(**hall) for hall in data["halls"]]
-
-                parameters = Parameters(time_slots, subjects, groups, lecturers, halls)
-
-                return cls(parameters)
-
-        except FileNotFoundError:
-            print(f"Error: File {file_path} not found.")
-        except yaml.YAMLError as e:
-            print(f"Error parsing YAML file: {e}")
-        except ValueError as e:
-            print(f"Error: {e}")
-
-    def generate_population(self, size: int) -> list[Schedule]:
-        """Generate a population of 'n' schedules using the create_basic_schedule method
-        from the Schedule class.
+        return cls(load_config(file_path, cache_dir=cache_dir), rng=rng)
+
+    def generate_population(self, size: int, num_workers: int = 1) -> list[Schedule]:
+        """Generate a population of 'n' schedules using the
+        create_constructive_schedule method from the Schedule class.
 
         Parameters
         ----------
         size : int
             The number of schedules to generate.
+        num_workers : int, default=1
+            Number of processes building the schedules.
 
         Returns
         -------
         list[Schedule]
             A list of generated schedules.
-        """
-        population = []
 
-        for _ in range(size):
-            schedule = Schedule.create_basic_schedule(self.parameters)
-            population.append(schedule)
-
-        return population
+        Notes
+        -----
+        Every schedule is built with its own stream derived from `rng`, so the
+        population does not depend on `num_workers`.
+        """
+        seeds = self.rng.seeds(size)
+        return construct_population(self.parameters, seeds, num_workers=num_workers)
 
-    def evolve(self, evolution_params: EvolutionParameters) -> Schedule:
+    def evolve(
+        self,
+        evolution_params: EvolutionParameters,
+        migrate: MigrationHook | None = None,
+        checkpoint: Checkpoint | None = None,
+        initial_population: list[Schedule] | None = None,
+    ) -> Schedule:
         """Evolves a population of schedules to optimize fitness.
 
         Parameters
         ----------
         evolution_params : EvolutionParameters
             Parameters needed for evolution
+        migrate : MigrationHook, optional
+            Called every generation with the generation number, the scored
+            population and its scores, right before selection. Returns the
+            population and scores to select from, see `src.island`.
+        checkpoint : Checkpoint, optional
+            Continues the run the checkpoint was taken from instead of starting
+            a new one. Given the same parameters, the resumed run is identical
+            to the uninterrupted one. Its mutable lessons replace the ones of
+            `evolution_params`.
+        initial_population : list[Schedule], optional
+            Population to start from instead of constructing a new one, e.g.
+            copies of a `src.warm_start.WarmStart` schedule. Ignored when
+            resuming from a checkpoint.
 
         Returns
         -------
         Schedule
-            The best fitness after the evolution process.
+            The best schedule found during the evolution process.
+
+        Raises
+        ------
+        CheckpointError
+            If `checkpoint` was taken from a run of another config.
+
+        Notes
+        -----
+        Evolution stops early once one of the termination criteria of
+        `evolution_params` is met. The best schedule so far is reported through
+        `evolution_params.on_best` whenever it improves. The run is saved to
+        `evolution_params.checkpoint_path` every `checkpoint_interval` generations.
+        All random choices are drawn from `rng`, so a run seeded the same way
+        gives the same result for any `num_workers`.
         """
-        population = [
-            Schedule.create_basic_schedule(self.parameters)
-            for _ in range(evolution_params.population_size)
-        ]
-
-        table = PrettyTable()
-        table.field_names = [
-            "Generation",
-            "Best Fitness",
-            "Second Best Fitness",
-            "Third Best Fitness",
-        ]
-
-        for generation in range(evolution_params.num_of_generations):
-            for individual in population:
-                individual.mutate(evolution_params)
-
-            fitness_scores = [evolution_params.fitness_func(ind) for ind in population]
-            top_3_fitness_before_selection = sorted(fitness_scores, reverse=True)[:3]
-
-            table.add_row(
-                [
-                    generation + 1,
-                    (
-                        f"{top_3_fitness_before_selection[0]:.2f}"
-                        if len(top_3_fitness_before_selection) > 0
-                        else "N/A"
-                    ),
-                    (
-                        f"{top_3_fitness_before_selection[1]:.2f}"
-                        if len(top_3_fitness_before_selection) > 1
-                        else "N/A"
-                    ),
-                    (
-                        f"{top_3_fitness_before_selection[2]:.2f}"
-                        if len(top_3_fitness_before_selection) > 2
-                        else "N/A"
-                    ),
-                ]
+        if checkpoint is not None:
+            evolution_params = dataclasses.replace(
+                evolution_params, mutable_lessons=checkpoint.mutable_lessons
+            )
+
+        profiler = evolution_params.profiler
+        with contextlib.nullcontext() if profiler is None else profiler.instrument():
+            return self._evolve(
+                evolution_params, migrate, checkpoint, initial_population
             )
 
-            print("\033c", end="")  # This clears the console
-            print(table)
+    def _evolve(
+        self,
+        evolution_params: EvolutionParameters,
+        migrate: MigrationHook | None,
+        checkpoint: Checkpoint | None,
+        initial_population: list[Schedule] | None,
+    ) -> Schedule:
+        controller = EvolutionController(evolution_params)
+
+        def phase(name: str) -> contextlib.AbstractContextManager:
+            if evolution_params.profiler is None:
+                return contextlib.nullcontext()
+            return evolution_params.profiler.phase(name)
+
+        # Wall time of local search, limited to a share of the run.
+        local_search_time = 0.0
+
+        with PopulationExecutor(self.parameters, evolution_params) as executor:
+            if checkpoint is not None:
+                first_generation = checkpoint.generation
+                population = checkpoint.restore(
+                    self.parameters,
+                    controller,
+                    evolution_params.fitness_func,
+                    self.rng,
+                )
+            elif initial_population is not None:
+                first_generation = 0
+                population = list(initial_population)
+                # Evolution only returns a schedule strictly better than the
+                # one it started from, equally fit ones are not worth moving
+                # lessons for.
+                fitness_scores = evaluate_population(
+                    evolution_params.fitness_func, population
+                )
+                best = max(range(len(population)), key=fitness_scores.__getitem__)
+                controller.offer(population[best], fitness_scores[best])
+            else:
+                first_generation = 0
+                with phase("initialization"):
+                    population = executor.construct(
+                        self.rng.seeds(evolution_params.population_size)
+                    )
+
+            for generation in range(
+                first_generation, evolution_params.num_of_generations
+            ):
+                if (
+                    evolution_params.checkpoint_path is not None
+                    and generation > first_generation
+                    and generation % evolution_params.checkpoint_interval == 0
+                ):
+                    with phase("checkpoint"):
+                        save_checkpoint(
+                            Checkpoint.capture(
+                                generation,
+                                population,
+                                controller,
+                                evolution_params.fitness_func,
+                                self.rng,
+                                mutable_lessons=evolution_params.mutable_lessons,
+                            ),
+                            evolution_params.checkpoint_path,
+                        )
 
-            population = evolution_params.selector_func(
-                population,
-                evolution_params.fitness_func,
+                seeds = self.rng.seeds(len(population))
+                mutation_prob = controller.mut_prob
+                with phase("mutate_and_score"):
+                    population, fitness_scores = executor.mutate_and_score(
+                        population, seeds, mut_prob=mutation_prob
+                    )
+                controller.update(generation + 1, population, fitness_scores)
+
+                if evolution_params.metrics_sink is not None:
+                    with phase("telemetry"):
+                        evolution_params.metrics_sink.write(
+                            GenerationRecord.from_population(
+                                generation + 1,
+                                population,
+                                fitness_scores,
+                                generation_time=controller.last_generation_time,
+                                elapsed=controller.elapsed,
+                                mut_prob=mutation_prob,
+                            )
+                        )
+
+                if controller.should_stop():
+                    break
+
+                if migrate is not None:
+                    with phase("migration"):
+                        population, fitness_scores = migrate(
+                            generation + 1, population, fitness_scores
+                        )
+
+                with phase("selection"):
+                    population = evolution_params.selector_func(
+                        population, fitness_scores, self.rng
+                    )
+
+                if evolution_params.local_search is not None:
+                    local_search_start = time.perf_counter()
+                    with phase("local_search"):
+                        evolution_params.local_search.improve_population(
+                            population,
+                            evolution_params.fitness_func,
+                            budget=evolution_params.local_search.budget(
+                                controller.elapsed, local_search_time
+                            ),
+                            lessons=evolution_params.mutable_lessons,
+                            rng=self.rng,
+                        )
+                    local_search_time += time.perf_counter() - local_search_start
+
+                if evolution_params.crossover_func is not None:
+                    with phase("crossover"):
+                        population = _recombine(population, evolution_params, self.rng)
+
+            else:
+                # Selection and crossover changed the population after it was
+                # last scored.
+                with phase("final_evaluation"):
+                    fitness_scores = evaluate_population(
+                        evolution_params.fitness_func, population
+                    )
+                best = max(range(len(population)), key=fitness_scores.__getitem__)
+                controller.offer(population[best], fitness_scores[best])
+
+        if evolution_params.metrics_sink is not None:
+            evolution_params.metrics_sink.flush()
+
+        if evolution_params.verbose and controller.stop_reason is not None:
+            print(
+                f"Stopped after {controller.generation} generations:"
+                f" {controller.stop_reason}."
             )
 
-        best_schedule = max(population, key=evolution_params.fitness_func)
-        return best_schedule
+        return controller.best_schedule
+
+
+def _recombine(
+    population: list[Schedule],
+    evolution_params: EvolutionParameters,
+    root_rng: RandomStream,
+) -> list[Schedule]:
+    """Replaces consecutive pairs of individuals with their offspring.
+
+    Every pair gets its own stream derived from `root_rng`, like the mutation of
+    every individual does.
+    """
+    offspring = list(population)
+
+    for i in range(0, len(population) - 1, 2):
+        (rng,) = root_rng.spawn(1)
+        if rng.random() >= evolution_params.crossover_prob:
+            continue
+
+        parent, other_parent = population[i], population[i + 1]
+        offspring[i] = evolution_params.crossover_func(parent, other_parent, rng)
+        offspring[i + 1] = evolution_params.crossover_func(other_parent, parent, rng)
+
+    return offspring
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import yaml
+
+from src.schedule import Schedule
+
+# libyaml is an optional extra of PyYAML, it serializes about ten times faster.
+_Dumper = getattr(yaml, "CDumper", yaml.Dumper)
+
+_LESSON_KEYS = ("group", "subject", "lecturer", "hall", "time_slot")
+
+# View name, key its lessons are grouped by and keys of every lesson.
+VIEWS = {
+    "students": ("group", ("subject", "lecturer", "hall", "time_slot")),
+    "lecturers": ("lecturer", ("group", "subject", "hall", "time_slot")),
+    "halls": ("hall", ("group", "subject", "lecturer", "time_slot")),
+}
+
+FORMATS = ("yaml", "json", "csv")
+
+View = dict[object, list[dict[str, object]]]
+
+
+def build_views(schedule: Schedule) -> dict[str, View]:
+    """Groups the lessons of a schedule by group, lecturer and hall in a single
+    pass over the grid.
+
+    Parameters
+    ----------
+    schedule : Schedule
+
+    Returns
+    -------
+    dict[str, View]
+        Every view of `VIEWS` maps the names of its entities, in the order of
+        the parameters, to their lessons sorted by time slot.
+    """
+    parameters = schedule.parameters
+    group_names = [group.name for group in parameters.groups]
+    subject_names = [subject.name for subject in parameters.subjects]
+    lecturer_names = [lecturer.name for lecturer in parameters.lecturers]
+    hall_names = [hall.name for hall in parameters.halls]
+    time_slot_names = [str(time_slot) for time_slot in parameters.time_slots]
+    time_slot_keys = [
+        (time_slot.day, time_slot.time) for time_slot in parameters.time_slots
+    ]
+
+    buckets = {
+        "students": [[] for _ in parameters.groups],
+        "lecturers": [[] for _ in parameters.lecturers],
+        "halls": [[] for _ in parameters.halls],
+    }
+    for group_id, subject_id, lecturer_id, hall_id, time_slot_id in zip(
+        schedule.group_ids,
+        schedule.subject_ids,
+        schedule.lecturer_ids,
+        schedule.hall_ids,
+        schedule.time_slot_ids,
+    ):
+        # Ordered like `_LESSON_KEYS`, with the time slot id for sorting.
+        lesson = (
+            group_names[group_id],
+            subject_names[subject_id],
+            lecturer_names[lecturer_id],
+            hall_names[hall_id],
+            time_slot_names[time_slot_id],
+            time_slot_id,
+        )
+        buckets["students"][group_id].append(lesson)
+        buckets["lecturers"][lecturer_id].append(lesson)
+        buckets["halls"][hall_id].append(lesson)
+
+    owners = {
+        "students": group_names,
+        "lecturers": lecturer_names,
+        "halls": hall_names,
+    }
+    views = {}
+    for view_name, (_, keys) in VIEWS.items():
+        positions = [_LESSON_KEYS.index(key) for key in keys]
+        view = {}
+        for name, lessons in zip(owners[view_name], buckets[view_name]):
+            # Stable, so lessons at the same time keep the order of the grid.
+            lessons.sort(key=lambda lesson: time_slot_keys[lesson[-1]])
+            view[name] = [
+                {key: lesson[position] for key, position in zip(keys, positions)}
+                for lesson in lessons
+            ]
+        views[view_name] = view
+
+    return views
+
+
+def write_yaml(view: View, file_path: str) -> None:
+    with open(file_path, "w") as file:
+        yaml.dump(
+            view,
+            file,
+            Dumper=_Dumper,
+            default_flow_style=False,
+            allow_unicode=True,
+        )
+
+
+def write_json(view: View, file_path: str) -> None:
+    with open(file_path, "w") as file:
+        json.dump({str(name): lessons for name, lessons in view.items()}, file)
+
+
+def _csv_writer(owner_key: str, keys: tuple[str, ...]) -> Callable:
+    def write_csv(view: View, file_path: str) -> None:
+        with open(file_path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow((owner_key, *keys))
+            writer.writerows(
+                (name, *(lesson[key] for key in keys))
+                for name, lessons in view.items()
+                for lesson in lessons
+            )
+
+    return write_csv
+
+
+def _safe_file_name(name: object) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip(".") or "_"
+
+
+def _file_names(names: list[object]) -> list[str]:
+    """Safe file names of the entities of a view, one per entity.
+
+    Names that would share a file, e.g. "K 1" and "K_1", or "K1" and "k1" on a
+    case-insensitive file system, get the id of their entity appended.
+    """
+    safe_names = [_safe_file_name(name) for name in names]
+    counts = Counter(safe_name.casefold() for safe_name in safe_names)
+    taken = set(counts)
+
+    file_names = []
+    for entity_id, safe_name in enumerate(safe_names):
+        if counts[safe_name.casefold()] > 1:
+            safe_name = f"{safe_name}_{entity_id}"
+            while safe_name.casefold() in taken:
+                safe_name += "_"
+            taken.add(safe_name.casefold())
+        file_names.append(safe_name)
+
+    return file_names
+
+
+def export_results(
+    schedule: Schedule,
+    output_dir: str = ".",
+    formats: tuple[str, ...] = ("yaml",),
+    per_entity: bool = False,
+    num_workers: int = 4,
+) -> list[str]:
+    """Writes the students, lecturers and halls views of a schedule.
+
+    Parameters
+    ----------
+    schedule : Schedule
+    output_dir : str, default="."
+        Created if it does not exist.
+    formats : tuple[str, ...], default=("yaml",)
+        Any of `FORMATS`.
+    per_entity : bool, default=False
+        Write one file per group, lecturer and hall, into a
+        `final_<view>_schedule` directory per view, instead of one
+        `final_<view>_schedule.<format>` file per view. Entities whose names
+        map to the same file name get their id appended.
+    num_workers : int, default=4
+        Number of threads writing files.
+
+    Returns
+    -------
+    list[str]
+        Paths of the written files.
+    """
+    for file_format in formats:
+        if file_format not in FORMATS:
+            raise ValueError(
+                f"Unknown output format: {file_format}, expected one of {FORMATS}."
+            )
+
+    views = build_views(schedule)
+    jobs = []
+    for view_name, view in views.items():
+        owner_key, keys = VIEWS[view_name]
+        writers = {
+            "yaml": write_yaml,
+            "json": write_json,
+            "csv": _csv_writer(owner_key, keys),
+        }
+        base_name = f"final_{view_name}_schedule"
+        file_names = _file_names(list(view))
+
+        for file_format in formats:
+            if not per_entity:
+                file_path = os.path.join(output_dir, f"{base_name}.{file_format}")
+                jobs.append((writers[file_format], view, file_path))
+                continue
+
+            directory = os.path.join(output_dir, base_name)
+            os.makedirs(directory, exist_ok=True)
+            jobs.extend(
+                (
+                    writers[file_format],
+                    {name: lessons},
+                    os.path.join(directory, f"{file_name}.{file_format}"),
+                )
+                for (name, lessons), file_name in zip(view.items(), file_names)
+            )
+
+    os.makedirs(output_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+        futures = [executor.submit(*job) for job in jobs]
+        for future in futures:
+            future.result()
+
+    return [file_path for _, _, file_path in jobs]
@@ -1,5 +1,4 @@
-import yaml
-
+from src.io.export import build_views, export_results, write_yaml
 from src.schedule import Schedule
 
 
@@ -11,29 +10,7 @@ def save_schedule_to_yaml_student(schedule: Schedule, file_path: str) -> None:
     :param schedule: The Schedule object to save
     :param file_path: Path to the output YAML file
     """
-    schedule_data = {}
-
-    for group in schedule.parameters.groups:
-        group_lessons = [slot for slot in schedule.grid if slot.group == group]
-
-        sorted_lessons = sorted(
-            group_lessons, key=lambda slot: (slot.time_slot.day, slot.time_slot.time)
-        )
-
-        group_lessons_data = []
-        for lesson in sorted_lessons:
-            lesson_data = {
-                "subject": lesson.subject.name,
-                "lecturer": lesson.lecturer.name,
-                "hall": lesson.hall.name,
-                "time_slot": str(lesson.time_slot),
-            }
-            group_lessons_data.append(lesson_data)
-
-        schedule_data[group.name] = group_lessons_data
-
-    with open(file_path, "w") as file:
-        yaml.dump(schedule_data, file, default_flow_style=False, allow_unicode=True)
+    write_yaml(build_views(schedule)["students"], file_path)
 
 
 def save_schedule_to_yaml_lecturer(schedule: Schedule, file_path: str) -> None:
@@ -44,29 +21,7 @@ def save_schedule_to_yaml_lecturer(schedule: Schedule, file_path: str) -> None:
     :param schedule: The Schedule object to save
     :param file_path: Path to the output YAML file
     """
-    schedule_data = {}
-
-    for lecturer in schedule.parameters.lecturers:
-        lecturer_lessons = [slot for slot in schedule.grid if slot.lecturer == lecturer]
-
-        sorted_lessons = sorted(
-            lecturer_lessons, key=lambda slot: (slot.time_slot.day, slot.time_slot.time)
-        )
-
-        lecturer_lessons_data = []
-        for lesson in sorted_lessons:
-            lesson_data = {
-                "group": lesson.group.name,
-                "subject": lesson.subject.name,
-                "hall": lesson.hall.name,
-                "time_slot": str(lesson.time_slot),
-            }
-            lecturer_lessons_data.append(lesson_data)
-
-        schedule_data[lecturer.name] = lecturer_lessons_data
-
-    with open(file_path, "w") as file:
-        yaml.dump(schedule_data, file, default_flow_style=False, allow_unicode=True)
+    write_yaml(build_views(schedule)["lecturers"], file_path)
 
 
 def save_schedule_to_yaml_hall(schedule: Schedule, file_path: str) -> None:
@@ -77,32 +32,22 @@ def save_schedule_to_yaml_hall(schedule: Schedule, file_path: str) -> None:
     :param schedule: The Schedule object to save
     :param file_path: Path to the output YAML file
     """
-    schedule_data = {}
-
-    for hall in schedule.parameters.halls:
-        hall_lessons = [slot for slot in schedule.grid if slot.hall == hall]
-
-        sorted_lessons = sorted(
-            hall_lessons, key=lambda slot: (slot.time_slot.day, slot.time_slot.time)
-        )
-
-        hall_lessons_data = []
-        for lesson in sorted_lessons:
-            lesson_data = {
-                "group": lesson.group.name,
-                "subject": lesson.subject.name,
-                "lecturer": lesson.lecturer.name,
-                "time_slot": str(lesson.time_slot),
-            }
-            hall_lessons_data.append(lesson_data)
+    write_yaml(build_views(schedule)["halls"], file_path)
 
-        schedule_data[hall.name] = hall_lessons_data
-
-    with open(file_path, "w") as file:
-        yaml.dump(schedule_data, file, default_flow_style=False, allow_unicode=True)
 
+def save_results(
+    schedule: Schedule,
+    output_dir: str = ".",
+    formats: tuple[str, ...] = ("yaml",),
+    per_entity: bool = False,
+) -> None:
+    """
+    Saves the students, lecturers and halls schedules in one pass over the
+    grid, see `src.io.export.export_results`.
 
-def save_results(schedule: Schedule) -> None:
-    save_schedule_to_yaml_student(schedule, "final_students_schedule.yaml")
-    save_schedule_to_yaml_lecturer(schedule, "final_lecturers_schedule.yaml")
-    save_schedule_to_yaml_hall(schedule, "final_halls_schedule.yaml")
+    :param schedule: The Schedule object to save
+    :param output_dir: Directory of the output files
+    :param formats: Output formats, any of "yaml", "json" and "csv"
+    :param per_entity: Write one file per group, lecturer and hall
+    """
+    export_results(schedule, output_dir, formats=formats, per_entity=per_entity)
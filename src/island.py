@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import queue
+import random
+from multiprocessing.queues import Queue
+from typing import Callable
+
+from src.fitness import evaluate_population
+from src.genetic import GeneticSchedule
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.schedule import Schedule
+
+TOPOLOGIES = ("ring", "full")
+
+# A migrant travels as (genome, genome hash). The receiving island scores it with
+# its own fitness function, which may weigh penalties differently.
+Migrant = tuple[bytes, int]
+
+
+def _neighbours(island: int, num_islands: int, topology: str) -> list[int]:
+    if topology == "ring":
+        return [(island + 1) % num_islands] if num_islands > 1 else []
+    if topology == "full":
+        return [other for other in range(num_islands) if other != island]
+
+    raise ValueError(f"Unknown topology: {topology}, expected one of {TOPOLOGIES}.")
+
+
+class _Migration:
+    """Migration hook of one island, see `GeneticSchedule.evolve`.
+
+    Every `interval` generations it sends the fittest individuals to the
+    outgoing neighbours and waits for the migrants of the incoming ones. Waiting
+    for every neighbour keeps runs reproducible. Islands announce when they stop,
+    so a neighbour that finished earlier is not waited for.
+
+    Immigrants are scored with `evaluate_population`, straight from their
+    genomes, so the ones selection drops never build an occupancy index.
+    """
+
+    def __init__(
+        self,
+        island: int,
+        parameters: Parameters,
+        fitness_func: Callable[[Schedule], float],
+        inboxes: list[Queue],
+        outgoing: list[int],
+        incoming: list[int],
+        interval: int,
+        size: int,
+    ) -> None:
+        self.island = island
+        self.parameters = parameters
+        self.fitness_func = fitness_func
+        self.inboxes = inboxes
+        self.outgoing = outgoing
+        self.active_incoming = set(incoming)
+        self.interval = interval
+        self.size = size
+        self._pending: dict[tuple[int, int], list[Migrant]] = {}
+
+    def __call__(
+        self, generation: int, population: list[Schedule], fitness_scores: list[float]
+    ) -> tuple[list[Schedule], list[float]]:
+        if generation % self.interval or not self.size:
+            return population, fitness_scores
+
+        order = sorted(
+            range(len(population)), key=fitness_scores.__getitem__, reverse=True
+        )
+
+        emigrants = [
+            (population[i].to_genome(), population[i].genome_hash())
+            for i in order[: self.size]
+        ]
+        for neighbour in self.outgoing:
+            self.inboxes[neighbour].put((self.island, generation, emigrants))
+
+        immigrants = [
+            Schedule.from_genome(self.parameters, genome, genome_hash)
+            for genome, genome_hash in self._receive(generation)
+        ]
+        immigrant_scores = evaluate_population(self.fitness_func, immigrants)
+
+        # Immigrants replace the least fit individuals of the island.
+        population = list(population)
+        fitness_scores = list(fitness_scores)
+        for i, immigrant, fitness_score in zip(
+            reversed(order), immigrants, immigrant_scores
+        ):
+            population[i] = immigrant
+            fitness_scores[i] = fitness_score
+
+        return population, fitness_scores
+
+    def _receive(self, generation: int) -> list[Migrant]:
+        inbox = self.inboxes[self.island]
+        waiting = set(self.active_incoming)
+        immigrants = []
+
+        while waiting:
+            ready = [
+                sender for sender in waiting if (sender, generation) in self._pending
+            ]
+            for sender in sorted(ready):
+                immigrants.extend(self._pending.pop((sender, generation)))
+                waiting.discard(sender)
+
+            if not waiting:
+                break
+
+            sender, sent_at, migrants = inbox.get()
+            if migrants is None:
+                self.active_incoming.discard(sender)
+                waiting.discard(sender)
+            else:
+                self._pending[(sender, sent_at)] = migrants
+
+        return immigrants
+
+    def close(self) -> None:
+        for neighbour in self.outgoing:
+            self.inboxes[neighbour].put((self.island, None, None))
+
+
+def _run_island(
+    island: int,
+    parameters: Parameters,
+    evolution_params: EvolutionParameters,
+    seed: int,
+    inboxes: list[Queue],
+    outgoing: list[int],
+    incoming: list[int],
+    migration_interval: int,
+    migration_size: int,
+    results: Queue,
+) -> None:
+    migration = _Migration(
+        island,
+        parameters,
+        evolution_params.fitness_func,
+        inboxes,
+        outgoing,
+        incoming,
+        interval=migration_interval,
+        size=migration_size,
+    )
+
+    try:
+        best_schedule = GeneticSchedule(parameters, rng=RandomStream(seed)).evolve(
+            evolution_params, migrate=migration
+        )
+    finally:
+        migration.close()
+
+    results.put(
+        (
+            island,
+            best_schedule.to_genome(),
+            evolution_params.fitness_func(best_schedule),
+        )
+    )
+
+
+def evolve_islands(
+    parameters: Parameters,
+    island_params: list[EvolutionParameters],
+    migration_interval: int = 10,
+    migration_size: int = 2,
+    topology: str = "ring",
+    rng: random.Random | None = None,
+) -> Schedule:
+    """Evolves several independent populations (islands) in separate processes,
+    periodically exchanging their fittest individuals.
+
+    Parameters
+    ----------
+    parameters : Parameters
+        Parameters shared by all schedules.
+    island_params : list[EvolutionParameters]
+        Parameters of every island. Their functions must be picklable.
+    migration_interval : int, default=10
+        Number of generations between migrations.
+    migration_size : int, default=2
+        Number of the fittest individuals an island sends to every neighbour.
+        They replace the least fit individuals of the receiving island.
+    topology : str, default="ring"
+        Either "ring" (island `i` sends to island `i + 1`) or "full" (every
+        island sends to all the others).
+    rng : random.Random, optional
+        Stream the islands' root streams are seeded from, the global `random`
+        module by default.
+
+    Returns
+    -------
+    Schedule
+        The fittest schedule found by any island.
+
+    Notes
+    -----
+    Every island evolves from its own root stream seeded from `rng`, so a
+    seeded run is reproducible. Migrants travel as compact genomes.
+    """
+    if migration_interval < 1:
+        raise ValueError("Migration interval must be at least one generation.")
+
+    num_islands = len(island_params)
+    outgoing = [
+        _neighbours(island, num_islands, topology) for island in range(num_islands)
+    ]
+    incoming = [
+        [other for other in range(num_islands) if island in outgoing[other]]
+        for island in range(num_islands)
+    ]
+    seeds = [(rng or random).getrandbits(64) for _ in range(num_islands)]
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(num_islands)]
+    results = context.Queue()
+
+    processes = [
+        context.Process(
+            target=_run_island,
+            args=(
+                island,
+                parameters,
+                evolution_params,
+                seeds[island],
+                inboxes,
+                outgoing[island],
+                incoming[island],
+                migration_interval,
+                migration_size,
+                results,
+            ),
+        )
+        for island, evolution_params in enumerate(island_params)
+    ]
+
+    for process in processes:
+        process.start()
+
+    try:
+        island_results = []
+        while len(island_results) < num_islands:
+            try:
+                island_results.append(results.get(timeout=1.0))
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError("An island process has failed.") from None
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+
+    # Every island is done with migration, but messages nobody waited for
+    # (e.g. stop notices) keep their senders alive until they are read.
+    for process in processes:
+        while process.is_alive():
+            for inbox in inboxes:
+                _drain(inbox)
+            process.join(timeout=0.1)
+
+    island_results.sort(key=lambda result: result[0])
+    _, genome, _ = max(island_results, key=lambda result: result[2])
+    return Schedule.from_genome(parameters, genome)
+
+
+def _drain(inbox: Queue) -> None:
+    with contextlib.suppress(queue.Empty):
+        while True:
+            inbox.get_nowait()
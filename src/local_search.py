@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from src.bitset import bit_positions, full_mask
+from src.cache import FitnessCache
+from src.fitness import WeightedFitness
+from src.rng import RandomStream
+from src.schedule import Schedule
+
+MOVES = ("time_slot_swap", "hall_swap", "lecturer")
+STRATEGIES = ("first", "steepest")
+
+
+def weighted_fitness(fitness_func: Callable) -> WeightedFitness:
+    """Returns the `WeightedFitness` behind a fitness function.
+
+    Raises
+    ------
+    TypeError
+        If the penalties of the fitness function are not known.
+    """
+    if isinstance(fitness_func, FitnessCache):
+        fitness_func = fitness_func.fitness_func
+    if not isinstance(fitness_func, WeightedFitness):
+        raise TypeError("Local search needs a WeightedFitness to score its moves.")
+    return fitness_func
+
+
+@dataclass
+class LocalSearch:
+    """Improves the fittest individuals of every generation with local moves:
+    swapping the time slots of two lessons of a group, swapping the halls of two
+    lessons at the same time slot and giving a lesson to another lecturer.
+
+    Moves are scored from the change of the penalties they cause, see
+    `Schedule.time_slot_swap_delta`, without evaluating the whole schedule.
+    Only moves that keep the schedule free of clashes and strictly improve the
+    fitness are made.
+
+    Parameters
+    ----------
+    top_k : int, default=2
+        Number of individuals searched, the first ones of the selected
+        population.
+    strategy : str, default="first"
+        "first" makes the first improving move of a randomly sampled
+        neighbour, "steepest" makes the best move among all neighbours of a
+        randomly chosen lesson.
+    max_evaluations : int, default=2000
+        Number of evaluated moves per individual and generation.
+    time_share : float, optional
+        Share of the run's wall time local search may take, between 0 and 1.
+        Without it only `max_evaluations` limits the search, which keeps runs
+        reproducible.
+    moves : tuple[str, ...], default=MOVES
+    """
+
+    top_k: int = 2
+    strategy: str = "first"
+    max_evaluations: int = 2000
+    time_share: float | None = None
+    moves: tuple[str, ...] = MOVES
+
+    def __post_init__(self) -> None:
+        if self.strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown local search strategy: {self.strategy},"
+                f" expected one of {STRATEGIES}."
+            )
+        unknown = set(self.moves) - set(MOVES)
+        if unknown:
+            raise ValueError(f"Unknown local search moves: {sorted(unknown)}.")
+        if self.time_share is not None and not 0 < self.time_share < 1:
+            raise ValueError("Local search time share must be in (0, 1).")
+
+    def budget(self, elapsed: float, spent: float) -> float | None:
+        """Seconds local search may take in this generation.
+
+        Parameters
+        ----------
+        elapsed : float
+            Wall time of the run so far, local search included.
+        spent : float
+            Wall time taken by local search so far.
+
+        Returns
+        -------
+        float | None
+            None if there is no time limit.
+        """
+        if self.time_share is None:
+            return None
+        share = self.time_share
+        return max(0.0, share / (1 - share) * (elapsed - spent) - spent)
+
+    def improve_population(
+        self,
+        population: list[Schedule],
+        fitness_func: Callable,
+        budget: float | None = None,
+        lessons: list[int] | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Searches the first `top_k` individuals of a population in place.
+
+        Parameters
+        ----------
+        population : list[Schedule]
+        fitness_func : Callable
+            `WeightedFitness`, optionally wrapped in a `FitnessCache`.
+        budget : float, optional
+            Seconds the search of the whole population may take.
+        lessons : list[int], optional
+            Lessons that may move, all of them if None, see
+            `EvolutionParameters.mutable_lessons`.
+        rng : random.Random, optional
+            Stream the individuals' streams are seeded from, the global `random`
+            module by default.
+        """
+        weights = weighted_fitness(fitness_func)
+        rng = rng or random
+        # Seeds are drawn even if the budget runs out, so that the rest of the
+        # run does not depend on timing.
+        rngs = [RandomStream(rng.getrandbits(64)) for _ in population[: self.top_k]]
+        deadline = None if budget is None else time.perf_counter() + budget
+
+        for individual, individual_rng in zip(population, rngs):
+            self.improve(
+                individual, weights, individual_rng, deadline=deadline, lessons=lessons
+            )
+
+    def improve(
+        self,
+        schedule: Schedule,
+        weights: WeightedFitness,
+        rng: random.Random | None = None,
+        deadline: float | None = None,
+        lessons: list[int] | None = None,
+    ) -> float:
+        """Makes improving moves on one schedule in place.
+
+        Parameters
+        ----------
+        schedule : Schedule
+        weights : WeightedFitness
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+        deadline : float, optional
+            `time.perf_counter` value after which the search stops.
+        lessons : list[int], optional
+            Lessons that may move, all of them if None.
+
+        Returns
+        -------
+        float
+            Gain of fitness.
+        """
+        rng = rng or random
+        lessons = list(range(len(schedule)) if lessons is None else lessons)
+        if not lessons:
+            return 0.0
+
+        neighbourhood = _Neighbourhood(schedule, lessons, self.moves)
+        gain = 0.0
+        evaluations = 0
+
+        while evaluations < self.max_evaluations:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+            lesson = rng.choice(lessons)
+            if any(schedule.clashes(lesson)):
+                evaluations += 1
+                continue
+
+            if self.strategy == "first":
+                candidates = neighbourhood.sample(lesson, rng)
+            else:
+                candidates = neighbourhood.all(lesson)
+            evaluations += max(1, len(candidates))
+
+            best = None
+            for move in candidates:
+                delta = neighbourhood.delta(move)
+                if delta is None:
+                    continue
+                # Penalties are linear, so the score of the change is the
+                # change of the score.
+                move_gain = weights.score(*delta, 0)
+                if move_gain > 0 and (best is None or move_gain > best[0]):
+                    best = (move_gain, move)
+
+            if best is not None:
+                neighbourhood.apply(best[1])
+                gain += best[0]
+
+        return gain
+
+
+class _Neighbourhood:
+    """Moves of a schedule's lessons as (kind, lesson, target) tuples, where the
+    target is the other lesson of a swap or the new lecturer."""
+
+    def __init__(self, schedule: Schedule, lessons: list[int], moves) -> None:
+        self.schedule = schedule
+        self.moves = tuple(moves)
+        self.num_lecturers = len(schedule.parameters.lecturers)
+
+        self.group_lessons: dict[int, list[int]] = {}
+        self.time_slot_lessons: dict[int, set[int]] = {}
+        for lesson in lessons:
+            group_id = schedule.group_ids[lesson]
+            time_slot_id = schedule.time_slot_ids[lesson]
+            self.group_lessons.setdefault(group_id, []).append(lesson)
+            self.time_slot_lessons.setdefault(time_slot_id, set()).add(lesson)
+
+    def _lecturers(self, lesson: int) -> list[int]:
+        # Busy lecturers are rejected by `Schedule.lecturer_delta`.
+        qualified = self.schedule.parameters.subject_lecturer_masks[
+            self.schedule.subject_ids[lesson]
+        ]
+        return bit_positions(qualified or full_mask(self.num_lecturers))
+
+    def _targets(self, kind: str, lesson: int) -> list[int]:
+        schedule = self.schedule
+        if kind == "time_slot_swap":
+            return self.group_lessons[schedule.group_ids[lesson]]
+        if kind == "hall_swap":
+            return list(self.time_slot_lessons[schedule.time_slot_ids[lesson]])
+        return self._lecturers(lesson)
+
+    def sample(self, lesson: int, rng: random.Random) -> list[tuple]:
+        kind = rng.choice(self.moves)
+        targets = self._targets(kind, lesson)
+        return [(kind, lesson, rng.choice(targets))] if targets else []
+
+    def all(self, lesson: int) -> list[tuple]:
+        return [
+            (kind, lesson, target)
+            for kind in self.moves
+            for target in self._targets(kind, lesson)
+        ]
+
+    def delta(self, move: tuple) -> tuple[int, int, int, float] | None:
+        kind, lesson, target = move
+        schedule = self.schedule
+        if kind == "lecturer":
+            return schedule.lecturer_delta(lesson, target)
+        if target == lesson or any(schedule.clashes(target)):
+            return None
+        if kind == "time_slot_swap":
+            return schedule.time_slot_swap_delta(lesson, target)
+        return schedule.hall_swap_delta(lesson, target)
+
+    def apply(self, move: tuple) -> None:
+        kind, lesson, target = move
+        schedule = self.schedule
+        if kind == "lecturer":
+            schedule.reassign_lecturer(lesson, target)
+        elif kind == "hall_swap":
+            schedule.swap_halls(lesson, target)
+        else:
+            time_slot_id = schedule.time_slot_ids[lesson]
+            other_time_slot_id = schedule.time_slot_ids[target]
+            schedule.swap_time_slots(lesson, target)
+            self.time_slot_lessons[time_slot_id].discard(lesson)
+            self.time_slot_lessons[other_time_slot_id].discard(target)
+            self.time_slot_lessons[other_time_slot_id].add(lesson)
+            self.time_slot_lessons[time_slot_id].add(target)
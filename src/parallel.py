@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from src.cache import FitnessCache
+from src.fitness import evaluate_population
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.schedule import Schedule
+
+_worker_parameters: Parameters | None = None
+_worker_evolution_params: EvolutionParameters | None = None
+
+
+def _init_worker(parameters: Parameters, evolution_params: EvolutionParameters) -> None:
+    global _worker_parameters, _worker_evolution_params
+
+    _worker_parameters = parameters
+    _worker_evolution_params = evolution_params
+
+
+def _with_mut_prob(
+    evolution_params: EvolutionParameters, mut_prob: float | None
+) -> EvolutionParameters:
+    if mut_prob is None or mut_prob == evolution_params.mut_prob:
+        return evolution_params
+    return dataclasses.replace(evolution_params, mut_prob=mut_prob)
+
+
+def _mutate_and_score(
+    state: tuple, seed: int, mut_prob: float | None = None
+) -> tuple[tuple, float]:
+    schedule = Schedule.from_state(_worker_parameters, state)
+    schedule.mutate(
+        _with_mut_prob(_worker_evolution_params, mut_prob), rng=RandomStream(seed)
+    )
+    fitness_score = _worker_evolution_params.fitness_func(schedule)
+    return schedule.to_state(), fitness_score
+
+
+def _construct(seed: int) -> tuple[bytes, int]:
+    schedule = Schedule.create_constructive_schedule(
+        _worker_parameters, rng=RandomStream(seed)
+    )
+    return schedule.to_genome(), schedule.genome_hash()
+
+
+def _default_chunk_size(size: int, num_workers: int) -> int:
+    # A few chunks per worker keeps the pool balanced without paying the round
+    # trip for every individual.
+    return max(1, math.ceil(size / (4 * num_workers)))
+
+
+def _construct_all(
+    parameters: Parameters,
+    seeds: list[int],
+    pool: ProcessPoolExecutor | None,
+    chunk_size: int,
+) -> list[Schedule]:
+    if pool is None:
+        return [
+            Schedule.create_constructive_schedule(parameters, rng=RandomStream(seed))
+            for seed in seeds
+        ]
+
+    return [
+        Schedule.from_genome(parameters, genome, genome_hash)
+        for genome, genome_hash in pool.map(_construct, seeds, chunksize=chunk_size)
+    ]
+
+
+def construct_population(
+    parameters: Parameters, seeds: list[int], num_workers: int = 1
+) -> list[Schedule]:
+    """Builds one schedule with `Schedule.create_constructive_schedule` per seed.
+
+    Parameters
+    ----------
+    parameters : Parameters
+    seeds : list[int]
+        Seed of the `RandomStream` used for each schedule.
+    num_workers : int, default=1
+        Number of processes building the schedules.
+
+    Returns
+    -------
+    list[Schedule]
+        The same schedules for any number of workers.
+    """
+    if num_workers <= 1:
+        return _construct_all(parameters, seeds, None, 1)
+
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_worker,
+        initargs=(parameters, None),
+    ) as pool:
+        return _construct_all(
+            parameters, seeds, pool, _default_chunk_size(len(seeds), num_workers)
+        )
+
+
+class PopulationExecutor:
+    """Mutates and scores a population, either in the current process or across a
+    pool of worker processes.
+
+    Both paths mutate every individual with its own `RandomStream(seed)`, so for
+    the same seeds they produce identical populations and scores.
+
+    Parameters
+    ----------
+    parameters : Parameters
+        Parameters shared by all schedules. Sent to every worker once.
+    evolution_params : EvolutionParameters
+        Mutation probabilities, fitness function and pool settings.
+    """
+
+    def __init__(
+        self, parameters: Parameters, evolution_params: EvolutionParameters
+    ) -> None:
+        self.parameters = parameters
+        self.evolution_params = evolution_params
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> PopulationExecutor:
+        if self.evolution_params.num_workers > 1:
+            # The selector runs in the parent process only and may not be
+            # picklable, so it is not sent to the workers. Neither is the fitness
+            # cache, workers report genome hashes and the parent fills it.
+            fitness_func = self.evolution_params.fitness_func
+            if isinstance(fitness_func, FitnessCache):
+                fitness_func = fitness_func.fitness_func
+
+            worker_params = dataclasses.replace(
+                self.evolution_params, fitness_func=fitness_func, selector_func=None
+            )
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.evolution_params.num_workers,
+                initializer=_init_worker,
+                initargs=(self.parameters, worker_params),
+            )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _chunk_size(self, population_size: int) -> int:
+        if self.evolution_params.chunk_size:
+            return self.evolution_params.chunk_size
+
+        return _default_chunk_size(population_size, self.evolution_params.num_workers)
+
+    def construct(self, seeds: list[int]) -> list[Schedule]:
+        """Builds the initial population, see `construct_population`."""
+        return _construct_all(
+            self.parameters, seeds, self._pool, self._chunk_size(len(seeds))
+        )
+
+    def mutate_and_score(
+        self,
+        population: list[Schedule],
+        seeds: list[int],
+        mut_prob: float | None = None,
+    ) -> tuple[list[Schedule], list[float]]:
+        """Mutates every individual and calculates its fitness.
+
+        Parameters
+        ----------
+        population : list[Schedule]
+        seeds : list[int]
+            Seed of the mutation stream of each individual.
+        mut_prob : float, optional
+            Overrides `mut_prob` of the evolution parameters, see
+            `src.termination.EvolutionController`.
+
+        Returns
+        -------
+        tuple[list[Schedule], list[float]]
+            Mutated population and the fitness score of each individual.
+
+        Notes
+        -----
+        The serial path mutates the schedules in place. The pool path ships
+        every schedule with its occupancy index and running totals, see
+        `Schedule.to_state`, so workers keep the incremental bookkeeping instead
+        of rebuilding it from a genome. A schedule sent without them is indexed
+        once by its worker and comes back with them.
+        """
+        if self._pool is None:
+            mutation_params = _with_mut_prob(self.evolution_params, mut_prob)
+            for individual, seed in zip(population, seeds):
+                individual.mutate(mutation_params, rng=RandomStream(seed))
+
+            fitness_scores = evaluate_population(
+                self.evolution_params.fitness_func, population
+            )
+            return population, fitness_scores
+
+        results = self._pool.map(
+            _mutate_and_score,
+            [individual.to_state() for individual in population],
+            seeds,
+            [mut_prob] * len(population),
+            chunksize=self._chunk_size(len(population)),
+        )
+
+        fitness_cache = self.evolution_params.fitness_func
+        if not isinstance(fitness_cache, FitnessCache):
+            fitness_cache = None
+
+        new_population = []
+        fitness_scores = []
+        for state, fitness_score in results:
+            individual = Schedule.from_state(self.parameters, state)
+            new_population.append(individual)
+            fitness_scores.append(fitness_score)
+
+            if fitness_cache is not None:
+                fitness_cache.put(individual.genome_hash(), fitness_score)
+
+        return new_population, fitness_scores
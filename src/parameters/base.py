@@ -1,12 +1,211 @@
-from dataclasses import dataclass
+from __future__ import annotations
 
+from dataclasses import dataclass, field
+
+from src.bitset import bit_positions
 from src.types import Group, Hall, Lecturer, Subject, TimeSlot
 
 
-@dataclass
+def _derived(**kwargs):
+    return field(init=False, repr=False, compare=False, **kwargs)
+
+
+@dataclass(frozen=True)
 class Parameters:
-    time_slots: list[TimeSlot]
-    subjects: list[Subject]
-    groups: list[Group]
-    lecturers: list[Lecturer]
-    halls: list[Hall]
+    """Problem definition shared by all schedules of a run.
+
+    Parameters are immutable: entity lists are stored as tuples and copying a
+    schedule (or deep-copying anything that refers to the parameters) shares
+    the same object instead of duplicating every entity.
+
+    Entities compare by identity and belong to one `Parameters`, which sets
+    their `id` to their position and resolves the subject names of groups and
+    lecturers into `subject_ids`.
+    """
+
+    time_slots: tuple[TimeSlot, ...]
+    subjects: tuple[Subject, ...]
+    groups: tuple[Group, ...]
+    lecturers: tuple[Lecturer, ...]
+    halls: tuple[Hall, ...]
+
+    time_slot_index: dict[TimeSlot, int] = _derived()
+    subject_index: dict[Subject, int] = _derived()
+    group_index: dict[Group, int] = _derived()
+    lecturer_index: dict[Lecturer, int] = _derived()
+    hall_index: dict[Hall, int] = _derived()
+    time_slot_days: tuple[int, ...] = _derived()
+    time_slot_times: tuple[int, ...] = _derived()
+    days: tuple[str, ...] = _derived()
+    lecturer_subject_ids: tuple[frozenset[int], ...] = _derived()
+    subject_name_index: dict[str, int] = _derived()
+    subject_lecturer_masks: tuple[int, ...] = _derived()
+    group_hall_masks: tuple[int, ...] = _derived()
+    day_masks: tuple[int, ...] = _derived()
+    _day_windows: tuple[dict[int, int], ...] = _derived()
+
+    def __post_init__(self) -> None:
+        """Builds lookup tables that map every entity to its position in the
+        corresponding list. Schedules store these positions instead of the
+        entities themselves.
+        """
+        derived = {
+            "time_slots": tuple(self.time_slots),
+            "subjects": tuple(self.subjects),
+            "groups": tuple(self.groups),
+            "lecturers": tuple(self.lecturers),
+            "halls": tuple(self.halls),
+            "time_slot_index": _build_index(self.time_slots),
+            "subject_index": _build_index(self.subjects),
+            "group_index": _build_index(self.groups),
+            "lecturer_index": _build_index(self.lecturers),
+            "hall_index": _build_index(self.halls),
+        }
+
+        days = tuple(dict.fromkeys(time_slot.day for time_slot in self.time_slots))
+        day_index = _build_index(days)
+        time_slot_days = tuple(
+            day_index[time_slot.day] for time_slot in self.time_slots
+        )
+
+        day_masks = [0] * len(days)
+        for time_slot_id, day in enumerate(time_slot_days):
+            day_masks[day] |= 1 << time_slot_id
+
+        subject_ids_by_name: dict[str, set[int]] = {}
+        for subject_id, subject in enumerate(self.subjects):
+            subject_ids_by_name.setdefault(subject.name, set()).add(subject_id)
+
+        subject_name_index = {
+            name: min(subject_ids) for name, subject_ids in subject_ids_by_name.items()
+        }
+
+        for entities in (
+            derived["time_slots"],
+            derived["subjects"],
+            derived["groups"],
+            derived["lecturers"],
+            derived["halls"],
+        ):
+            for entity_id, entity in enumerate(entities):
+                if entity.id not in (-1, entity_id):
+                    raise ValueError(
+                        f"{type(entity).__name__} {entity} already belongs to other"
+                        " parameters."
+                    )
+                object.__setattr__(entity, "id", entity_id)
+
+        for group in self.groups:
+            object.__setattr__(
+                group,
+                "subject_ids",
+                tuple(
+                    subject_name_index[name]
+                    for name in group.subject_names
+                    if name in subject_name_index
+                ),
+            )
+        for lecturer in self.lecturers:
+            object.__setattr__(
+                lecturer,
+                "subject_ids",
+                frozenset(
+                    subject_id
+                    for name in lecturer.can_teach_subjects_names
+                    for subject_id in subject_ids_by_name.get(name, ())
+                ),
+            )
+        lecturer_subject_ids = tuple(
+            lecturer.subject_ids for lecturer in self.lecturers
+        )
+
+        # Bitmasks over lecturer positions of the lecturers able to teach each
+        # subject, and over hall positions of the halls each group fits in.
+        subject_lecturer_masks = [0] * len(self.subjects)
+        for lecturer_id, subject_ids in enumerate(lecturer_subject_ids):
+            for subject_id in subject_ids:
+                subject_lecturer_masks[subject_id] |= 1 << lecturer_id
+
+        group_hall_masks = tuple(
+            sum(
+                1 << hall_id
+                for hall_id, hall in enumerate(self.halls)
+                if hall.capacity >= group.capacity
+            )
+            for group in self.groups
+        )
+
+        derived.update(
+            days=days,
+            time_slot_days=time_slot_days,
+            time_slot_times=tuple(time_slot.time for time_slot in self.time_slots),
+            day_masks=tuple(day_masks),
+            _day_windows=tuple({0: 0} for _ in days),
+            lecturer_subject_ids=lecturer_subject_ids,
+            subject_name_index=subject_name_index,
+            subject_lecturer_masks=tuple(subject_lecturer_masks),
+            group_hall_masks=group_hall_masks,
+        )
+
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+    def __deepcopy__(self, memo: dict) -> Parameters:
+        return self
+
+    def required_lessons(self) -> list[tuple[int, int]]:
+        """Lists the lessons every group needs, one entry per hour of each of its
+        subjects.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            Group and subject ids, subjects missing from `subjects` are skipped.
+        """
+        lessons = []
+        for group_id, group in enumerate(self.groups):
+            for subject_id in group.subject_ids:
+                hours = self.subjects[subject_id].hours
+                lessons.extend([(group_id, subject_id)] * hours)
+
+        return lessons
+
+    def count_day_windows(self, day: int, mask: int) -> int:
+        """Counts windows (gaps) between the occupied time slots of one day.
+
+        Parameters
+        ----------
+        day : int
+            Position of the day in `days`.
+        mask : int
+            Occupancy mask over time slot positions, only bits of `day` are
+            taken into account.
+
+        Returns
+        -------
+        int
+            Number of free lesson times between the first and the last
+            occupied one.
+
+        Notes
+        -----
+        Results are memoized per day, so every distinct daily pattern is only
+        evaluated once.
+        """
+        day_mask = mask & self.day_masks[day]
+        day_windows = self._day_windows[day]
+
+        windows = day_windows.get(day_mask)
+        if windows is None:
+            times = {self.time_slot_times[pos] for pos in bit_positions(day_mask)}
+            windows = max(times) - min(times) + 1 - len(times)
+            day_windows[day_mask] = windows
+
+        return windows
+
+
+def _build_index(items: list) -> dict:
+    index = {}
+    for position, item in enumerate(items):
+        index.setdefault(item, position)
+    return index
@@ -1,5 +1,12 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from src.local_search import LocalSearch
+    from src.profiling import Profiler
+    from src.telemetry import MetricsSink
 
 
 @dataclass
@@ -11,4 +18,48 @@ class EvolutionParameters:
     lecturer_prob: float
     time_slot_prob: float
     fitness_func: Callable
+    # Called as `selector_func(population, fitness_scores, rng)` with the scores
+    # of the population and the root stream of the run, see `src.selection`.
     selector_func: Callable
+    # Mutation and scoring run in a process pool when more than one worker is
+    # requested. `fitness_func` must then be picklable, see `WeightedFitness`.
+    num_workers: int = 1
+    chunk_size: int | None = None
+    verbose: bool = True
+    # Receives the statistics of every generation, see `src.telemetry`.
+    metrics_sink: MetricsSink | None = None
+    # Times the phases of every generation and the schedule hot paths, see
+    # `src.profiling`. Without it nothing is measured.
+    profiler: Profiler | None = None
+    # After selection, consecutive pairs of individuals are recombined with
+    # probability `crossover_prob`, see `src.crossover` for operators.
+    crossover_func: Callable | None = None
+    crossover_prob: float = 0.8
+    # After selection, the first individuals are improved by local search, see
+    # `src.local_search`.
+    local_search: LocalSearch | None = None
+    # Termination criteria checked after every generation, `max_wall_time` is in
+    # seconds. Evolution stops at `num_of_generations` in any case.
+    max_wall_time: float | None = None
+    target_fitness: float | None = None
+    stagnation_generations: int | None = None
+    # Polled after every generation, the run stops with the best schedule so far
+    # once it returns True, see `src.service`.
+    should_cancel: Callable[[], bool] | None = None
+    # When the best fitness has not improved for `adaptive_mutation_window`
+    # generations, `mut_prob` is multiplied by `adaptive_mutation_factor` (up to
+    # `max_mut_prob`). It falls back to `mut_prob` once the fitness improves.
+    adaptive_mutation_window: int | None = None
+    adaptive_mutation_factor: float = 1.5
+    max_mut_prob: float = 1.0
+    # Called as `on_best(schedule, fitness, generation)` with a copy of the best
+    # schedule found so far every time it improves.
+    on_best: Callable | None = None
+    # Every `checkpoint_interval` generations the state of the run is saved to
+    # `checkpoint_path`, see `src.checkpoint`.
+    checkpoint_path: str | None = None
+    checkpoint_interval: int = 10
+    # Indices of the lessons mutation may change, all of them if None. Other
+    # lessons keep their place unless crossover or repairs move them, see
+    # `src.warm_start`.
+    mutable_lessons: list[int] | None = None
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import time
+from collections import Counter
+from typing import Callable, Iterator
+
+from src import batch
+from src.schedule import Schedule
+
+# Methods of `Schedule` timed by `Profiler.instrument`. Timers are inclusive,
+# e.g. `mutate` contains the `_mutate_*` operators, which contain the
+# availability queries.
+PROFILED_METHODS = (
+    "mutate",
+    "_mutate_hall",
+    "_mutate_lecturer",
+    "_mutate_timeslot",
+    "get_available_halls",
+    "get_available_lecturers",
+    "get_available_time_slots",
+    "_available_hall_ids",
+    "_available_lecturer_ids",
+    "_available_time_slot_ids",
+    "repair_clashes",
+    "time_slot_swap_delta",
+    "hall_swap_delta",
+    "lecturer_delta",
+    "count_total_windows",
+    "count_total_lecturer_windows",
+    "count_total_non_profile_slots",
+    "count_capacity_overflows",
+    "count_time_slot_lessons",
+    "count_conflicts",
+    "clone",
+    "_reset_totals",
+)
+
+# Functions of `src.batch` timed by `Profiler.instrument`.
+PROFILED_BATCH_FUNCTIONS = ("population_penalties",)
+
+# Mutation operators, their boolean outcome is counted as applied or no-op.
+MUTATION_OPERATORS = ("_mutate_hall", "_mutate_lecturer", "_mutate_timeslot")
+
+
+class Profiler:
+    """Collects cumulative time and call counts of the evolution phases and of the
+    schedule hot paths, plus outcome counters of the mutation operators.
+
+    Nothing is measured outside of `phase` and `instrument`, so a run without a
+    profiler pays nothing for it.
+
+    Notes
+    -----
+    Only calls made in the current process are recorded, with a process pool the
+    mutation and scoring happen in the workers and show up as one phase.
+    """
+
+    def __init__(self) -> None:
+        self.timers: dict[str, list] = {}
+        self.counters: Counter[str] = Counter()
+        self._start = time.perf_counter()
+
+    def _timer(self, name: str) -> list:
+        # [number of calls, cumulative seconds]
+        return self.timers.setdefault(name, [0, 0.0])
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times a block of code as one call of `name`."""
+        timer = self._timer(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timer[0] += 1
+            timer[1] += time.perf_counter() - start
+
+    def _timed(self, name: str, method: Callable) -> Callable:
+        timer = self._timer(name)
+        perf_counter = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timer[0] += 1
+                timer[1] += perf_counter() - start
+
+        return timed
+
+    def _counted(self, name: str, method: Callable) -> Callable:
+        counters = self.counters
+        applied, no_op = f"{name} applied", f"{name} no-op"
+
+        @functools.wraps(method)
+        def counted(*args, **kwargs):
+            performed = method(*args, **kwargs)
+            counters[applied if performed else no_op] += 1
+            return performed
+
+        return counted
+
+    @contextlib.contextmanager
+    def instrument(self) -> Iterator[Profiler]:
+        """Wraps the `PROFILED_METHODS` of `Schedule` and the
+        `PROFILED_BATCH_FUNCTIONS` for the duration of the block and restores the
+        originals afterwards."""
+        originals = [
+            (Schedule, name, vars(Schedule)[name]) for name in PROFILED_METHODS
+        ]
+        originals.extend(
+            (batch, name, vars(batch)[name]) for name in PROFILED_BATCH_FUNCTIONS
+        )
+
+        try:
+            for owner, name, function in originals:
+                if name in MUTATION_OPERATORS:
+                    function = self._counted(name, function)
+                setattr(owner, name, self._timed(name, function))
+            yield self
+        finally:
+            for owner, name, function in originals:
+                setattr(owner, name, function)
+
+    def report(self) -> str:
+        """Formats the collected timers and counters, slowest first.
+
+        Returns
+        -------
+        str
+        """
+        total = time.perf_counter() - self._start
+        name_width = max(map(len, [*self.timers, *self.counters, "Total"]))
+
+        lines = [
+            f"{'Timer':<{name_width}} {'Calls':>10} {'Seconds':>10}"
+            f" {'us/call':>10} {'Share':>7}"
+        ]
+        for name, (calls, seconds) in sorted(
+            self.timers.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            if not calls:
+                continue
+            lines.append(
+                f"{name:<{name_width}} {calls:>10} {seconds:>10.3f}"
+                f" {seconds / calls * 1e6:>10.1f} {seconds / total:>7.1%}"
+            )
+        lines.append(f"{'Total':<{name_width}} {'':>10} {total:>10.3f}")
+
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'Counter':<{name_width}} {'Count':>10}")
+            lines.extend(
+                f"{name:<{name_width}} {count:>10}"
+                for name, count in sorted(self.counters.items())
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import math
+import random
+
+# Success probability under which `bernoulli_indices` skips over the failures.
+_GEOMETRIC_BELOW = 0.25
+
+
+class RandomStream(random.Random):
+    """Source of randomness of a run, passed explicitly instead of using the
+    global `random` module.
+
+    A run draws from one root stream seeded once. Every individual, crossover
+    pair and island gets a child stream seeded from the root in a fixed order,
+    before the work is split between processes, so a seeded run gives the same
+    result for any number of workers.
+
+    Parameters
+    ----------
+    seed : int, optional
+        Seed of the stream, the operating system's randomness if None.
+    """
+
+    def seeds(self, count: int) -> list[int]:
+        """Draws seeds of `count` child streams."""
+        return [self.getrandbits(64) for _ in range(count)]
+
+    def spawn(self, count: int) -> list[RandomStream]:
+        """Derives `count` independent child streams."""
+        return [RandomStream(seed) for seed in self.seeds(count)]
+
+
+def bernoulli_indices(rng: random.Random, count: int, probability: float) -> list[int]:
+    """Draws `count` independent trials succeeding with `probability` at once.
+
+    Parameters
+    ----------
+    rng : random.Random
+    count : int
+    probability : float
+
+    Returns
+    -------
+    list[int]
+        Positions of the successful trials, in increasing order.
+
+    Notes
+    -----
+    Below `_GEOMETRIC_BELOW` the gaps between successes are drawn from the
+    geometric distribution, so the cost is one draw per success instead of one
+    per trial. Above it the trials are drawn in one comprehension, which is
+    cheaper than a logarithm per success.
+    """
+    if probability <= 0 or count <= 0:
+        return []
+    if probability >= 1:
+        return list(range(count))
+    if probability >= _GEOMETRIC_BELOW:
+        draw = rng.random
+        return [position for position in range(count) if draw() < probability]
+
+    log_failure = math.log1p(-probability)
+    indices = []
+    position = -1
+    while True:
+        # 1 - random() is in (0, 1], so the logarithm is finite.
+        position += 1 + int(math.log(1.0 - rng.random()) / log_failure)
+        if position >= count:
+            return indices
+        indices.append(position)
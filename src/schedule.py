@@ -1,18 +1,503 @@
 from __future__ import annotations
 
+import math
 import random
+import warnings
+from array import array
 
+from src.bitset import bit_positions, full_mask, random_bit
 from src.parameters import EvolutionParameters, Parameters
+from src.rng import bernoulli_indices
 from src.types import Group, Hall, Lecturer, Slot, TimeSlot
 
+_HALL, _LECTURER, _GROUP = range(3)
+
+_INDEX_ATTRIBUTES = frozenset(
+    [
+        "_hall_masks",
+        "_lecturer_masks",
+        "_group_masks",
+        "_time_slot_hall_masks",
+        "_time_slot_lecturer_masks",
+        "_overbooked",
+        "_conflicts",
+        "_group_windows",
+        "_lecturer_windows",
+        "_non_profile_slots",
+        "_hall_excess",
+        "_capacity_overflow",
+        "_time_slot_counts",
+        "_genome_hash",
+    ]
+)
+
+# Positions of the lesson properties in `Schedule._genome_arrays`.
+_GROUP_FIELD, _SUBJECT_FIELD, _LECTURER_FIELD, _HALL_FIELD, _TIME_SLOT_FIELD = range(5)
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _field_hash(lesson: int, field: int, value: int) -> int:
+    """Hashes one lesson property with the splitmix64 finalizer.
+
+    Unlike the builtin `hash` it does not depend on the interpreter's hash seed,
+    so genome hashes can be compared across processes.
+    """
+    x = ((lesson << 35) | (field << 32) | value) + 0x9E3779B97F4A7C15
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return x ^ (x >> 31)
+
+
+def _empty_ids() -> array[int]:
+    return array("i")
+
 
 class Schedule:
     def __init__(self, parameters: Parameters) -> None:
-        self.grid: list[Slot] = []
         self.parameters = parameters
 
+        # The grid is stored as parallel arrays, one entry per lesson. Every
+        # value is a position in the corresponding `Parameters` list.
+        self.group_ids: array[int] = _empty_ids()
+        self.subject_ids: array[int] = _empty_ids()
+        self.lecturer_ids: array[int] = _empty_ids()
+        self.hall_ids: array[int] = _empty_ids()
+        self.time_slot_ids: array[int] = _empty_ids()
+
+        self._reset_totals()
+
+    def __getattr__(self, name: str):
+        # The occupancy index and the running totals are built lazily, so that
+        # schedules restored from a genome only pay for them when queried.
+        if name == "_genome_hash":
+            # Hashing alone is far cheaper, so a restored schedule can be looked
+            # up in a `FitnessCache` without building its index.
+            self._genome_hash = 0
+            for lesson in range(len(self)):
+                self._genome_hash ^= self._lesson_hash(lesson)
+            return self._genome_hash
+        if name in _INDEX_ATTRIBUTES:
+            self._reset_totals()
+            return getattr(self, name)
+
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
     def __str__(self) -> str:
-        return "\n".join([str(slot) for slot in self.grid])
+        return "\n".join([str(slot) for slot in self.to_slots()])
+
+    def __len__(self) -> int:
+        return len(self.group_ids)
+
+    def to_slots(self) -> list[Slot]:
+        """Builds a view of the grid made of `Slot` objects.
+
+        Returns
+        -------
+        list[Slot]
+            Freshly created slots, modifying them does not affect the schedule.
+        """
+        parameters = self.parameters
+        return [
+            Slot(
+                group=parameters.groups[group_id],
+                subject=parameters.subjects[subject_id],
+                lecturer=parameters.lecturers[lecturer_id],
+                hall=parameters.halls[hall_id],
+                time_slot=parameters.time_slots[time_slot_id],
+            )
+            for group_id, subject_id, lecturer_id, hall_id, time_slot_id in zip(
+                self.group_ids,
+                self.subject_ids,
+                self.lecturer_ids,
+                self.hall_ids,
+                self.time_slot_ids,
+            )
+        ]
+
+    def clone(self) -> Schedule:
+        """Copies the schedule's lesson assignments.
+
+        Returns
+        -------
+        Schedule
+            Independent schedule sharing the immutable `parameters`.
+
+        Notes
+        -----
+        Only the grid arrays and the occupancy index are copied, the cost is
+        proportional to the number of lessons rather than to the whole problem.
+        """
+        schedule = type(self).__new__(type(self))
+        schedule.parameters = self.parameters
+        (
+            schedule.group_ids,
+            schedule.subject_ids,
+            schedule.lecturer_ids,
+            schedule.hall_ids,
+            schedule.time_slot_ids,
+        ) = (ids[:] for ids in self._genome_arrays())
+
+        # Copy whatever part of the lazily built index already exists.
+        state = vars(self)
+        for name in _INDEX_ATTRIBUTES.intersection(state):
+            value = state[name]
+            if isinstance(value, (list, dict)):
+                value = value.copy()
+            setattr(schedule, name, value)
+
+        return schedule
+
+    def is_indexed(self) -> bool:
+        """Whether the occupancy index and the running totals have been built, i.e.
+        whether the `count_*` methods are O(1) for this schedule."""
+        return "_hall_masks" in vars(self)
+
+    def build_index(self) -> None:
+        """Builds the occupancy index and the running totals now instead of on
+        their first use."""
+        if not self.is_indexed():
+            self._reset_totals()
+
+    def __deepcopy__(self, memo: dict) -> Schedule:
+        return self.clone()
+
+    def to_genome(self) -> bytes:
+        """Packs the grid arrays into a compact genome.
+
+        Returns
+        -------
+        bytes
+            Raw contents of the group, subject, lecturer, hall and time slot
+            arrays, one after another.
+        """
+        return b"".join(ids.tobytes() for ids in self._genome_arrays())
+
+    @classmethod
+    def from_genome(
+        cls, parameters: Parameters, genome: bytes, genome_hash: int | None = None
+    ) -> Schedule:
+        """Restores a schedule packed with `to_genome`.
+
+        Parameters
+        ----------
+        parameters : Parameters
+            Parameters of the schedule the genome was taken from.
+        genome : bytes
+        genome_hash : int, optional
+            Already known `genome_hash` of the schedule, saves building the
+            occupancy index just to hash the genome.
+
+        Returns
+        -------
+        Schedule
+        """
+        schedule = cls.__new__(cls)
+        schedule.parameters = parameters
+
+        arrays = [_empty_ids() for _ in range(5)]
+        size = len(genome) // len(arrays)
+        for position, ids in enumerate(arrays):
+            ids.frombytes(genome[position * size : (position + 1) * size])
+
+        (
+            schedule.group_ids,
+            schedule.subject_ids,
+            schedule.lecturer_ids,
+            schedule.hall_ids,
+            schedule.time_slot_ids,
+        ) = arrays
+
+        if genome_hash is not None:
+            schedule._genome_hash = genome_hash
+
+        return schedule
+
+    def to_state(self) -> tuple[tuple[array[int], ...], dict[str, object]]:
+        """Packs the grid arrays together with whatever part of the occupancy
+        index and the running totals is built, for sending the schedule to
+        another process.
+
+        Returns
+        -------
+        tuple[tuple[array[int], ...], dict[str, object]]
+            Grid arrays and index attributes, see `from_state`.
+
+        Notes
+        -----
+        Unlike a genome, the receiver does not have to rebuild the index,
+        which costs far more than mutating and scoring the schedule.
+        """
+        state = vars(self)
+        return self._genome_arrays(), {
+            name: state[name] for name in _INDEX_ATTRIBUTES.intersection(state)
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        parameters: Parameters,
+        state: tuple[tuple[array[int], ...], dict[str, object]],
+    ) -> Schedule:
+        """Restores a schedule packed with `to_state`, taking over the given
+        objects without copying them.
+
+        Parameters
+        ----------
+        parameters : Parameters
+            Parameters of the schedule the state was taken from.
+        state : tuple[tuple[array[int], ...], dict[str, object]]
+
+        Returns
+        -------
+        Schedule
+        """
+        arrays, index = state
+        schedule = cls.__new__(cls)
+        schedule.parameters = parameters
+        (
+            schedule.group_ids,
+            schedule.subject_ids,
+            schedule.lecturer_ids,
+            schedule.hall_ids,
+            schedule.time_slot_ids,
+        ) = arrays
+        for name, value in index.items():
+            setattr(schedule, name, value)
+
+        return schedule
+
+    def _genome_arrays(self) -> tuple[array[int], ...]:
+        return (
+            self.group_ids,
+            self.subject_ids,
+            self.lecturer_ids,
+            self.hall_ids,
+            self.time_slot_ids,
+        )
+
+    def add_lesson(
+        self,
+        group_id: int,
+        subject_id: int,
+        lecturer_id: int,
+        hall_id: int,
+        time_slot_id: int,
+    ) -> int:
+        """Appends a lesson to the grid.
+
+        Parameters
+        ----------
+        group_id : int
+        subject_id : int
+        lecturer_id : int
+        hall_id : int
+        time_slot_id : int
+
+        Returns
+        -------
+        int
+            Index of the new lesson.
+        """
+        self.group_ids.append(group_id)
+        self.subject_ids.append(subject_id)
+        self.lecturer_ids.append(lecturer_id)
+        self.hall_ids.append(hall_id)
+        self.time_slot_ids.append(time_slot_id)
+
+        lesson = len(self.group_ids) - 1
+        self._track(lesson, 1)
+        self._genome_hash ^= self._lesson_hash(lesson)
+        return lesson
+
+    def _lesson_hash(self, lesson: int) -> int:
+        lesson_hash = 0
+        for field, ids in enumerate(self._genome_arrays()):
+            lesson_hash ^= _field_hash(lesson, field, ids[lesson])
+        return lesson_hash
+
+    def genome_hash(self) -> int:
+        """Returns a 64-bit hash of the lesson assignments.
+
+        Returns
+        -------
+        int
+            Hash that is equal for schedules with equal grids, regardless of
+            the order of mutations that produced them.
+
+        Notes
+        -----
+        The hash is the XOR of per-property hashes, so it is kept up to date in
+        O(1) per changed property.
+        """
+        return self._genome_hash
+
+    def _reset_totals(self) -> None:
+        """Rebuilds the occupancy index and the running penalty totals from the
+        grid arrays.
+
+        Notes
+        -----
+        Occupancy is kept as one integer bitmask over time slots for every
+        hall, lecturer and group, plus one bitmask over halls and lecturers for
+        every time slot. A lesson that collides with an already occupied bit is
+        counted in `_overbooked` instead, so the masks stay exact when the
+        collision is resolved later.
+        """
+        parameters = self.parameters
+        self._hall_masks = [0] * len(parameters.halls)
+        self._lecturer_masks = [0] * len(parameters.lecturers)
+        self._group_masks = [0] * len(parameters.groups)
+        self._time_slot_hall_masks = [0] * len(parameters.time_slots)
+        self._time_slot_lecturer_masks = [0] * len(parameters.time_slots)
+        self._overbooked: dict[tuple[int, int, int], int] = {}
+        self._conflicts = 0
+
+        self._group_windows = 0
+        self._lecturer_windows = 0
+        self._non_profile_slots = 0
+        self._hall_excess: dict[int, int] = {}
+        self._capacity_overflow: float | None = 0.0
+        self._time_slot_counts = [0] * len(parameters.time_slots)
+        self._genome_hash = 0
+
+        for lesson in range(len(self)):
+            self._track(lesson, 1)
+            self._genome_hash ^= self._lesson_hash(lesson)
+
+    def _occupy(
+        self, kind: int, masks: list[int], entity_id: int, time_slot_id: int, step: int
+    ) -> bool:
+        """Marks (`step=1`) or releases (`step=-1`) a time slot of an entity.
+
+        Returns
+        -------
+        bool
+            Whether the entity's mask has changed.
+        """
+        bit = 1 << time_slot_id
+
+        if step > 0 and not masks[entity_id] & bit:
+            masks[entity_id] |= bit
+            return True
+
+        key = (kind, entity_id, time_slot_id)
+        extra = self._overbooked.get(key, 0)
+
+        if step > 0:
+            self._overbooked[key] = extra + 1
+            self._conflicts += 1
+            return False
+
+        if extra:
+            self._conflicts -= 1
+            if extra > 1:
+                self._overbooked[key] = extra - 1
+            else:
+                del self._overbooked[key]
+            return False
+
+        masks[entity_id] ^= bit
+        return True
+
+    def _track(self, lesson: int, step: int) -> None:
+        """Adds (`step=1`) or removes (`step=-1`) the lesson's contribution to
+        the occupancy index and the running penalty totals.
+        """
+        parameters = self.parameters
+        group_id = self.group_ids[lesson]
+        lecturer_id = self.lecturer_ids[lesson]
+        hall_id = self.hall_ids[lesson]
+        time_slot_id = self.time_slot_ids[lesson]
+
+        day = parameters.time_slot_days[time_slot_id]
+        count_day_windows = parameters.count_day_windows
+
+        if self._occupy(_HALL, self._hall_masks, hall_id, time_slot_id, step):
+            self._time_slot_hall_masks[time_slot_id] ^= 1 << hall_id
+
+        windows_before = count_day_windows(day, self._lecturer_masks[lecturer_id])
+        if self._occupy(
+            _LECTURER, self._lecturer_masks, lecturer_id, time_slot_id, step
+        ):
+            self._time_slot_lecturer_masks[time_slot_id] ^= 1 << lecturer_id
+            self._lecturer_windows += (
+                count_day_windows(day, self._lecturer_masks[lecturer_id])
+                - windows_before
+            )
+
+        windows_before = count_day_windows(day, self._group_masks[group_id])
+        if self._occupy(_GROUP, self._group_masks, group_id, time_slot_id, step):
+            self._group_windows += (
+                count_day_windows(day, self._group_masks[group_id]) - windows_before
+            )
+
+        if self.subject_ids[lesson] not in parameters.lecturer_subject_ids[lecturer_id]:
+            self._non_profile_slots += step
+
+        excess = (
+            parameters.groups[group_id].capacity - parameters.halls[hall_id].capacity
+        )
+        if excess > 0:
+            hall_excess = self._hall_excess.get(hall_id, 0) + step * excess
+            if hall_excess:
+                self._hall_excess[hall_id] = hall_excess
+            else:
+                del self._hall_excess[hall_id]
+            self._capacity_overflow = None
+
+        self._time_slot_counts[time_slot_id] += step
+
+    def _assign(
+        self,
+        lesson: int,
+        lecturer_id: int | None = None,
+        hall_id: int | None = None,
+        time_slot_id: int | None = None,
+    ) -> None:
+        """Changes properties of a lesson keeping the running totals in sync.
+
+        Parameters
+        ----------
+        lesson : int
+            Index of the lesson to change.
+        lecturer_id : int, optional
+        hall_id : int, optional
+        time_slot_id : int, optional
+        """
+        self._track(lesson, -1)
+
+        for field, ids, value in (
+            (_LECTURER_FIELD, self.lecturer_ids, lecturer_id),
+            (_HALL_FIELD, self.hall_ids, hall_id),
+            (_TIME_SLOT_FIELD, self.time_slot_ids, time_slot_id),
+        ):
+            if value is not None:
+                self._genome_hash ^= _field_hash(lesson, field, ids[lesson])
+                self._genome_hash ^= _field_hash(lesson, field, value)
+                ids[lesson] = value
+
+        self._track(lesson, 1)
+
+    def _available_lecturer_ids(self, time_slot_id: int) -> list[int]:
+        occupied = self._time_slot_lecturer_masks[time_slot_id]
+        return bit_positions(full_mask(len(self.parameters.lecturers)) & ~occupied)
+
+    def _available_hall_ids(self, time_slot_id: int) -> list[int]:
+        occupied = self._time_slot_hall_masks[time_slot_id]
+        return bit_positions(full_mask(len(self.parameters.halls)) & ~occupied)
+
+    def _available_time_slot_ids(
+        self, hall_id: int, lecturer_id: int, group_id: int
+    ) -> list[int]:
+        occupied = (
+            self._hall_masks[hall_id]
+            | self._lecturer_masks[lecturer_id]
+            | self._group_masks[group_id]
+        )
+        return bit_positions(full_mask(len(self.parameters.time_slots)) & ~occupied)
 
     def get_available_lecturers(self, time_slot: TimeSlot) -> list[Lecturer]:
         """Extract available lecturers for a specific timeslot.
@@ -26,14 +511,10 @@ class Schedule:
         -------
         list[Lecturer]
         """
-        scheduled_slots = [slot for slot in self.grid if slot.time_slot == time_slot]
-        scheduled_lecturers = {
-            slot.lecturer for slot in scheduled_slots if slot.lecturer
-        }
+        time_slot_id = self.parameters.time_slot_index[time_slot]
         return [
-            lecturer
-            for lecturer in self.parameters.lecturers
-            if lecturer not in scheduled_lecturers
+            self.parameters.lecturers[lecturer_id]
+            for lecturer_id in self._available_lecturer_ids(time_slot_id)
         ]
 
     def get_available_halls(self, time_slot: TimeSlot) -> list[Hall]:
@@ -48,9 +529,11 @@ class Schedule:
         -------
         list[Hall]
         """
-        scheduled_slots = [slot for slot in self.grid if slot.time_slot == time_slot]
-        scheduled_halls = {slot.hall for slot in scheduled_slots if slot.hall}
-        return [hall for hall in self.parameters.halls if hall not in scheduled_halls]
+        time_slot_id = self.parameters.time_slot_index[time_slot]
+        return [
+            self.parameters.halls[hall_id]
+            for hall_id in self._available_hall_ids(time_slot_id)
+        ]
 
     def get_available_time_slots(
         self, hall: Hall, lecturer: Lecturer, group: Group
@@ -68,77 +551,109 @@ class Schedule:
         -------
         list[TimeSlot]
         """
-        scheduled_slots = [
-            slot
-            for slot in self.grid
-            if slot.hall == hall or slot.lecturer == lecturer or slot.group == group
-        ]
-        occupied_time_slots = {slot.time_slot for slot in scheduled_slots}
+        available_time_slot_ids = self._available_time_slot_ids(
+            self.parameters.hall_index[hall],
+            self.parameters.lecturer_index[lecturer],
+            self.parameters.group_index[group],
+        )
         return [
-            time_slot
-            for time_slot in self.parameters.time_slots
-            if time_slot not in occupied_time_slots
+            self.parameters.time_slots[time_slot_id]
+            for time_slot_id in available_time_slot_ids
         ]
 
-    def _mutate_hall(self, slot: Slot) -> None:
-        """Makes in-place mutation of slot's property `hall`.
+    def _mutate_hall(self, lesson: int, rng: random.Random | None = None) -> bool:
+        """Makes in-place mutation of lesson's property `hall`.
 
         Parameters
         ----------
-        slot : Slot
-            Slot that needs to be mutated.
+        lesson : int
+            Index of the lesson that needs to be mutated.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+
+        Returns
+        -------
+        bool
+            Whether the mutation has been performed.
 
         Notes
         -----
         If there is no available halls no mutation is being performed.
         """
-        available_halls = self.get_available_halls(slot.time_slot)
+        available_halls = self._available_hall_ids(self.time_slot_ids[lesson])
 
-        if available_halls:
-            slot.hall = random.choice(available_halls)
+        if not available_halls:
+            return False
 
-    def _mutate_lecturer(self, slot: Slot) -> None:
-        """Makes in-place mutation of slot's property `lecturer`.
+        self._assign(lesson, hall_id=(rng or random).choice(available_halls))
+        return True
+
+    def _mutate_lecturer(self, lesson: int, rng: random.Random | None = None) -> bool:
+        """Makes in-place mutation of lesson's property `lecturer`.
 
         Parameters
         ----------
-        slot : Slot
-            Slot that needs to be mutated.
+        lesson : int
+            Index of the lesson that needs to be mutated.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+
+        Returns
+        -------
+        bool
+            Whether the mutation has been performed.
 
         Notes
         -----
         If there is no available lecturers no mutation is being performed.
         """
-        available_lecturers = self.get_available_lecturers(slot.time_slot)
+        available_lecturers = self._available_lecturer_ids(self.time_slot_ids[lesson])
+
+        if not available_lecturers:
+            return False
 
-        if available_lecturers:
-            slot.lecturer = random.choice(available_lecturers)
+        self._assign(lesson, lecturer_id=(rng or random).choice(available_lecturers))
+        return True
 
-    def _mutate_timeslot(self, slot: Slot) -> None:
-        """Makes in-place mutation of slot's property `time_slot`.
+    def _mutate_timeslot(self, lesson: int, rng: random.Random | None = None) -> bool:
+        """Makes in-place mutation of lesson's property `time_slot`.
 
         Parameters
         ----------
-        slot : Slot
-            Slot that needs to be mutated.
+        lesson : int
+            Index of the lesson that needs to be mutated.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+
+        Returns
+        -------
+        bool
+            Whether the mutation has been performed.
 
         Notes
         -----
         If there is no available time slots no mutation is being performed.
         """
-        available_time_slots = self.get_available_time_slots(
-            slot.hall, slot.lecturer, slot.group
+        available_time_slots = self._available_time_slot_ids(
+            self.hall_ids[lesson], self.lecturer_ids[lesson], self.group_ids[lesson]
         )
 
-        if available_time_slots:
-            slot.time_slot = random.choice(available_time_slots)
+        if not available_time_slots:
+            return False
+
+        self._assign(lesson, time_slot_id=(rng or random).choice(available_time_slots))
+        return True
 
-    def mutate(self, evolution_params: EvolutionParameters) -> None:
+    def mutate(
+        self, evolution_params: EvolutionParameters, rng: random.Random | None = None
+    ) -> None:
         """Makes a mutation of the shedule based on provided parameters.
 
         Parameters
         ----------
         evolution_params : EvolutionParameters
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
 
         Notes
         -----
@@ -146,91 +661,377 @@ class Schedule:
         - With probability `hall_prob` apply mutation `change hall`
         - With probability `lecturer_prob` apply mutation `change lecturer`
         - With probability `time_slot_prob` apply mutation `change time slot`
+
+        Only `mutable_lessons` are considered when it is set. The lessons to
+        mutate are drawn in one batch, see `src.rng.bernoulli_indices`.
         """
-        for slot in self.grid:
-            if random.random() > evolution_params.mut_prob:
-                continue
+        rng = rng or random
+        lessons = evolution_params.mutable_lessons
+        if lessons is None:
+            lessons = range(len(self))
 
-            if random.random() < evolution_params.hall_prob:
-                self._mutate_hall(slot=slot)
+        for position in bernoulli_indices(rng, len(lessons), evolution_params.mut_prob):
+            lesson = lessons[position]
 
-            if random.random() < evolution_params.lecturer_prob:
-                self._mutate_lecturer(slot=slot)
+            if rng.random() < evolution_params.hall_prob:
+                self._mutate_hall(lesson=lesson, rng=rng)
 
-            if random.random() < evolution_params.time_slot_prob:
-                self._mutate_timeslot(slot=slot)
+            if rng.random() < evolution_params.lecturer_prob:
+                self._mutate_lecturer(lesson=lesson, rng=rng)
 
-    def count_total_windows(self) -> int:
-        """Calculates the total number of "windows" (gaps) in the schedule across
-        all groups.
+            if rng.random() < evolution_params.time_slot_prob:
+                self._mutate_timeslot(lesson=lesson, rng=rng)
+
+    def clashes(self, lesson: int) -> tuple[bool, bool, bool]:
+        """Checks whether other lessons take the lesson's hall, lecturer or group
+        at the same time slot.
+
+        Parameters
+        ----------
+        lesson : int
 
         Returns
         -------
-        int
-            The total count of windows across all groups.
+        tuple[bool, bool, bool]
+            Hall, lecturer and group clash flags.
         """
-        total_windows = 0
+        time_slot_id = self.time_slot_ids[lesson]
+        return (
+            (_HALL, self.hall_ids[lesson], time_slot_id) in self._overbooked,
+            (_LECTURER, self.lecturer_ids[lesson], time_slot_id) in self._overbooked,
+            (_GROUP, self.group_ids[lesson], time_slot_id) in self._overbooked,
+        )
 
-        for group in self.parameters.groups:
-            group_windows = 0
-            group_slots = [slot for slot in self.grid if slot.group == group]
+    def is_free(
+        self, group_id: int, lecturer_id: int, hall_id: int, time_slot_id: int
+    ) -> bool:
+        """Checks whether a group, a lecturer and a hall all have no lesson at a
+        time slot.
 
-            slots_by_day = {}
-            for slot in group_slots:
-                if slot.time_slot.day not in slots_by_day:
-                    slots_by_day[slot.time_slot.day] = []
-                slots_by_day[slot.time_slot.day].append(slot)
+        Parameters
+        ----------
+        group_id : int
+        lecturer_id : int
+        hall_id : int
+        time_slot_id : int
 
-            for _, slots in slots_by_day.items():
-                sorted_slots = sorted(slots, key=lambda s: s.time_slot.time)
+        Returns
+        -------
+        bool
+        """
+        occupied = (
+            self._group_masks[group_id]
+            | self._lecturer_masks[lecturer_id]
+            | self._hall_masks[hall_id]
+        )
+        return not occupied >> time_slot_id & 1
 
-                for i in range(len(sorted_slots) - 1):
-                    current_lesson = sorted_slots[i].time_slot.time
-                    next_lesson = sorted_slots[i + 1].time_slot.time
+    def copy_lessons(self, other: Schedule, lessons: list[int]) -> None:
+        """Takes over lecturer, hall and time slot of some lessons from another
+        schedule of the same lessons.
 
-                    gap = next_lesson - current_lesson - 1
-                    if gap > 0:
-                        group_windows += gap
+        Parameters
+        ----------
+        other : Schedule
+        lessons : list[int]
+            Indices of the lessons to copy.
+        """
+        for lesson in lessons:
+            self._assign(
+                lesson,
+                lecturer_id=other.lecturer_ids[lesson],
+                hall_id=other.hall_ids[lesson],
+                time_slot_id=other.time_slot_ids[lesson],
+            )
 
-            total_windows += group_windows
+    def _pick_lecturer(
+        self, lesson: int, lecturer_ids: list[int], rng: random.Random
+    ) -> int:
+        subject_id = self.subject_ids[lesson]
+        lecturer_subject_ids = self.parameters.lecturer_subject_ids
+        qualified = [
+            lecturer_id
+            for lecturer_id in lecturer_ids
+            if subject_id in lecturer_subject_ids[lecturer_id]
+        ]
+        return rng.choice(qualified or lecturer_ids)
 
-        return total_windows
+    def _pick_hall(self, lesson: int, hall_ids: list[int], rng: random.Random) -> int:
+        group_size = self.parameters.groups[self.group_ids[lesson]].capacity
+        halls = self.parameters.halls
+        fitting = [
+            hall_id for hall_id in hall_ids if halls[hall_id].capacity >= group_size
+        ]
+        return rng.choice(fitting or hall_ids)
 
-    def count_total_lecturer_windows(self) -> int:
-        """Calculates the total number of "windows" (gaps) in the schedule
-        across all lecturers.
+    def repair_clashes(
+        self, lessons: list[int], rng: random.Random | None = None
+    ) -> int:
+        """Moves the given lessons out of hall, lecturer and group clashes.
+
+        Parameters
+        ----------
+        lessons : list[int]
+            Indices of the lessons to repair, e.g. the ones changed by crossover.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
 
         Returns
         -------
         int
-            The total count of windows across all lecturers.
+            Number of lessons that are still clashing because there was no
+            place for them.
+
+        Notes
+        -----
+        A clashing hall or lecturer is replaced by a free one at the same time
+        slot first, preferring halls that fit the group and lecturers who can
+        teach the subject. If that is not possible the lesson moves to a time
+        slot where its group is free.
         """
-        total_windows = 0
+        rng = rng or random
+        unresolved = 0
 
-        for lecturer in self.parameters.lecturers:
-            lecturer_windows = 0
-            lecturer_slots = [slot for slot in self.grid if slot.lecturer == lecturer]
+        for lesson in lessons:
+            hall_clash, lecturer_clash, group_clash = self.clashes(lesson)
+            if not (hall_clash or lecturer_clash or group_clash):
+                continue
+
+            time_slot_id = self.time_slot_ids[lesson]
+            if not group_clash:
+                hall_ids = self._available_hall_ids(time_slot_id)
+                lecturer_ids = self._available_lecturer_ids(time_slot_id)
+
+                if (hall_ids or not hall_clash) and (
+                    lecturer_ids or not lecturer_clash
+                ):
+                    self._assign(
+                        lesson,
+                        hall_id=(
+                            self._pick_hall(lesson, hall_ids, rng)
+                            if hall_clash
+                            else None
+                        ),
+                        lecturer_id=(
+                            self._pick_lecturer(lesson, lecturer_ids, rng)
+                            if lecturer_clash
+                            else None
+                        ),
+                    )
+                    continue
+
+            time_slot_ids = self._available_time_slot_ids(
+                self.hall_ids[lesson], self.lecturer_ids[lesson], self.group_ids[lesson]
+            )
+            if time_slot_ids:
+                self._assign(lesson, time_slot_id=rng.choice(time_slot_ids))
+                continue
 
-            slots_by_day = {}
-            for slot in lecturer_slots:
-                if slot.time_slot.day not in slots_by_day:
-                    slots_by_day[slot.time_slot.day] = []
-                slots_by_day[slot.time_slot.day].append(slot)
+            free_time_slots = full_mask(len(self.parameters.time_slots)) & ~(
+                self._group_masks[self.group_ids[lesson]]
+            )
+            candidates = bit_positions(free_time_slots)
+            rng.shuffle(candidates)
+
+            for time_slot_id in candidates:
+                hall_ids = self._available_hall_ids(time_slot_id)
+                lecturer_ids = self._available_lecturer_ids(time_slot_id)
+
+                if hall_ids and lecturer_ids:
+                    self._assign(
+                        lesson,
+                        hall_id=self._pick_hall(lesson, hall_ids, rng),
+                        lecturer_id=self._pick_lecturer(lesson, lecturer_ids, rng),
+                        time_slot_id=time_slot_id,
+                    )
+                    break
+            else:
+                unresolved += 1
+
+        return unresolved
+
+    def _lecturer_windows_delta(
+        self, lecturer_id: int, released: int | None, occupied: int | None
+    ) -> int:
+        """Change of a lecturer's windows if it released one time slot and
+        occupied another, either can be None."""
+        parameters = self.parameters
+        old_mask = self._lecturer_masks[lecturer_id]
+        new_mask = old_mask
+        days = set()
+        for time_slot_id in (released, occupied):
+            if time_slot_id is not None:
+                new_mask ^= 1 << time_slot_id
+                days.add(parameters.time_slot_days[time_slot_id])
+
+        return sum(
+            parameters.count_day_windows(day, new_mask)
+            - parameters.count_day_windows(day, old_mask)
+            for day in days
+        )
 
-            for _, slots in slots_by_day.items():
-                sorted_slots = sorted(slots, key=lambda s: s.time_slot.time)
+    def _hall_overflow(self, hall_id: int, group_id: int) -> float:
+        capacity = self.parameters.halls[hall_id].capacity
+        excess = self.parameters.groups[group_id].capacity - capacity
+        return excess / capacity if excess > 0 else 0.0
 
-                for i in range(len(sorted_slots) - 1):
-                    current_lesson = sorted_slots[i].time_slot.time
-                    next_lesson = sorted_slots[i + 1].time_slot.time
+    def time_slot_swap_delta(
+        self, lesson: int, other: int
+    ) -> tuple[int, int, int, float] | None:
+        """Evaluates swapping the time slots of two lessons of the same group.
 
-                    gap = next_lesson - current_lesson - 1
-                    if gap > 0:
-                        lecturer_windows += gap
+        Parameters
+        ----------
+        lesson : int
+        other : int
 
-            total_windows += lecturer_windows
+        Returns
+        -------
+        tuple[int, int, int, float] | None
+            Change of the group windows, lecturer windows, non-profile slots and
+            capacity overflow, None if the swap would make a clash. The time
+            slot counts do not change.
 
-        return total_windows
+        Notes
+        -----
+        Both lessons must be free of clashes. Only the occupancy masks of the
+        two lecturers are looked at, so the cost does not depend on the size of
+        the schedule.
+        """
+        time_slot_id = self.time_slot_ids[lesson]
+        other_time_slot_id = self.time_slot_ids[other]
+        lecturer_id = self.lecturer_ids[lesson]
+        other_lecturer_id = self.lecturer_ids[other]
+        hall_id = self.hall_ids[lesson]
+        other_hall_id = self.hall_ids[other]
+
+        if time_slot_id == other_time_slot_id:
+            return None
+        if lecturer_id != other_lecturer_id and (
+            self._lecturer_masks[lecturer_id] >> other_time_slot_id & 1
+            or self._lecturer_masks[other_lecturer_id] >> time_slot_id & 1
+        ):
+            return None
+        if hall_id != other_hall_id and (
+            self._hall_masks[hall_id] >> other_time_slot_id & 1
+            or self._hall_masks[other_hall_id] >> time_slot_id & 1
+        ):
+            return None
+
+        lecturer_windows = 0
+        if lecturer_id != other_lecturer_id:
+            lecturer_windows = self._lecturer_windows_delta(
+                lecturer_id, time_slot_id, other_time_slot_id
+            ) + self._lecturer_windows_delta(
+                other_lecturer_id, other_time_slot_id, time_slot_id
+            )
+
+        return 0, lecturer_windows, 0, 0.0
+
+    def hall_swap_delta(
+        self, lesson: int, other: int
+    ) -> tuple[int, int, int, float] | None:
+        """Evaluates swapping the halls of two lessons at the same time slot.
+
+        Parameters
+        ----------
+        lesson : int
+        other : int
+
+        Returns
+        -------
+        tuple[int, int, int, float] | None
+            Change of the penalties, see `time_slot_swap_delta`. None if the
+            lessons share their hall.
+        """
+        hall_id = self.hall_ids[lesson]
+        other_hall_id = self.hall_ids[other]
+        if hall_id == other_hall_id:
+            return None
+
+        group_id = self.group_ids[lesson]
+        other_group_id = self.group_ids[other]
+        capacity_overflow = (
+            self._hall_overflow(other_hall_id, group_id)
+            + self._hall_overflow(hall_id, other_group_id)
+            - self._hall_overflow(hall_id, group_id)
+            - self._hall_overflow(other_hall_id, other_group_id)
+        )
+
+        return 0, 0, 0, capacity_overflow
+
+    def lecturer_delta(
+        self, lesson: int, lecturer_id: int
+    ) -> tuple[int, int, int, float] | None:
+        """Evaluates giving a lesson to another lecturer.
+
+        Parameters
+        ----------
+        lesson : int
+        lecturer_id : int
+
+        Returns
+        -------
+        tuple[int, int, int, float] | None
+            Change of the penalties, see `time_slot_swap_delta`. None if the
+            lecturer already teaches the lesson or is busy at its time slot.
+        """
+        time_slot_id = self.time_slot_ids[lesson]
+        current_lecturer_id = self.lecturer_ids[lesson]
+        if (
+            lecturer_id == current_lecturer_id
+            or self._lecturer_masks[lecturer_id] >> time_slot_id & 1
+        ):
+            return None
+
+        lecturer_subject_ids = self.parameters.lecturer_subject_ids
+        subject_id = self.subject_ids[lesson]
+        non_profile_slots = (subject_id not in lecturer_subject_ids[lecturer_id]) - (
+            subject_id not in lecturer_subject_ids[current_lecturer_id]
+        )
+        lecturer_windows = self._lecturer_windows_delta(
+            current_lecturer_id, time_slot_id, None
+        ) + self._lecturer_windows_delta(lecturer_id, None, time_slot_id)
+
+        return 0, lecturer_windows, non_profile_slots, 0.0
+
+    def swap_time_slots(self, lesson: int, other: int) -> None:
+        """Swaps the time slots of two lessons, see `time_slot_swap_delta`."""
+        time_slot_id = self.time_slot_ids[lesson]
+        self._assign(lesson, time_slot_id=self.time_slot_ids[other])
+        self._assign(other, time_slot_id=time_slot_id)
+
+    def swap_halls(self, lesson: int, other: int) -> None:
+        """Swaps the halls of two lessons, see `hall_swap_delta`."""
+        hall_id = self.hall_ids[lesson]
+        self._assign(lesson, hall_id=self.hall_ids[other])
+        self._assign(other, hall_id=hall_id)
+
+    def reassign_lecturer(self, lesson: int, lecturer_id: int) -> None:
+        """Gives a lesson to another lecturer, see `lecturer_delta`."""
+        self._assign(lesson, lecturer_id=lecturer_id)
+
+    def count_total_windows(self) -> int:
+        """Calculates the total number of "windows" (gaps) in the schedule across
+        all groups.
+
+        Returns
+        -------
+        int
+            The total count of windows across all groups.
+        """
+        return self._group_windows
+
+    def count_total_lecturer_windows(self) -> int:
+        """Calculates the total number of "windows" (gaps) in the schedule
+        across all lecturers.
+
+        Returns
+        -------
+        int
+            The total count of windows across all lecturers.
+        """
+        return self._lecturer_windows
 
     def count_total_non_profile_slots(self) -> int:
         """Calculates the total number of slots across all lecturers where they are
@@ -241,14 +1042,7 @@ class Schedule:
         int
             The total count of non-profile slots across all lecturers.
         """
-        total_non_profile_slots = 0
-
-        for slot in self.grid:
-            lecturer = slot.lecturer
-            if lecturer and slot.subject.name not in lecturer.can_teach_subjects_names:
-                total_non_profile_slots += 1
-
-        return total_non_profile_slots
+        return self._non_profile_slots
 
     def count_capacity_overflows(self) -> float:
         """Calculates the total capacity overflow penalty for halls where the group size
@@ -260,20 +1054,42 @@ class Schedule:
             The sum of overflow percentages for all cases where a hall's
             capacity is exceeded.
         """
-        total_overflow_penalty = 0.0
+        if self._capacity_overflow is None:
+            halls = self.parameters.halls
+            self._capacity_overflow = math.fsum(
+                excess / halls[hall_id].capacity
+                for hall_id, excess in self._hall_excess.items()
+            )
+
+        return self._capacity_overflow
 
-        for slot in self.grid:
-            group_size = slot.group.capacity
-            hall_capacity = slot.hall.capacity
+    def count_conflicts(self) -> int:
+        """Counts double bookings of groups, lecturers and halls.
+
+        Returns
+        -------
+        int
+            Number of lessons that share their group, lecturer or hall with an
+            earlier lesson at the same time slot, counted once per kind, see
+            `src.validation` for the details.
+        """
+        return self._conflicts
 
-            if group_size > hall_capacity:
-                overflow_percentage = (group_size - hall_capacity) / hall_capacity
-                total_overflow_penalty += overflow_percentage
+    def count_time_slot_lessons(self) -> list[int]:
+        """Calculates the number of lessons scheduled at every time slot.
 
-        return total_overflow_penalty
+        Returns
+        -------
+        list[int]
+            Lesson count for each time slot, in the order of
+            `parameters.time_slots`.
+        """
+        return list(self._time_slot_counts)
 
     @classmethod
-    def create_basic_schedule(cls, parameters: Parameters) -> Schedule:
+    def create_basic_schedule(
+        cls, parameters: Parameters, rng: random.Random | None = None
+    ) -> Schedule:
         """Creates a simple schedule that satisfies the hard constraints:
         - One lecturer can conduct one lesson at a time in one hall with one group.
         - One group can have one lesson at a time.
@@ -283,76 +1099,53 @@ class Schedule:
         ----------
         parameters : Parameters
             The parameters required to generate the schedule.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
 
         Returns
         -------
         Schedule
             A new Schedule object with the grid populated.
         """
-
+        rng = rng or random
         schedule = cls(parameters)
-        schedule.grid = []
+        time_slot_ids = range(len(parameters.time_slots))
 
-        for group in parameters.groups:
-            shuffled_time_slots = iter(
-                random.sample(parameters.time_slots, len(parameters.time_slots))
-            )
-
-            for subject_name in group.subject_names:
-                subject = next(
-                    (subj for subj in parameters.subjects if subj.name == subject_name),
-                    None,
-                )
+        for group_id, group in enumerate(parameters.groups):
+            shuffled_time_slots = iter(rng.sample(time_slot_ids, len(time_slot_ids)))
 
-                if subject is None:
-                    continue
+            for subject_id in group.subject_ids:
+                subject = parameters.subjects[subject_id]
 
                 for _ in range(subject.hours):
                     while True:
                         try:
-                            time_slot = next(shuffled_time_slots)
-
-                            available_halls = [
-                                hall
-                                for hall in parameters.halls
-                                if hall
-                                not in [
-                                    slot.hall
-                                    for slot in schedule.grid
-                                    if slot.time_slot == time_slot
-                                ]
-                            ]
+                            time_slot_id = next(shuffled_time_slots)
+
+                            available_halls = schedule._available_hall_ids(time_slot_id)
 
                             if not available_halls:
                                 continue
 
-                            hall = random.choice(available_halls)
+                            hall_id = rng.choice(available_halls)
 
                             # Get available lecturers at this time slot
-                            available_lecturers = [
-                                lecturer
-                                for lecturer in parameters.lecturers
-                                if lecturer
-                                not in [
-                                    slot.lecturer
-                                    for slot in schedule.grid
-                                    if slot.time_slot == time_slot
-                                ]
-                            ]
+                            available_lecturers = schedule._available_lecturer_ids(
+                                time_slot_id
+                            )
 
                             if not available_lecturers:
                                 continue
 
-                            lecturer = random.choice(available_lecturers)
+                            lecturer_id = rng.choice(available_lecturers)
 
-                            slot = Slot(
-                                group=group,
-                                subject=subject,
-                                lecturer=lecturer,
-                                hall=hall,
-                                time_slot=time_slot,
+                            schedule.add_lesson(
+                                group_id=group_id,
+                                subject_id=subject_id,
+                                lecturer_id=lecturer_id,
+                                hall_id=hall_id,
+                                time_slot_id=time_slot_id,
                             )
-                            schedule.grid.append(slot)
                             break
 
                         except StopIteration:
@@ -363,3 +1156,170 @@ class Schedule:
                             break
 
         return schedule
+
+    @classmethod
+    def create_constructive_schedule(
+        cls, parameters: Parameters, rng: random.Random | None = None
+    ) -> Schedule:
+        """Creates a schedule with every lesson of every group, placing the most
+        constrained lessons first, see `place_lessons`.
+
+        Parameters
+        ----------
+        parameters : Parameters
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+
+        Returns
+        -------
+        Schedule
+
+        Notes
+        -----
+        Unlike `create_basic_schedule` no lesson is dropped.
+        """
+        schedule = cls(parameters)
+        schedule.place_lessons(parameters.required_lessons(), rng=rng)
+        return schedule
+
+    def place_lessons(
+        self, lessons: list[tuple[int, int]], rng: random.Random | None = None
+    ) -> list[int]:
+        """Adds lessons to the schedule, placing the most constrained ones first.
+
+        Parameters
+        ----------
+        lessons : list[tuple[int, int]]
+            Group and subject ids of the lessons, one entry per lesson.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+
+        Returns
+        -------
+        list[int]
+            Indices of the added lessons, in the order of `lessons`.
+
+        Notes
+        -----
+        Lessons are stored in the given order, so schedules built from the same
+        lessons can be compared and recombined lesson by lesson. They are placed
+        in another order: by the number of lecturers able to teach them, then
+        by the number of halls their group fits in, then by the load of the
+        group. Each one takes a time slot where its group is free, preferring
+        slots with a qualified lecturer and a fitting hall available. All checks
+        are done on the occupancy masks, so a lesson costs O(time slots).
+
+        A lesson without a free time slot is placed anyway and then moved by
+        `repair_clashes`. A warning reports the lessons that are still clashing.
+        """
+        rng = rng or random
+        parameters = self.parameters
+
+        num_time_slots = len(parameters.time_slots)
+        num_lecturers = len(parameters.lecturers)
+        num_halls = len(parameters.halls)
+        all_time_slots = full_mask(num_time_slots)
+        all_lecturers = full_mask(num_lecturers)
+        all_halls = full_mask(num_halls)
+        subject_lecturer_masks = parameters.subject_lecturer_masks
+        group_hall_masks = parameters.group_hall_masks
+
+        group_loads = [mask.bit_count() for mask in self._group_masks]
+        for group_id, _ in lessons:
+            group_loads[group_id] += 1
+
+        order = sorted(
+            range(len(lessons)),
+            key=lambda position: (
+                subject_lecturer_masks[lessons[position][1]].bit_count(),
+                group_hall_masks[lessons[position][0]].bit_count(),
+                -group_loads[lessons[position][0]],
+                rng.random(),
+            ),
+        )
+
+        start = len(self)
+        clashing = []
+        for position in order:
+            group_id, subject_id = lessons[position]
+            candidates = bit_positions(all_time_slots & ~self._group_masks[group_id])
+
+            best = None
+            for candidate in range(len(candidates)):
+                # Shuffle lazily, most lessons take one of the first candidates.
+                swap = rng.randrange(candidate, len(candidates))
+                candidates[candidate], candidates[swap] = (
+                    candidates[swap],
+                    candidates[candidate],
+                )
+                time_slot_id = candidates[candidate]
+
+                free_lecturers = all_lecturers & ~(
+                    self._time_slot_lecturer_masks[time_slot_id]
+                )
+                free_halls = all_halls & ~self._time_slot_hall_masks[time_slot_id]
+                if not (free_lecturers and free_halls):
+                    continue
+
+                qualified = free_lecturers & subject_lecturer_masks[subject_id]
+                fitting = free_halls & group_hall_masks[group_id]
+                misses = (not qualified) + (not fitting)
+                if best is None or misses < best[0]:
+                    best = (
+                        misses,
+                        time_slot_id,
+                        qualified or free_lecturers,
+                        fitting or free_halls,
+                    )
+                    if not misses:
+                        break
+
+            if best is None:
+                # Nowhere to go without a clash, repaired below.
+                time_slot_id = (
+                    candidates[0] if candidates else rng.randrange(num_time_slots)
+                )
+                lecturers = subject_lecturer_masks[subject_id] or all_lecturers
+                halls = group_hall_masks[group_id] or all_halls
+            else:
+                _, time_slot_id, lecturers, halls = best
+
+            self.add_lesson(
+                group_id=group_id,
+                subject_id=subject_id,
+                lecturer_id=random_bit(lecturers, num_lecturers, rng),
+                hall_id=random_bit(halls, num_halls, rng),
+                time_slot_id=time_slot_id,
+            )
+            if best is None:
+                clashing.append(start + position)
+
+        self._reorder(start, order)
+        unresolved = self.repair_clashes(clashing, rng=rng)
+        if unresolved:
+            warnings.warn(
+                f"{unresolved} lessons could not be placed without clashes.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+        return list(range(start, len(self)))
+
+    def _reorder(self, start: int, order: list[int]) -> None:
+        """Moves the lessons from `start` on, added in the given order of
+        positions, to `start + position`.
+
+        The occupancy index does not depend on the order of the lessons, only
+        the genome hash is updated.
+        """
+        lessons = range(start, len(self))
+        for lesson in lessons:
+            self._genome_hash ^= self._lesson_hash(lesson)
+
+        for ids in self._genome_arrays():
+            added = ids[start:]
+            for rank, position in enumerate(order):
+                ids[start + position] = added[rank]
+
+        for lesson in lessons:
+            self._genome_hash ^= self._lesson_hash(lesson)
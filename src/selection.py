@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import itertools
+import random
+from dataclasses import dataclass
+
+from src.schedule import Schedule
+
+# Selectors are called as `selector(population, fitness_scores, rng)` with the
+# scores already computed by `GeneticSchedule.evolve` and the root stream of the
+# run, and return a population of the same size. None of them evaluates fitness.
+
+
+def _ranking(fitness_scores: list[float]) -> list[int]:
+    """Positions of the individuals from the fittest to the least fit, ties in
+    population order."""
+    return sorted(
+        range(len(fitness_scores)), key=fitness_scores.__getitem__, reverse=True
+    )
+
+
+def _elites(
+    population: list[Schedule], ranking: list[int], elitism_ratio: float
+) -> list[Schedule]:
+    """The fittest individuals, kept as they are."""
+    return [population[i] for i in ranking[: int(elitism_ratio * len(population))]]
+
+
+def _shifted_weights(fitness_scores: list[float]) -> list[float] | None:
+    """Non-negative weights proportional to how much better than the worst
+    individual every one is, None if all are equally fit."""
+    worst = min(fitness_scores)
+    weights = [fitness_score - worst for fitness_score in fitness_scores]
+    return weights if any(weights) else None
+
+
+@dataclass
+class TournamentSelector:
+    """Selection with elitism and tournament selection.
+
+    Parameters
+    ----------
+    elitism_ratio : float, default=0.1
+        The ratio of elite individuals to retain from the population.
+    tournament_size : int, default=3
+        The number of individuals to sample for tournament selection.
+
+    Notes
+    -----
+    O(N log N) for the elites plus O(N * tournament_size).
+    """
+
+    elitism_ratio: float = 0.1
+    tournament_size: int = 3
+
+    def __call__(
+        self,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        ranking = _ranking(fitness_scores)
+        new_population = _elites(population, ranking, self.elitism_ratio)
+
+        while len(new_population) < len(population):
+            tournament = rng.sample(ranking, self.tournament_size)
+            winner = max(tournament, key=fitness_scores.__getitem__)
+            new_population.append(population[winner].clone())
+
+        return new_population
+
+
+@dataclass
+class FittestSelector:
+    """Selection that replicates the fittest individual to fill the entire new
+    population."""
+
+    def __call__(
+        self,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        fittest = max(range(len(population)), key=fitness_scores.__getitem__)
+
+        fittest_individual = population[fittest]
+
+        new_population = [fittest_individual.clone() for _ in range(len(population))]
+
+        return new_population
+
+
+@dataclass
+class RankSelector:
+    """Linear ranking selection: the probability of an individual depends on its
+    rank only, not on the scale of the fitness.
+
+    Parameters
+    ----------
+    elitism_ratio : float, default=0.1
+    pressure : float, default=1.5
+        Expected number of copies of the fittest individual, between 1 and 2.
+        The least fit one gets `2 - pressure`.
+
+    Notes
+    -----
+    O(N log N).
+    """
+
+    elitism_ratio: float = 0.1
+    pressure: float = 1.5
+
+    def __call__(
+        self,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        ranking = _ranking(fitness_scores)
+        new_population = _elites(population, ranking, self.elitism_ratio)
+
+        size = len(population)
+        span = max(size - 1, 1)
+        weights = [
+            self.pressure - 2 * (self.pressure - 1) * rank / span
+            for rank in range(size)
+        ]
+        picks = rng.choices(
+            ranking,
+            cum_weights=list(itertools.accumulate(weights)),
+            k=size - len(new_population),
+        )
+        new_population.extend(population[i].clone() for i in picks)
+
+        return new_population
+
+
+@dataclass
+class RouletteSelector:
+    """Fitness proportionate selection. Scores are shifted so that the least fit
+    individual gets no chance, all are equally likely if they are equally fit.
+
+    Parameters
+    ----------
+    elitism_ratio : float, default=0.1
+
+    Notes
+    -----
+    O(N log N).
+    """
+
+    elitism_ratio: float = 0.1
+
+    def __call__(
+        self,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        new_population = _elites(
+            population, _ranking(fitness_scores), self.elitism_ratio
+        )
+
+        count = len(population) - len(new_population)
+        weights = _shifted_weights(fitness_scores)
+        if weights is None:
+            picks = rng.choices(range(len(population)), k=count)
+        else:
+            picks = rng.choices(range(len(population)), weights=weights, k=count)
+        new_population.extend(population[i].clone() for i in picks)
+
+        return new_population
+
+
+@dataclass
+class StochasticUniversalSelector:
+    """Stochastic universal sampling: like `RouletteSelector`, but the
+    individuals are picked by evenly spaced pointers from one random offset,
+    so the number of copies of every individual is within one of its
+    expectation.
+
+    Parameters
+    ----------
+    elitism_ratio : float, default=0.1
+
+    Notes
+    -----
+    O(N log N) for the elites, the sampling itself is O(N).
+    """
+
+    elitism_ratio: float = 0.1
+
+    def __call__(
+        self,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        new_population = _elites(
+            population, _ranking(fitness_scores), self.elitism_ratio
+        )
+
+        count = len(population) - len(new_population)
+        if count == 0:
+            return new_population
+
+        weights = _shifted_weights(fitness_scores) or [1.0] * len(population)
+        cumulative = list(itertools.accumulate(weights))
+        step = cumulative[-1] / count
+        offset = rng.random() * step
+
+        position = 0
+        for pointer in range(count):
+            target = offset + pointer * step
+            # Pointers only grow, so the scan over the population is O(N).
+            while position < len(cumulative) - 1 and cumulative[position] <= target:
+                position += 1
+            new_population.append(population[position].clone())
+
+        return new_population
+
+
+@dataclass
+class TruncationSelector:
+    """Keeps the fittest share of the population and fills the rest with copies
+    of it, the fittest first.
+
+    Parameters
+    ----------
+    truncation_ratio : float, default=0.5
+        Share of the population allowed to reproduce.
+    elitism_ratio : float, default=0.1
+        Share of the population kept as is, the copies are clones.
+
+    Notes
+    -----
+    O(N log N).
+    """
+
+    truncation_ratio: float = 0.5
+    elitism_ratio: float = 0.1
+
+    def __call__(
+        self,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        rng: random.Random,
+    ) -> list[Schedule]:
+        ranking = _ranking(fitness_scores)
+        new_population = _elites(population, ranking, self.elitism_ratio)
+
+        parents = ranking[: max(1, int(self.truncation_ratio * len(population)))]
+        for i in itertools.islice(
+            itertools.cycle(parents), len(population) - len(new_population)
+        ):
+            new_population.append(population[i].clone())
+
+        return new_population
+
+
+SELECTORS = {
+    "fittest": FittestSelector,
+    "tournament": TournamentSelector,
+    "rank": RankSelector,
+    "roulette": RouletteSelector,
+    "sus": StochasticUniversalSelector,
+    "truncation": TruncationSelector,
+}
@@ -0,0 +1,645 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from typing import AsyncIterator
+
+from src.cache import FitnessCache
+from src.config import parse_config
+from src.crossover import CROSSOVERS
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
+from src.genetic import GeneticSchedule
+from src.io.export import build_views
+from src.local_search import LocalSearch
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.selection import SELECTORS
+from src.telemetry import GenerationRecord
+from src.validation import validate
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Largest accepted request body, configs are sent inline.
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Number of parsed configs every worker process keeps for later jobs.
+_WORKER_CONFIGS = 8
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+}
+
+# JSON values accepted for the annotations of `JobSpec` fields, booleans are
+# rejected even though they are ints.
+_JSON_TYPES = {"str": (str,), "int": (int,), "float": (int, float)}
+
+
+def _is_json_type(value: object, annotation: str) -> bool:
+    """Whether a decoded JSON value fits a field annotation such as
+    "float | None" or "dict[str, float]"."""
+    if annotation == "dict[str, float]":
+        return isinstance(value, dict) and all(
+            isinstance(key, str) and _is_json_type(item, "float")
+            for key, item in value.items()
+        )
+
+    allowed = annotation.split(" | ")
+    if value is None:
+        return "None" in allowed
+    return not isinstance(value, bool) and any(
+        isinstance(value, _JSON_TYPES[name]) for name in allowed if name != "None"
+    )
+
+
+@dataclass
+class JobSpec:
+    """A scheduling job: a config and the parameters of its evolution.
+
+    Parameters
+    ----------
+    config : str
+        Contents of the YAML config.
+    seed : int, default=0
+        Seed of the root stream, see `src.rng.RandomStream`.
+    selector : str, default="fittest"
+        Name of a selector of `src.selection.SELECTORS`.
+    crossover : str, optional
+        Name of an operator of `src.crossover.CROSSOVERS` applied with
+        probability `crossover_prob`. Offspring are only mutated if None.
+    weights : dict[str, float]
+        Fields of `WeightedFitness`, missing ones keep `DEFAULT_WEIGHTS`.
+    local_search_top : int, default=0
+        Number of selected schedules improved by local search, 0 disables it.
+
+    Other fields are passed to `EvolutionParameters` as they are.
+    """
+
+    config: str
+    seed: int = 0
+    selector: str = "fittest"
+    crossover: str | None = None
+    population_size: int = 100
+    num_of_generations: int = 50
+    mut_prob: float = 0.1
+    hall_prob: float = 0.2
+    lecturer_prob: float = 0.2
+    time_slot_prob: float = 0.2
+    crossover_prob: float = 0.8
+    max_wall_time: float | None = None
+    target_fitness: float | None = None
+    stagnation_generations: int | None = None
+    adaptive_mutation_window: int | None = None
+    weights: dict[str, float] = field(default_factory=dict)
+    local_search_top: int = 0
+
+    @classmethod
+    def from_json(cls, data: object) -> JobSpec:
+        """Validates a decoded JSON job.
+
+        Raises
+        ------
+        ValueError
+            If the job has no config, unknown fields, fields of the wrong type,
+            an unknown selector or crossover, or unknown weights.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("config"), str):
+            raise ValueError("A job needs a 'config' string with the YAML config.")
+
+        try:
+            spec = cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid job: {e}") from e
+
+        for spec_field in fields(spec):
+            value = getattr(spec, spec_field.name)
+            if not _is_json_type(value, spec_field.type):
+                raise ValueError(
+                    f"Job field '{spec_field.name}' must be {spec_field.type},"
+                    f" got {json.dumps(value)}."
+                )
+
+        if spec.selector not in SELECTORS:
+            raise ValueError(
+                f"Unknown selector: {spec.selector}, expected one of"
+                f" {tuple(SELECTORS)}."
+            )
+        if spec.crossover is not None and spec.crossover not in CROSSOVERS:
+            raise ValueError(
+                f"Unknown crossover: {spec.crossover}, expected one of"
+                f" {tuple(CROSSOVERS)}."
+            )
+        unknown = set(spec.weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown fitness weights: {sorted(unknown)}.")
+
+        return spec
+
+    def evolution_parameters(self, **overrides) -> EvolutionParameters:
+        """Builds the parameters of the job's evolution, `overrides` are passed
+        to `EvolutionParameters` as well."""
+        return EvolutionParameters(
+            population_size=self.population_size,
+            num_of_generations=self.num_of_generations,
+            mut_prob=self.mut_prob,
+            hall_prob=self.hall_prob,
+            lecturer_prob=self.lecturer_prob,
+            time_slot_prob=self.time_slot_prob,
+            fitness_func=FitnessCache(
+                WeightedFitness(**{**DEFAULT_WEIGHTS, **self.weights}),
+                max_size=10000,
+            ),
+            selector_func=SELECTORS[self.selector](),
+            crossover_func=(
+                None if self.crossover is None else CROSSOVERS[self.crossover]()
+            ),
+            crossover_prob=self.crossover_prob,
+            max_wall_time=self.max_wall_time,
+            target_fitness=self.target_fitness,
+            stagnation_generations=self.stagnation_generations,
+            adaptive_mutation_window=self.adaptive_mutation_window,
+            local_search=(
+                LocalSearch(top_k=self.local_search_top)
+                if self.local_search_top > 0
+                else None
+            ),
+            verbose=False,
+            **overrides,
+        )
+
+
+# Parsed configs of a worker process, the least recently used one first.
+_worker_configs: dict[bytes, Parameters] = {}
+
+
+def _worker_parameters(config: str) -> Parameters:
+    data = config.encode()
+    key = hashlib.blake2b(data, digest_size=16).digest()
+
+    parameters = _worker_configs.pop(key, None)
+    if parameters is None:
+        parameters = parse_config(data, "<job config>")
+    _worker_configs[key] = parameters
+
+    while len(_worker_configs) > _WORKER_CONFIGS:
+        del _worker_configs[next(iter(_worker_configs))]
+
+    return parameters
+
+
+def _init_worker() -> None:
+    # Ctrl-C reaches the whole process group, the service stops the jobs itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _warm_up() -> None:
+    """Runs in every worker once, so that the first job does not pay for
+    starting the process."""
+
+
+class _EventSink:
+    """Sends the records of a job to the service, see `MetricsSink`."""
+
+    def __init__(self, job_id: int, events) -> None:
+        self.job_id = job_id
+        self.events = events
+
+    def write(self, record: GenerationRecord) -> None:
+        self.events.put((self.job_id, "progress", asdict(record)))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _run_job(job_id: int, spec: JobSpec, events, cancel) -> dict | None:
+    """Evolves the schedule of one job in a worker process.
+
+    Returns
+    -------
+    dict | None
+        The result of the job, None if it was cancelled before it started.
+    """
+    if cancel.is_set():
+        return None
+
+    events.put((job_id, "started", None))
+    parameters = _worker_parameters(spec.config)
+    # Jobs are the unit of parallelism, every one evolves in a single process.
+    evolution_params = spec.evolution_parameters(
+        metrics_sink=_EventSink(job_id, events), should_cancel=cancel.is_set
+    )
+    best_schedule = GeneticSchedule(parameters, rng=RandomStream(spec.seed)).evolve(
+        evolution_params
+    )
+
+    report = validate(best_schedule)
+    return {
+        "fitness": evolution_params.fitness_func(best_schedule),
+        "feasible": report.is_feasible(),
+        "conflicts": report.counts,
+        "schedules": {
+            view_name: {str(name): lessons for name, lessons in view.items()}
+            for view_name, view in build_views(best_schedule).items()
+        },
+    }
+
+
+@dataclass
+class Job:
+    """A job submitted to a `SchedulingService`.
+
+    Parameters
+    ----------
+    id : int
+    spec : JobSpec
+    state : str, default="queued"
+        One of `JOB_STATES`.
+    progress : list[dict]
+        `GenerationRecord` of every generation so far, as dicts.
+    result : dict, optional
+        Fitness, feasibility and the students, lecturers and halls views of the
+        best schedule, also kept for cancelled jobs that had started.
+    error : str, optional
+        Why the job failed.
+    """
+
+    id: int
+    spec: JobSpec = field(repr=False)
+    state: str = "queued"
+    progress: list[dict] = field(default_factory=list, repr=False)
+    result: dict | None = field(default=None, repr=False)
+    error: str | None = None
+    cancel_requested: bool = False
+    future: Future | None = field(default=None, repr=False)
+    cancel_event: object = field(default=None, repr=False)
+    subscribers: list[asyncio.Queue] = field(default_factory=list, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    def summary(self) -> dict:
+        latest = self.progress[-1] if self.progress else None
+        return {
+            "id": self.id,
+            "state": self.state,
+            "generation": 0 if latest is None else latest["generation"],
+            "best_fitness": None if latest is None else latest["best_fitness"],
+            "error": self.error,
+        }
+
+
+class SchedulingService:
+    """Runs scheduling jobs concurrently on a pool of warm worker processes.
+
+    Jobs wait in the pool's queue until a worker is free. Every worker keeps the
+    configs it has parsed, so repeated jobs on one config skip parsing.
+    Progress is sent by the workers after every generation, results are kept in
+    memory.
+
+    Parameters
+    ----------
+    num_workers : int, default=2
+        Number of jobs evolving at the same time.
+    max_finished : int, default=100
+        Number of finished jobs kept, the oldest ones are forgotten first.
+
+    Notes
+    -----
+    Must be started and used from one event loop. Workers report through a
+    manager queue read by a thread, which hands the events over to the loop.
+    """
+
+    def __init__(self, num_workers: int = 2, max_finished: int = 100) -> None:
+        self.num_workers = max(1, num_workers)
+        self.max_finished = max_finished
+        self._jobs: dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._manager = None
+        self._events = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._reader: threading.Thread | None = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context()
+        self._manager = context.Manager()
+        self._events = self._manager.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+        )
+        await asyncio.gather(
+            *(
+                asyncio.wrap_future(self._executor.submit(_warm_up))
+                for _ in range(self.num_workers)
+            )
+        )
+
+        self._reader = threading.Thread(target=self._read_events, daemon=True)
+        self._reader.start()
+
+    async def close(self) -> None:
+        """Cancels every job and stops the workers."""
+        for job in self._jobs.values():
+            if not job.finished:
+                self.cancel(job.id)
+
+        await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+        self._events.put(None)
+        await asyncio.to_thread(self._reader.join)
+        self._manager.shutdown()
+
+    def _read_events(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_event, *event)
+
+    def submit(self, spec: JobSpec) -> Job:
+        job = Job(next(self._ids), spec)
+        job.cancel_event = self._manager.Event()
+        job.future = self._executor.submit(
+            _run_job, job.id, spec, self._events, job.cancel_event
+        )
+        self._jobs[job.id] = job
+
+        # Completion goes through the event queue as well, after every record
+        # the worker has sent.
+        events = self._events
+        job.future.add_done_callback(lambda _: events.put((job.id, "done", None)))
+        return job
+
+    def get(self, job_id: int) -> Job:
+        """Raises KeyError for unknown or forgotten jobs."""
+        return self._jobs[job_id]
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: int) -> Job:
+        """Cancels a job: a queued one never starts, a running one stops after
+        its current generation and keeps the best schedule so far."""
+        job = self.get(job_id)
+        if job.finished:
+            return job
+
+        job.cancel_requested = True
+        if not job.future.cancel():
+            job.cancel_event.set()
+        return job
+
+    def _on_event(self, job_id: int, kind: str, payload: dict | None) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        if kind == "started":
+            job.state = "running"
+        elif kind == "progress":
+            job.progress.append(payload)
+            for subscriber in job.subscribers:
+                subscriber.put_nowait(payload)
+        else:
+            self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        future = job.future
+        if future.cancelled():
+            job.state = "cancelled"
+        elif future.exception() is not None:
+            job.state = "failed"
+            job.error = str(future.exception()) or type(future.exception()).__name__
+        else:
+            job.result = future.result()
+            job.state = "cancelled" if job.cancel_requested else "done"
+
+        job.future = None
+        job.cancel_event = None
+        for subscriber in job.subscribers:
+            subscriber.put_nowait(None)
+
+        finished = [other for other in self._jobs.values() if other.finished]
+        for other in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[other.id]
+
+    async def follow(self, job_id: int) -> AsyncIterator[dict]:
+        """Yields the progress records of a job, the earlier ones first, until
+        the job finishes."""
+        job = self.get(job_id)
+        updates: asyncio.Queue = asyncio.Queue()
+        # Nothing runs between taking the history and subscribing, so no
+        # record is missed or repeated.
+        history = list(job.progress)
+        finished = job.finished
+        job.subscribers.append(updates)
+        try:
+            for record in history:
+                yield record
+            while not finished:
+                record = await updates.get()
+                if record is None:
+                    return
+                yield record
+        finally:
+            job.subscribers.remove(updates)
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(status, message)
+        self.status = status
+        self.message = message
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise _HttpError(400, "Malformed request line.")
+    method, target, _ = request_line
+
+    content_length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                content_length = int(value)
+            except ValueError:
+                raise _HttpError(400, "Malformed Content-Length.") from None
+
+    if content_length > MAX_BODY_SIZE:
+        raise _HttpError(413, f"Request body is larger than {MAX_BODY_SIZE} bytes.")
+
+    body = await reader.readexactly(content_length) if content_length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _head(status: int, content_type: str, content_length: int | None = None) -> bytes:
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS[status]}",
+        f"Content-Type: {content_type}",
+        "Connection: close",
+    ]
+    if content_length is not None:
+        lines.append(f"Content-Length: {content_length}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, payload: object) -> None:
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, "application/json", len(body)) + body)
+    await writer.drain()
+
+
+class ServiceHandler:
+    """HTTP API of a `SchedulingService`, one request per connection.
+
+    - `POST /jobs` with a JSON `JobSpec` submits a job.
+    - `GET /jobs` lists the jobs, `GET /jobs/<id>` shows one.
+    - `GET /jobs/<id>/events` streams its progress as JSON lines, the last line
+      is the summary of the finished job.
+    - `GET /jobs/<id>/result` returns the result of a finished job.
+    - `DELETE /jobs/<id>` cancels a job.
+    """
+
+    def __init__(self, service: SchedulingService) -> None:
+        self.service = service
+
+    async def __call__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            method, path, body = await _read_request(reader)
+            await self._route(method, path, body, writer)
+        except _HttpError as e:
+            await _respond(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    def _job(self, job_id: str) -> Job:
+        try:
+            return self.service.get(int(job_id))
+        except (KeyError, ValueError):
+            raise _HttpError(404, f"No job {job_id}.") from None
+
+    async def _route(
+        self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter
+    ) -> None:
+        parts = path.strip("/").split("/")
+        if parts[0] != "jobs" or len(parts) > 3:
+            raise _HttpError(404, f"No resource {path}.")
+
+        if len(parts) == 1:
+            if method == "GET":
+                jobs = [job.summary() for job in self.service.jobs()]
+                return await _respond(writer, 200, jobs)
+            if method == "POST":
+                try:
+                    spec = JobSpec.from_json(json.loads(body))
+                except ValueError as e:
+                    raise _HttpError(400, str(e)) from None
+                return await _respond(writer, 202, self.service.submit(spec).summary())
+            raise _HttpError(405, f"{method} is not supported on {path}.")
+
+        job = self._job(parts[1])
+        action = parts[2] if len(parts) == 3 else None
+
+        if action is None and method == "GET":
+            return await _respond(writer, 200, job.summary())
+        if action is None and method == "DELETE":
+            return await _respond(writer, 202, self.service.cancel(job.id).summary())
+        if action == "result" and method == "GET":
+            if job.result is None:
+                raise _HttpError(409, f"Job {job.id} has no result, it is {job.state}.")
+            return await _respond(writer, 200, {**job.summary(), **job.result})
+        if action == "events" and method == "GET":
+            writer.write(_head(200, "application/x-ndjson"))
+            async for record in self.service.follow(job.id):
+                writer.write(json.dumps(record).encode() + b"\n")
+                await writer.drain()
+            writer.write(json.dumps(job.summary()).encode() + b"\n")
+            return await writer.drain()
+        if action not in (None, "result", "events"):
+            raise _HttpError(404, f"No resource {path}.")
+        raise _HttpError(405, f"{method} is not supported on {path}.")
+
+
+def parse_address(address: str) -> tuple[str, str | int]:
+    """Splits `unix:PATH` or `HOST:PORT` into the kind and the location.
+
+    Raises
+    ------
+    ValueError
+        If the address is neither.
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:") :]
+
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(
+            f"Invalid service address: {address}, expected HOST:PORT or unix:PATH."
+        )
+    return host, int(port)
+
+
+async def serve(address: str, num_workers: int = 2) -> None:
+    """Runs a `SchedulingService` behind its HTTP API until it is cancelled or
+    receives SIGTERM. Running jobs are cancelled on the way out.
+
+    Parameters
+    ----------
+    address : str
+        `HOST:PORT`, or `unix:PATH` for a Unix socket.
+    num_workers : int, default=2
+        Number of jobs evolving at the same time.
+    """
+    host, port = parse_address(address)
+
+    service = SchedulingService(num_workers)
+    await service.start()
+    handler = ServiceHandler(service)
+    stopped = asyncio.Event()
+    with contextlib.suppress(NotImplementedError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+    try:
+        if host == "unix":
+            server = await asyncio.start_unix_server(handler, path=port)
+        else:
+            server = await asyncio.start_server(handler, host=host, port=port)
+
+        async with server:
+            print(f"Serving on {address}, {service.num_workers} jobs at a time.")
+            await stopped.wait()
+    finally:
+        await service.close()
+        if host == "unix":
+            with contextlib.suppress(OSError):
+                os.unlink(port)
@@ -0,0 +1,513 @@
+from __future__ import annotations
+
+import csv
+import dataclasses
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import yaml
+
+from src.batch import PENALTY_COLUMNS
+from src.cache import FitnessCache
+from src.crossover import CROSSOVERS
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
+from src.genetic import GeneticSchedule
+from src.parameters import EvolutionParameters, Parameters
+from src.rng import RandomStream
+from src.telemetry import schedule_penalties
+
+SEARCHES = ("grid", "random")
+
+# Fields of `EvolutionParameters` a sweep may vary. The number of generations is
+# the budget handed out by successive halving instead.
+EVOLUTION_FIELDS = (
+    "population_size",
+    "mut_prob",
+    "hall_prob",
+    "lecturer_prob",
+    "time_slot_prob",
+    "crossover_prob",
+    "adaptive_mutation_window",
+    "adaptive_mutation_factor",
+    "max_mut_prob",
+)
+# Swept parameter naming the crossover operator of `src.crossover.CROSSOVERS`,
+# null for none. `crossover_prob` only has an effect with an operator.
+CROSSOVER_FIELD = "crossover"
+WEIGHT_FIELDS = tuple(field.name for field in dataclasses.fields(WeightedFitness))
+# Swept fields annotated as integers in `EvolutionParameters`, ranges of them give
+# whole numbers. All other fields, fitness weights included, take floats.
+INTEGER_FIELDS = tuple(
+    field.name
+    for field in dataclasses.fields(EvolutionParameters)
+    if field.name in EVOLUTION_FIELDS and "int" in field.type.split(" | ")
+)
+
+
+@dataclass
+class Range:
+    """Interval of values of a swept parameter.
+
+    Parameters
+    ----------
+    low : float
+    high : float
+    log : bool, default=False
+        Spread the values evenly on a logarithmic scale, `low` must then be
+        positive.
+    num : int, optional
+        Number of values of a grid search, random search ignores it.
+
+    Notes
+    -----
+    Values are floats unless `integer` is passed, whatever the type of the bounds.
+    `SearchSpace` passes it for the fields of `INTEGER_FIELDS`.
+    """
+
+    low: float
+    high: float
+    log: bool = False
+    num: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.log and self.low <= 0:
+            raise ValueError("A logarithmic range needs a positive lower bound.")
+        if self.num is not None and self.num < 1:
+            raise ValueError("A range needs at least one grid value.")
+
+    def _value(self, fraction: float, integer: bool) -> float:
+        if self.log:
+            value = self.low * (self.high / self.low) ** fraction
+        else:
+            value = self.low + (self.high - self.low) * fraction
+
+        if integer:
+            return round(value)
+        return float(value)
+
+    def grid(self, integer: bool = False) -> list[float]:
+        if self.num is None:
+            raise ValueError("A range needs `num` values in a grid search.")
+        if self.num == 1:
+            return [self._value(0.0, integer)]
+        # Rounding integer ranges may repeat values.
+        return list(
+            dict.fromkeys(
+                self._value(i / (self.num - 1), integer) for i in range(self.num)
+            )
+        )
+
+    def sample(self, rng: random.Random, integer: bool = False) -> float:
+        return self._value(rng.random(), integer)
+
+
+@dataclass
+class SearchSpace:
+    """Values of the evolution parameters and fitness weights to try.
+
+    Parameters
+    ----------
+    parameters : dict[str, list | Range]
+        Values of every swept field of `EVOLUTION_FIELDS` or `WEIGHT_FIELDS`,
+        either listed or as a `Range`, and the listed operators of
+        `CROSSOVER_FIELD`.
+    search : str, default="grid"
+        "grid" tries every combination, "random" draws `samples` of them.
+    samples : int, default=20
+    objective : dict[str, float]
+        Weights of the `WeightedFitness` trials are compared by, missing ones
+        are taken from `src.fitness.DEFAULT_WEIGHTS`. Trials are never compared
+        by their own weights, which may be swept.
+    """
+
+    parameters: dict[str, list | Range]
+    search: str = "grid"
+    samples: int = 20
+    objective: dict[str, float] = dataclasses.field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.search not in SEARCHES:
+            raise ValueError(
+                f"Unknown search: {self.search}, expected one of {SEARCHES}."
+            )
+        unknown = (
+            set(self.parameters)
+            - set(EVOLUTION_FIELDS)
+            - set(WEIGHT_FIELDS)
+            - {CROSSOVER_FIELD}
+        )
+        if unknown:
+            raise ValueError(f"Parameters that cannot be swept: {sorted(unknown)}.")
+        crossovers = self.parameters.get(CROSSOVER_FIELD, [])
+        if isinstance(crossovers, Range) or any(
+            crossover not in (None, *CROSSOVERS) for crossover in crossovers
+        ):
+            raise ValueError(f"Crossovers must be listed from {tuple(CROSSOVERS)}.")
+        unknown = set(self.objective) - set(WEIGHT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown objective weights: {sorted(unknown)}.")
+        for name, values in self.parameters.items():
+            if not isinstance(values, Range) and not values:
+                raise ValueError(f"No values to try for {name}.")
+
+    @classmethod
+    def from_yaml(cls, file_path: str) -> SearchSpace:
+        """Reads a search space, ranges are written as mappings with the fields
+        of `Range` and values as lists.
+
+        Raises
+        ------
+        ValueError
+            If the file does not describe a valid search space.
+        """
+        with open(file_path, "r") as file:
+            data = yaml.safe_load(file)
+
+        if not isinstance(data, dict) or not isinstance(data.get("parameters"), dict):
+            raise ValueError(f"{file_path} has no `parameters` mapping.")
+
+        try:
+            parameters = {
+                name: Range(**values) if isinstance(values, dict) else list(values)
+                for name, values in data.pop("parameters").items()
+            }
+            return cls(parameters, **data)
+        except TypeError as e:
+            raise ValueError(f"Invalid search space in {file_path}: {e}") from e
+
+    def objective_fitness(self) -> WeightedFitness:
+        return WeightedFitness(**{**DEFAULT_WEIGHTS, **self.objective})
+
+    def trials(self, rng: random.Random) -> list[dict[str, float]]:
+        """Values of the swept parameters of every trial.
+
+        Parameters
+        ----------
+        rng : random.Random
+            Source of randomness of random search.
+
+        Returns
+        -------
+        list[dict[str, float]]
+        """
+        names = list(self.parameters)
+        if self.search == "grid":
+            axes = [
+                (
+                    values.grid(name in INTEGER_FIELDS)
+                    if isinstance(values, Range)
+                    else values
+                )
+                for name, values in self.parameters.items()
+            ]
+            return [dict(zip(names, values)) for values in itertools.product(*axes)]
+
+        return [
+            {
+                name: (
+                    values.sample(rng, name in INTEGER_FIELDS)
+                    if isinstance(values, Range)
+                    else rng.choice(values)
+                )
+                for name, values in self.parameters.items()
+            }
+            for _ in range(self.samples)
+        ]
+
+
+@dataclass
+class TrialResult:
+    """Outcome of one trial at one budget.
+
+    Parameters
+    ----------
+    trial : int
+        Position of the trial in `SearchSpace.trials`.
+    values : dict[str, float]
+    generations : int
+    score : float
+        Objective fitness of the best schedule, averaged over the seeds.
+    penalties : dict[str, float]
+        Penalties of the best schedule averaged over the seeds, keyed by
+        `PENALTY_COLUMNS`.
+    seconds : float
+        Wall time of all seeds.
+    """
+
+    trial: int
+    values: dict[str, float]
+    generations: int
+    score: float
+    penalties: dict[str, float]
+    seconds: float
+
+
+def trial_parameters(
+    base: EvolutionParameters, values: dict[str, float], generations: int
+) -> EvolutionParameters:
+    """Evolution parameters of one trial: `base` with the swept fields, crossover
+    operator and fitness weights replaced.
+
+    Parameters
+    ----------
+    base : EvolutionParameters
+        Its fitness function must be a `WeightedFitness`.
+    values : dict[str, float]
+    generations : int
+    """
+    if CROSSOVER_FIELD in values:
+        crossover = values[CROSSOVER_FIELD]
+        base = dataclasses.replace(
+            base, crossover_func=None if crossover is None else CROSSOVERS[crossover]()
+        )
+
+    weights = {
+        **dataclasses.asdict(base.fitness_func),
+        **{name: value for name, value in values.items() if name in WEIGHT_FIELDS},
+    }
+    return dataclasses.replace(
+        base,
+        num_of_generations=generations,
+        fitness_func=FitnessCache(WeightedFitness(**weights), max_size=10000),
+        verbose=False,
+        **{name: value for name, value in values.items() if name in EVOLUTION_FIELDS},
+    )
+
+
+def run_trial(
+    parameters: Parameters,
+    base: EvolutionParameters,
+    values: dict[str, float],
+    generations: int,
+    seed: int,
+    objective: WeightedFitness,
+) -> tuple[float, dict[str, float], float]:
+    """Evolves one schedule with the trial's parameters.
+
+    Returns
+    -------
+    tuple[float, dict[str, float], float]
+        Objective fitness and penalties of the best schedule, wall time.
+    """
+    start = time.perf_counter()
+    best_schedule = GeneticSchedule(parameters, rng=RandomStream(seed)).evolve(
+        trial_parameters(base, values, generations)
+    )
+    seconds = time.perf_counter() - start
+    return objective(best_schedule), schedule_penalties(best_schedule), seconds
+
+
+_worker_parameters: Parameters | None = None
+_worker_base: EvolutionParameters | None = None
+
+
+def _init_worker(parameters: Parameters, base: EvolutionParameters) -> None:
+    global _worker_parameters, _worker_base
+
+    _worker_parameters = parameters
+    _worker_base = base
+
+
+def _run_trial(
+    values: dict[str, float], generations: int, seed: int, objective: WeightedFitness
+) -> tuple[float, dict[str, float], float]:
+    return run_trial(
+        _worker_parameters, _worker_base, values, generations, seed, objective
+    )
+
+
+@dataclass
+class SuccessiveHalving:
+    """Gives every trial a small budget of generations and only the best
+    `1 / eta` of them `eta` times more, until the survivors reach
+    `max_generations`.
+
+    Parameters
+    ----------
+    max_generations : int, default=50
+    min_generations : int, default=5
+        Budget of the first rung, `max_generations` disables early stopping.
+    eta : int, default=3
+        Reduction factor, at least 2.
+    """
+
+    max_generations: int = 50
+    min_generations: int = 5
+    eta: int = 3
+
+    def __post_init__(self) -> None:
+        if self.eta < 2:
+            raise ValueError("Successive halving needs a reduction factor of 2+.")
+        if not 0 < self.min_generations <= self.max_generations:
+            raise ValueError("Minimal budget must be in [1, max_generations].")
+
+    def budgets(self) -> list[int]:
+        """Generations of every rung, in increasing order."""
+        budgets = []
+        budget = self.min_generations
+        while budget < self.max_generations:
+            budgets.append(budget)
+            budget *= self.eta
+        return [*budgets, self.max_generations]
+
+    def survivors(self, results: list[TrialResult]) -> list[TrialResult]:
+        """The best `1 / eta` of a rung, at least one."""
+        ranked = sorted(results, key=lambda result: (-result.score, result.trial))
+        return ranked[: max(1, len(ranked) // self.eta)]
+
+
+def run_sweep(
+    parameters: Parameters,
+    base: EvolutionParameters,
+    trials: list[dict[str, float]],
+    objective: WeightedFitness,
+    halving: SuccessiveHalving | None = None,
+    seeds: list[int] | None = None,
+    num_workers: int = 1,
+    on_rung: Callable[[int, list[TrialResult]], None] | None = None,
+) -> list[TrialResult]:
+    """Runs the trials of a sweep, stopping the worse ones early.
+
+    Parameters
+    ----------
+    parameters : Parameters
+        Parsed once and sent to every worker once.
+    base : EvolutionParameters
+        Parameters shared by the trials, its fitness function must be a
+        `WeightedFitness`. Must be picklable if `num_workers` > 1.
+    trials : list[dict[str, float]]
+        See `SearchSpace.trials`.
+    objective : WeightedFitness
+        Fitness the trials are compared by.
+    halving : SuccessiveHalving, optional
+        Budgets of the rungs, `SuccessiveHalving()` by default.
+    seeds : list[int], optional
+        Seeds every trial runs with, the same for all of them so that they are
+        compared on the same random streams. `[0]` by default.
+    num_workers : int, default=1
+        Number of processes running trials.
+    on_rung : Callable[[int, list[TrialResult]], None], optional
+        Called with the rung number and its results once it finishes.
+
+    Returns
+    -------
+    list[TrialResult]
+        Results of every trial at every budget it reached, rung by rung.
+
+    Raises
+    ------
+    ValueError
+        If `crossover_prob` is swept but no trial has a crossover operator.
+
+    Notes
+    -----
+    A trial promoted to the next rung is run again from the start with the
+    larger budget. Every run is seeded, so the results do not depend on
+    `num_workers`.
+    """
+    halving = halving or SuccessiveHalving()
+    seeds = [0] if seeds is None else seeds
+
+    if any("crossover_prob" in values for values in trials) and all(
+        trial_parameters(base, values, 1).crossover_func is None for values in trials
+    ):
+        raise ValueError(
+            "Sweeping crossover_prob has no effect without a crossover operator,"
+            f" sweep `{CROSSOVER_FIELD}` or give the base parameters one."
+        )
+
+    pool = None
+    if num_workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(parameters, base),
+        )
+
+    results = []
+    survivors = list(enumerate(trials))
+    try:
+        for rung, generations in enumerate(halving.budgets()):
+            jobs = [
+                (values, generations, seed, objective)
+                for _, values in survivors
+                for seed in seeds
+            ]
+            if pool is None:
+                outcomes = [run_trial(parameters, base, *job) for job in jobs]
+            else:
+                outcomes = list(pool.map(_run_trial, *zip(*jobs)))
+
+            rung_results = [
+                _average(
+                    trial,
+                    values,
+                    generations,
+                    outcomes[i * len(seeds) : (i + 1) * len(seeds)],
+                )
+                for i, (trial, values) in enumerate(survivors)
+            ]
+            results.extend(rung_results)
+            if on_rung is not None:
+                on_rung(rung, rung_results)
+
+            survivors = [
+                (result.trial, result.values)
+                for result in halving.survivors(rung_results)
+            ]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return results
+
+
+def _average(
+    trial: int,
+    values: dict[str, float],
+    generations: int,
+    outcomes: list[tuple[float, dict[str, float], float]],
+) -> TrialResult:
+    return TrialResult(
+        trial=trial,
+        values=values,
+        generations=generations,
+        score=math.fsum(score for score, _, _ in outcomes) / len(outcomes),
+        penalties={
+            column: math.fsum(penalties[column] for _, penalties, _ in outcomes)
+            / len(outcomes)
+            for column in PENALTY_COLUMNS
+        },
+        seconds=math.fsum(seconds for _, _, seconds in outcomes),
+    )
+
+
+def _format(value: object) -> object:
+    return f"{value:.6g}" if isinstance(value, float) else value
+
+
+def write_table(results: list[TrialResult], file_path: str) -> None:
+    """Writes one CSV row per trial and budget: the swept values, the objective
+    score, the penalties and the wall time."""
+    names = list(dict.fromkeys(name for result in results for name in result.values))
+    with open(file_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ["trial", "generations", *names, "score", *PENALTY_COLUMNS, "seconds"]
+        )
+        writer.writerows(
+            [
+                result.trial,
+                result.generations,
+                *(_format(result.values.get(name)) for name in names),
+                _format(result.score),
+                *(_format(result.penalties[column]) for column in PENALTY_COLUMNS),
+                _format(result.seconds),
+            ]
+            for result in results
+        )
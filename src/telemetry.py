@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import math
+import queue
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Protocol, TextIO
+
+from src.batch import PENALTY_COLUMNS
+from src.schedule import Schedule
+
+SINKS = ("tty", "jsonl", "none")
+
+
+def schedule_penalties(schedule: Schedule) -> dict[str, float]:
+    """Penalties of a schedule, keyed by `PENALTY_COLUMNS`."""
+    lesson_counts = schedule.count_time_slot_lessons()
+    return dict(
+        zip(
+            PENALTY_COLUMNS,
+            (
+                schedule.count_total_windows(),
+                schedule.count_total_lecturer_windows(),
+                schedule.count_total_non_profile_slots(),
+                schedule.count_capacity_overflows(),
+                max(lesson_counts) - min(lesson_counts),
+                schedule.count_conflicts(),
+            ),
+        )
+    )
+
+
+@dataclass
+class GenerationRecord:
+    """Statistics of one scored generation.
+
+    Parameters
+    ----------
+    generation : int
+        Number of the generation, starting from 1.
+    best_fitness : float
+    mean_fitness : float
+    worst_fitness : float
+    penalties : dict[str, float]
+        Penalties of the fittest individual, keyed by `PENALTY_COLUMNS`.
+    diversity : float
+        Share of distinct genomes in the population.
+    generation_time : float
+        Wall time of the generation in seconds.
+    elapsed : float
+        Wall time since the start of the run in seconds.
+    mut_prob : float
+        Mutation probability used by the generation.
+    """
+
+    generation: int
+    best_fitness: float
+    mean_fitness: float
+    worst_fitness: float
+    penalties: dict[str, float]
+    diversity: float
+    generation_time: float
+    elapsed: float
+    mut_prob: float
+
+    @classmethod
+    def from_population(
+        cls,
+        generation: int,
+        population: list[Schedule],
+        fitness_scores: list[float],
+        generation_time: float,
+        elapsed: float,
+        mut_prob: float,
+    ) -> GenerationRecord:
+        best = max(range(len(population)), key=fitness_scores.__getitem__)
+        fittest = population[best]
+        if not fittest.is_indexed():
+            # Counting builds the index, keep the population itself untouched.
+            fittest = fittest.clone()
+
+        return cls(
+            generation=generation,
+            best_fitness=fitness_scores[best],
+            mean_fitness=math.fsum(fitness_scores) / len(fitness_scores),
+            worst_fitness=min(fitness_scores),
+            penalties=schedule_penalties(fittest),
+            diversity=(
+                len({individual.genome_hash() for individual in population})
+                / len(population)
+            ),
+            generation_time=generation_time,
+            elapsed=elapsed,
+            mut_prob=mut_prob,
+        )
+
+
+class MetricsSink(Protocol):
+    """Receives a record after every generation, see `EvolutionParameters`."""
+
+    def write(self, record: GenerationRecord) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class NullSink:
+    """Sink that discards every record."""
+
+    def write(self, record: GenerationRecord) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> NullSink:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonLinesSink:
+    """Appends every record as one JSON object per line to a file.
+
+    Records are handed over to a background thread, which serializes and writes
+    them in batches, so the evolution loop only pays for a queue put.
+
+    Parameters
+    ----------
+    file_path : str
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._records: queue.SimpleQueue = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._written = 0
+        self._queued = 0
+        # Closed by `close`, the file lives as long as the sink.
+        self._file = open(file_path, "w")  # noqa: SIM115
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, record: GenerationRecord) -> None:
+        self._queued += 1
+        self._records.put(record)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            # Take everything queued so far and write it in one go, None asks
+            # the thread to stop.
+            batch = [self._records.get()]
+            with contextlib.suppress(queue.Empty):
+                while batch[-1] is not None:
+                    batch.append(self._records.get_nowait())
+            stopping = batch[-1] is None
+
+            records = [record for record in batch if record is not None]
+            self._file.writelines(
+                json.dumps(asdict(record)) + "\n" for record in records
+            )
+            self._file.flush()
+
+            with self._flushed:
+                self._written += len(records)
+                self._flushed.notify_all()
+
+    def flush(self) -> None:
+        """Waits until every record written so far is in the file."""
+        with self._flushed:
+            self._flushed.wait_for(lambda: self._written >= self._queued)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._records.put(None)
+            self._thread.join()
+        self._file.close()
+
+    def __enter__(self) -> JsonLinesSink:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ProgressSink:
+    """Keeps a single status line up to date on a terminal.
+
+    Parameters
+    ----------
+    stream : TextIO, default=sys.stderr
+    min_interval : float, default=0.1
+        Minimal number of seconds between two redraws, the latest record is
+        always drawn on `flush`, which also ends the line.
+    """
+
+    def __init__(self, stream: TextIO | None = None, min_interval: float = 0.1) -> None:
+        self.stream = stream or sys.stderr
+        self.min_interval = min_interval
+        self._last_draw = float("-inf")
+        self._pending: GenerationRecord | None = None
+        self._width = 0
+
+    def write(self, record: GenerationRecord) -> None:
+        self._pending = record
+
+        now = time.perf_counter()
+        if now - self._last_draw >= self.min_interval:
+            self._last_draw = now
+            self._draw()
+
+    def _draw(self) -> None:
+        record = self._pending
+        if record is None:
+            return
+
+        line = (
+            f"Generation {record.generation}"
+            f" | best {record.best_fitness:.2f}"
+            f" | mean {record.mean_fitness:.2f}"
+            f" | worst {record.worst_fitness:.2f}"
+            f" | diversity {record.diversity:.0%}"
+            f" | {record.generation_time * 1000:.1f} ms/gen"
+        )
+        self.stream.write("\r" + line.ljust(self._width))
+        self.stream.flush()
+
+        self._width = len(line)
+        self._pending = None
+
+    def flush(self) -> None:
+        self._draw()
+        if self._width:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._width = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> ProgressSink:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def create_sink(kind: str, file_path: str = "metrics.jsonl") -> MetricsSink:
+    """Creates a sink by name.
+
+    Parameters
+    ----------
+    kind : str
+        One of `SINKS`: "tty", "jsonl" or "none".
+    file_path : str, default="metrics.jsonl"
+        Output file of the "jsonl" sink.
+
+    Returns
+    -------
+    MetricsSink
+    """
+    if kind == "tty":
+        return ProgressSink()
+    if kind == "jsonl":
+        return JsonLinesSink(file_path)
+    if kind == "none":
+        return NullSink()
+
+    raise ValueError(f"Unknown metrics sink: {kind}, expected one of {SINKS}.")
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from src.parameters import EvolutionParameters
+from src.schedule import Schedule
+
+
+@dataclass
+class BestSoFar:
+    """`on_best` callback that keeps the latest best schedule, so it can be
+    retrieved even if the evolution is interrupted."""
+
+    schedule: Schedule | None = None
+    fitness: float | None = None
+    generation: int | None = None
+
+    def __call__(self, schedule: Schedule, fitness: float, generation: int) -> None:
+        self.schedule = schedule
+        self.fitness = fitness
+        self.generation = generation
+
+
+class EvolutionController:
+    """Tracks the best schedule of a run, decides when to stop and adapts the
+    mutation probability to stagnation.
+
+    Parameters
+    ----------
+    evolution_params : EvolutionParameters
+    """
+
+    def __init__(self, evolution_params: EvolutionParameters) -> None:
+        self.evolution_params = evolution_params
+        self.mut_prob = evolution_params.mut_prob
+
+        self.best_schedule: Schedule | None = None
+        self.best_fitness = float("-inf")
+        self.best_generation = 0
+        self.generation = 0
+        self.stop_reason: str | None = None
+
+        self._start = time.perf_counter()
+        self._last_generation_end = self._start
+        self._last_generation_time = 0.0
+
+    def resume(
+        self,
+        generation: int,
+        best_schedule: Schedule | None,
+        best_fitness: float,
+        best_generation: int,
+        mut_prob: float,
+        elapsed: float,
+    ) -> None:
+        """Continues the state of an earlier run, see `src.checkpoint`.
+
+        Parameters
+        ----------
+        generation : int
+            Number of generations already completed.
+        best_schedule : Schedule | None
+        best_fitness : float
+        best_generation : int
+        mut_prob : float
+        elapsed : float
+            Wall time the earlier run had spent, counted against the budget.
+        """
+        self.generation = generation
+        self.best_schedule = best_schedule
+        self.best_fitness = best_fitness
+        self.best_generation = best_generation
+        self.mut_prob = mut_prob
+
+        self._start = time.perf_counter() - elapsed
+        self._last_generation_end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """Wall time since the start of the run, in seconds."""
+        return time.perf_counter() - self._start
+
+    @property
+    def last_generation_time(self) -> float:
+        """Wall time of the latest generation, in seconds."""
+        return self._last_generation_time
+
+    def update(
+        self, generation: int, population: list[Schedule], fitness_scores: list[float]
+    ) -> None:
+        """Records a scored generation.
+
+        Parameters
+        ----------
+        generation : int
+            Number of the generation, starting from 1.
+        population : list[Schedule]
+        fitness_scores : list[float]
+        """
+        now = time.perf_counter()
+        self._last_generation_time = now - self._last_generation_end
+        self._last_generation_end = now
+        self.generation = generation
+
+        if fitness_scores:
+            best = max(range(len(population)), key=fitness_scores.__getitem__)
+            self.offer(population[best], fitness_scores[best])
+
+        self._adapt_mutation()
+
+    def offer(self, schedule: Schedule, fitness: float) -> bool:
+        """Keeps a copy of the schedule if it is better than the best one so far.
+
+        Returns
+        -------
+        bool
+            Whether the schedule became the best one.
+        """
+        if fitness <= self.best_fitness:
+            return False
+
+        self.best_schedule = schedule.clone()
+        self.best_fitness = fitness
+        self.best_generation = self.generation
+
+        if self.evolution_params.on_best is not None:
+            self.evolution_params.on_best(
+                self.best_schedule.clone(), fitness, self.generation
+            )
+
+        return True
+
+    def _adapt_mutation(self) -> None:
+        window = self.evolution_params.adaptive_mutation_window
+        if not window:
+            return
+
+        if self.best_generation == self.generation:
+            self.mut_prob = self.evolution_params.mut_prob
+        elif (self.generation - self.best_generation) % window == 0:
+            self.mut_prob = min(
+                self.mut_prob * self.evolution_params.adaptive_mutation_factor,
+                self.evolution_params.max_mut_prob,
+            )
+
+    def should_stop(self) -> bool:
+        """Checks the termination criteria, the reason is kept in `stop_reason`.
+
+        Returns
+        -------
+        bool
+        """
+        params = self.evolution_params
+
+        if params.should_cancel is not None and params.should_cancel():
+            self.stop_reason = "cancelled"
+        elif params.target_fitness is not None and self.best_fitness >= (
+            params.target_fitness
+        ):
+            self.stop_reason = "target fitness reached"
+        elif (
+            params.stagnation_generations is not None
+            and self.generation - self.best_generation >= params.stagnation_generations
+        ):
+            self.stop_reason = (
+                f"no improvement for {params.stagnation_generations} generations"
+            )
+        elif (
+            params.max_wall_time is not None
+            # Stop before a generation that would not fit into the time budget.
+            and self.elapsed + self._last_generation_time > params.max_wall_time
+        ):
+            self.stop_reason = "wall time budget exhausted"
+
+        return self.stop_reason is not None
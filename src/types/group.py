@@ -1,22 +1,28 @@
 from __future__ import annotations
 
-from src.types.subject import Subject
+from dataclasses import dataclass, field
 
+from src.types.interning import intern_name
 
+
+@dataclass(frozen=True, eq=False, slots=True)
 class Group:
-    def __init__(self, name: str, capacity: int, subject_names: list[str]) -> None:
-        self.name: str = name
-        self.capacity: int = capacity
-        self.subject_names: list[str] = subject_names
-        self.subjects: list[Subject] = None
+    name: str
+    capacity: int
+    subject_names: tuple[str, ...]
+    # Position in the parameters, set by `Parameters` when it is built.
+    id: int = field(default=-1, init=False)
+    # Positions of `subject_names` in `Parameters.subjects`, unknown names left out.
+    subject_ids: tuple[int, ...] = field(default=(), init=False, repr=False)
 
-    def __eq__(self, other: Group) -> bool:
-        return not other or all(
-            [self.name == other.name, self.capacity == other.capacity]
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name", intern_name(self.name))
+        object.__setattr__(
+            self, "subject_names", tuple(map(intern_name, self.subject_names))
         )
 
     def __str__(self) -> str:
         return f"{self.name}"
 
-    def __hash__(self) -> int:
-        return hash((self.name, self.capacity))
+    def __deepcopy__(self, memo: dict) -> Group:
+        return self
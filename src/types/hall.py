@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 
+from src.types.interning import intern_name
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class Hall:
-    def __init__(self, name, capacity):
-        self.name = name
-        self.capacity = capacity
+    name: str
+    capacity: int
+    # Position in the parameters, set by `Parameters` when it is built.
+    id: int = field(default=-1, init=False)
 
-    def __eq__(self, other: Hall) -> bool:
-        return not other or self.name == other.name and self.capacity == other.capacity
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name", intern_name(self.name))
 
     def __str__(self) -> str:
         return f"{self.name}"
 
-    def __hash__(self) -> int:
-        return hash((self.name, self.capacity))
+    def __deepcopy__(self, memo: dict) -> Hall:
+        return self
@@ -0,0 +1,7 @@
+import sys
+
+
+def intern_name(name):
+    """Interns string names, so that comparing equal names is a pointer check.
+    Names YAML reads as numbers (e.g. hall numbers) are returned unchanged."""
+    return sys.intern(name) if isinstance(name, str) else name
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 
+from src.types.interning import intern_name
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class Lecturer:
-    def __init__(self, name: str, can_teach_subjects_names: list[str]) -> None:
-        self.name: str = name
-        self.can_teach_subjects_names: list[str] = can_teach_subjects_names
+    name: str
+    can_teach_subjects_names: tuple[str, ...]
+    # Position in the parameters, set by `Parameters` when it is built.
+    id: int = field(default=-1, init=False)
+    # Positions in `Parameters.subjects` of all subjects named in
+    # `can_teach_subjects_names`.
+    subject_ids: frozenset[int] = field(default=frozenset(), init=False, repr=False)
 
-    def __eq__(self, other: Lecturer) -> bool:
-        return not other or self.name == other.name
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name", intern_name(self.name))
+        object.__setattr__(
+            self,
+            "can_teach_subjects_names",
+            tuple(map(intern_name, self.can_teach_subjects_names)),
+        )
 
     def __str__(self) -> str:
         return f"{self.name}"
 
-    def __hash__(self) -> int:
-        return hash(self.name)
+    def __deepcopy__(self, memo: dict) -> Lecturer:
+        return self
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 
+from src.types.interning import intern_name
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class Subject:
-    def __init__(self, name: str, hours: int) -> None:
-        self.name: str = name
-        self.hours: int = hours
+    name: str
+    hours: int
+    # Position in the parameters, set by `Parameters` when it is built.
+    id: int = field(default=-1, init=False)
 
-    def __eq__(self, other: Subject) -> bool:
-        return not other or self.name == other.name and self.hours == other.hours
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name", intern_name(self.name))
 
     def __str__(self) -> str:
         return f"{self.name}"
 
-    def __hash__(self) -> int:
-        return hash((self.name, self.hours))
+    def __deepcopy__(self, memo: dict) -> Subject:
+        return self
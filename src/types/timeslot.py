@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 
+from src.types.interning import intern_name
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class TimeSlot:
-    def __init__(self, day: str, time: int) -> None:
-        self.day: str = day
-        self.time: int = time
+    day: str
+    time: int
+    # Position in the parameters, set by `Parameters` when it is built.
+    id: int = field(default=-1, init=False)
 
-    def __eq__(self, other: TimeSlot | None) -> bool:
-        return not other or self.day == other.day and self.time == other.time
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "day", intern_name(self.day))
 
     def __str__(self) -> str:
         return f"{self.day}, {self.time}"
@@ -15,5 +21,5 @@ class TimeSlot:
     def __repr__(self) -> str:
         return f"{self.day}, {self.time}"
 
-    def __hash__(self) -> int:
-        return hash((self.day, self.time))
+    def __deepcopy__(self, memo: dict) -> TimeSlot:
+        return self
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from src.schedule import Schedule
+
+# Kinds of double bookings, in the order of `FeasibilityReport.counts`.
+CONFLICT_KINDS = ("group", "lecturer", "hall")
+
+
+@dataclass
+class Conflict:
+    """Several lessons taking the same group, lecturer or hall at one time slot.
+
+    Parameters
+    ----------
+    kind : str
+        One of `CONFLICT_KINDS`.
+    entity_id : int
+        Position of the group, lecturer or hall in the parameters.
+    time_slot_id : int
+    lessons : list[int]
+        Indices of the clashing lessons, at least two.
+    """
+
+    kind: str
+    entity_id: int
+    time_slot_id: int
+    lessons: list[int]
+
+    def describe(self, schedule: Schedule) -> str:
+        parameters = schedule.parameters
+        entities = {
+            "group": parameters.groups,
+            "lecturer": parameters.lecturers,
+            "hall": parameters.halls,
+        }[self.kind]
+        subjects = ", ".join(
+            f"{parameters.groups[schedule.group_ids[lesson]]}"
+            f" {parameters.subjects[schedule.subject_ids[lesson]]}"
+            for lesson in self.lessons
+        )
+        return (
+            f"{self.kind} {entities[self.entity_id]} at"
+            f" {parameters.time_slots[self.time_slot_id]}: {subjects}"
+        )
+
+
+@dataclass
+class FeasibilityReport:
+    """Hard constraint violations of a schedule.
+
+    Parameters
+    ----------
+    conflicts : list[Conflict]
+    counts : dict[str, int]
+        Number of lessons in excess of one per (entity, time slot), by kind. The
+        total equals `Schedule.count_conflicts`.
+    """
+
+    conflicts: list[Conflict] = field(default_factory=list)
+    counts: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(CONFLICT_KINDS, 0)
+    )
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def is_feasible(self) -> bool:
+        return not self.conflicts
+
+    def format(self, schedule: Schedule, limit: int = 10) -> str:
+        """Summarizes the report, listing at most `limit` conflicts."""
+        if self.is_feasible():
+            return "Schedule is feasible: no double bookings."
+
+        lines = [
+            "Schedule is infeasible: "
+            + ", ".join(
+                f"{count} {kind} double bookings" for kind, count in self.counts.items()
+            )
+            + "."
+        ]
+        lines.extend(
+            f"  {conflict.describe(schedule)}" for conflict in self.conflicts[:limit]
+        )
+        if len(self.conflicts) > limit:
+            lines.append(f"  ... and {len(self.conflicts) - limit} more.")
+        return "\n".join(lines)
+
+
+def validate(schedule: Schedule) -> FeasibilityReport:
+    """Finds every group, lecturer and hall double booking of a schedule.
+
+    Parameters
+    ----------
+    schedule : Schedule
+
+    Returns
+    -------
+    FeasibilityReport
+
+    Notes
+    -----
+    One pass over the lessons with a dict keyed by (kind, entity, time slot),
+    so the cost is O(lessons) and does not depend on the occupancy index. For
+    the conflict count alone, `Schedule.count_conflicts` is O(1).
+    """
+    occupants: dict[tuple[int, int, int], list[int]] = {}
+    for lesson, (group_id, lecturer_id, hall_id, time_slot_id) in enumerate(
+        zip(
+            schedule.group_ids,
+            schedule.lecturer_ids,
+            schedule.hall_ids,
+            schedule.time_slot_ids,
+        )
+    ):
+        for kind, entity_id in enumerate((group_id, lecturer_id, hall_id)):
+            occupants.setdefault((kind, entity_id, time_slot_id), []).append(lesson)
+
+    report = FeasibilityReport()
+    for (kind, entity_id, time_slot_id), lessons in occupants.items():
+        if len(lessons) > 1:
+            report.conflicts.append(
+                Conflict(CONFLICT_KINDS[kind], entity_id, time_slot_id, lessons)
+            )
+            report.counts[CONFLICT_KINDS[kind]] += len(lessons) - 1
+
+    return report
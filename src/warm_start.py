@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+
+import yaml
+
+from src.config import ConfigError
+from src.parameters import Parameters
+from src.schedule import Schedule
+
+# Keys of a lesson in the files written by `src.io.yaml.save_results`, every
+# file leaves out the one its entries are grouped by.
+_LESSON_KEYS = ("group", "subject", "lecturer", "hall", "time_slot")
+
+
+@dataclass(frozen=True)
+class PreviousLesson:
+    """A lesson of an earlier solution, referring to entities by name so that it
+    survives changes of the config."""
+
+    group: str
+    subject: str
+    lecturer: str
+    hall: str
+    time_slot: str
+
+
+def load_result_lessons(file_path: str) -> list[PreviousLesson]:
+    """Reads the lessons of one of the `final_*_schedule.yaml` files.
+
+    Parameters
+    ----------
+    file_path : str
+        Students, lecturers or halls schedule, the three contain the same
+        lessons.
+
+    Returns
+    -------
+    list[PreviousLesson]
+
+    Raises
+    ------
+    ConfigError
+        If the file cannot be read or does not look like a saved schedule.
+    """
+    try:
+        with open(file_path, "r") as file:
+            data = yaml.safe_load(file) or {}
+    except (OSError, yaml.YAMLError) as e:
+        raise ConfigError(f"Cannot read warm start {file_path}: {e}") from e
+
+    if not isinstance(data, dict):
+        raise ConfigError(f"{file_path} is not a saved schedule.")
+
+    lessons = []
+    for owner, entries in data.items():
+        for entry in entries or []:
+            if not isinstance(entry, dict):
+                raise ConfigError(f"{file_path} is not a saved schedule.")
+            missing = [key for key in _LESSON_KEYS if key not in entry]
+            if len(missing) != 1:
+                raise ConfigError(f"{file_path} is not a saved schedule.")
+
+            names = {key: str(value) for key, value in entry.items()}
+            names[missing[0]] = str(owner)
+            lessons.append(PreviousLesson(**{key: names[key] for key in _LESSON_KEYS}))
+
+    return lessons
+
+
+def genome_lessons(parameters: Parameters, genome: bytes) -> list[PreviousLesson]:
+    """Decodes the lessons of a genome saved with `save_genome`.
+
+    Parameters
+    ----------
+    parameters : Parameters
+        Parameters of the run the genome comes from.
+    genome : bytes
+
+    Returns
+    -------
+    list[PreviousLesson]
+
+    Raises
+    ------
+    ConfigError
+        If the genome was not taken from a schedule of `parameters`.
+    """
+    schedule = Schedule.from_genome(parameters, genome)
+    entity_counts = (
+        len(parameters.groups),
+        len(parameters.subjects),
+        len(parameters.lecturers),
+        len(parameters.halls),
+        len(parameters.time_slots),
+    )
+    if schedule.to_genome() != genome or any(
+        not all(0 <= entity_id < count for entity_id in ids)
+        for ids, count in zip(
+            (
+                schedule.group_ids,
+                schedule.subject_ids,
+                schedule.lecturer_ids,
+                schedule.hall_ids,
+                schedule.time_slot_ids,
+            ),
+            entity_counts,
+        )
+    ):
+        raise ConfigError("The warm start genome does not fit --previous-config.")
+
+    return [
+        PreviousLesson(
+            group=str(slot.group),
+            subject=str(slot.subject),
+            lecturer=str(slot.lecturer),
+            hall=str(slot.hall),
+            time_slot=str(slot.time_slot),
+        )
+        for slot in schedule.to_slots()
+    ]
+
+
+def save_genome(schedule: Schedule, file_path: str) -> None:
+    """Writes the genome of a schedule, see `Schedule.to_genome`."""
+    with open(file_path, "wb") as file:
+        file.write(schedule.to_genome())
+
+
+def load_genome(file_path: str) -> bytes:
+    """Reads a genome written by `save_genome`.
+
+    Raises
+    ------
+    ConfigError
+        If the file cannot be read.
+    """
+    try:
+        with open(file_path, "rb") as file:
+            return file.read()
+    except OSError as e:
+        raise ConfigError(f"Cannot read warm start {file_path}: {e}") from e
+
+
+@dataclass
+class WarmStart:
+    """A schedule for a changed config that keeps as much as possible of an
+    earlier solution.
+
+    Parameters
+    ----------
+    schedule : Schedule
+        Schedule with every lesson of the config.
+    mutable_lessons : list[int]
+        Lessons the evolution may change, see `EvolutionParameters`: the placed
+        lessons and the kept lessons they directly collide with.
+    previous : list[tuple[int, int, int] | None]
+        Lecturer, hall and time slot ids of every lesson in the earlier
+        solution, None for lessons it did not have.
+    kept : int
+        Number of lessons taken over unchanged.
+    placed : int
+        Number of lessons placed anew, the displaced ones included.
+    displaced : int
+        Number of lessons of the earlier solution whose lecturer, hall or time
+        slot is gone or changed, or that clash with the lessons kept before
+        them.
+    removed : int
+        Number of lessons of the earlier solution the config no longer has.
+    """
+
+    schedule: Schedule
+    mutable_lessons: list[int]
+    previous: list[tuple[int, int, int] | None]
+    kept: int
+    placed: int
+    displaced: int
+    removed: int
+
+    @classmethod
+    def build(
+        cls,
+        parameters: Parameters,
+        previous_lessons: list[PreviousLesson],
+        rng: random.Random | None = None,
+        previous_parameters: Parameters | None = None,
+    ) -> WarmStart:
+        """Matches the lessons of an earlier solution against the config.
+
+        Parameters
+        ----------
+        parameters : Parameters
+            Current, possibly changed, parameters.
+        previous_lessons : list[PreviousLesson]
+            See `load_result_lessons` and `genome_lessons`.
+        rng : random.Random, optional
+            Source of randomness, the global `random` module by default.
+        previous_parameters : Parameters, optional
+            Parameters the earlier solution was evolved with. Without them
+            only removed entities are noticed.
+
+        Returns
+        -------
+        WarmStart
+
+        Notes
+        -----
+        A previous lesson is kept when its group still takes the subject, its
+        lecturer, hall and time slot still exist and it does not clash with
+        the lessons kept before it. Compared with `previous_parameters`, it is
+        also displaced when its lecturer could teach the subject but no longer
+        can, or its hall fitted the group but no longer does. Lessons that were
+        off-profile or overflowing before keep their place, those are soft
+        penalties and not changes of the config.
+
+        Every other required lesson is placed with `Schedule.place_lessons`.
+        Only the placed lessons and the kept lessons they directly collide
+        with, at their earlier or their new time slot, may move.
+        """
+        group_ids = _name_index(parameters.groups)
+        lecturer_ids = _name_index(parameters.lecturers)
+        hall_ids = _name_index(parameters.halls)
+        time_slot_ids = _name_index(parameters.time_slots)
+        changed = _ConfigDiff(parameters, previous_parameters)
+
+        # Lessons still required, as a multiset of (group id, subject id).
+        required = defaultdict(int)
+        for lesson in parameters.required_lessons():
+            required[lesson] += 1
+
+        schedule = Schedule(parameters)
+        previous = []
+        pending = []
+        colliding = set()
+        displaced = removed = 0
+
+        for lesson in previous_lessons:
+            group_id = group_ids.get(lesson.group)
+            subject_id = parameters.subject_name_index.get(lesson.subject)
+            key = (group_id, subject_id)
+            if required.get(key, 0) == 0:
+                removed += 1
+                continue
+            required[key] -= 1
+
+            ids = (
+                lecturer_ids.get(lesson.lecturer),
+                hall_ids.get(lesson.hall),
+                time_slot_ids.get(lesson.time_slot),
+            )
+            lecturer_id, hall_id, time_slot_id = ids
+            if None in ids or changed(
+                lesson, subject_id, lecturer_id, hall_id, group_id
+            ):
+                pending.append(key)
+                displaced += 1
+            elif not schedule.is_free(group_id, lecturer_id, hall_id, time_slot_id):
+                colliding.update(
+                    _collisions(schedule, group_id, lecturer_id, hall_id, time_slot_id)
+                )
+                pending.append(key)
+                displaced += 1
+            else:
+                schedule.add_lesson(group_id, subject_id, *ids)
+                previous.append(ids)
+
+        kept = len(schedule)
+        for key, count in required.items():
+            pending.extend([key] * count)
+
+        placed = schedule.place_lessons(pending, rng=rng)
+        previous.extend([None] * len(placed))
+
+        for lesson in placed:
+            colliding.update(
+                _collisions(
+                    schedule,
+                    schedule.group_ids[lesson],
+                    schedule.lecturer_ids[lesson],
+                    schedule.hall_ids[lesson],
+                    schedule.time_slot_ids[lesson],
+                    limit=kept,
+                )
+            )
+
+        return cls(
+            schedule=schedule,
+            mutable_lessons=sorted(colliding.union(placed)),
+            previous=previous,
+            kept=kept,
+            placed=len(placed),
+            displaced=displaced,
+            removed=removed,
+        )
+
+    def count_moved(self, schedule: Schedule) -> int:
+        """Counts the lessons of the earlier solution that are not where they
+        were: the displaced ones and the kept ones that got another lecturer,
+        hall or time slot.
+
+        Parameters
+        ----------
+        schedule : Schedule
+            Schedule evolved from `schedule`, with the same lessons.
+
+        Returns
+        -------
+        int
+        """
+        return self.displaced + sum(
+            previous is not None
+            and previous
+            != (
+                schedule.lecturer_ids[lesson],
+                schedule.hall_ids[lesson],
+                schedule.time_slot_ids[lesson],
+            )
+            for lesson, previous in enumerate(self.previous)
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.kept} lessons kept, {self.placed} placed ({self.displaced}"
+            f" displaced), {self.removed} removed, {len(self.mutable_lessons)} of"
+            f" {len(self.schedule)} may move"
+        )
+
+
+def _name_index(entities) -> dict[str, int]:
+    """Maps the names of entities, as written to YAML, to their ids. The first of
+    equally named entities wins, like in `Parameters.subject_name_index`."""
+    index = {}
+    for entity_id, entity in enumerate(entities):
+        index.setdefault(str(entity), entity_id)
+    return index
+
+
+def _collisions(
+    schedule: Schedule,
+    group_id: int,
+    lecturer_id: int,
+    hall_id: int,
+    time_slot_id: int,
+    limit: int | None = None,
+) -> list[int]:
+    """Lessons among the first `limit` that take the group, the lecturer or the
+    hall at the time slot."""
+    return [
+        lesson
+        for lesson in range(len(schedule) if limit is None else limit)
+        if schedule.time_slot_ids[lesson] == time_slot_id
+        and (
+            schedule.group_ids[lesson] == group_id
+            or schedule.lecturer_ids[lesson] == lecturer_id
+            or schedule.hall_ids[lesson] == hall_id
+        )
+    ]
+
+
+class _ConfigDiff:
+    """Tells whether a change of the config affects a previous lesson: its
+    lecturer could teach the subject but no longer can, or its hall fitted the
+    group but no longer does. Nothing has changed without the previous
+    parameters."""
+
+    def __init__(
+        self, parameters: Parameters, previous_parameters: Parameters | None
+    ) -> None:
+        self.parameters = parameters
+        self.previous = previous_parameters
+        if previous_parameters is not None:
+            self.lecturers = _name_entities(previous_parameters.lecturers)
+            self.halls = _name_entities(previous_parameters.halls)
+            self.groups = _name_entities(previous_parameters.groups)
+
+    def __call__(
+        self,
+        lesson: PreviousLesson,
+        subject_id: int,
+        lecturer_id: int,
+        hall_id: int,
+        group_id: int,
+    ) -> bool:
+        if self.previous is None:
+            return False
+
+        lecturer = self.lecturers.get(lesson.lecturer)
+        hall = self.halls.get(lesson.hall)
+        group = self.groups.get(lesson.group)
+        if lecturer is None or hall is None or group is None:
+            # Not from the previous config, nothing is known about them.
+            return True
+
+        parameters = self.parameters
+        could_teach = lesson.subject in map(str, lecturer.can_teach_subjects_names)
+        can_teach = parameters.subject_lecturer_masks[subject_id] >> lecturer_id & 1
+        fitted = hall.capacity >= group.capacity
+        fits = parameters.group_hall_masks[group_id] >> hall_id & 1
+
+        return (could_teach and not can_teach) or (fitted and not fits)
+
+
+def _name_entities(entities) -> dict[str, object]:
+    """Maps the names of entities to the first entity of every name, see
+    `_name_index`."""
+    index = {}
+    for entity in entities:
+        index.setdefault(str(entity), entity)
+    return index
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+import yaml
+
+from benchmarks.generate import generate_config
+from src.config import parse_config
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
+from src.parameters import EvolutionParameters, Parameters
+from src.selection import TournamentSelector
+
+
+def make_parameters(groups: int = 8, seed: int = 0, **kwargs) -> Parameters:
+    """Parses a small synthetic config, see `benchmarks.generate`."""
+    config = generate_config(groups=groups, seed=seed, **kwargs)
+    return parse_config(yaml.safe_dump(config).encode(), "<test config>")
+
+
+def make_evolution_params(**overrides) -> EvolutionParameters:
+    """Parameters of a short run with the default weights of the command line."""
+    evolution_params = EvolutionParameters(
+        population_size=12,
+        num_of_generations=6,
+        mut_prob=0.1,
+        hall_prob=0.2,
+        lecturer_prob=0.2,
+        time_slot_prob=0.2,
+        fitness_func=WeightedFitness(**DEFAULT_WEIGHTS),
+        selector_func=TournamentSelector(),
+        verbose=False,
+    )
+    return dataclasses.replace(evolution_params, **overrides)
+
+
+@pytest.fixture(scope="session")
+def parameters() -> Parameters:
+    return make_parameters()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+import yaml
+
+from benchmarks.generate import generate_config
+from src.cache import FitnessCache
+from src.checkpoint import Checkpoint, CheckpointError, load_checkpoint, save_checkpoint
+from src.config import parse_config
+from src.crossover import GroupBlockCrossover
+from src.genetic import GeneticSchedule
+from src.rng import RandomStream
+from src.schedule import Schedule
+from src.termination import EvolutionController
+from src.warm_start import WarmStart, genome_lessons
+from tests.conftest import make_evolution_params, make_parameters
+
+
+def cached_params(**overrides):
+    evolution_params = make_evolution_params(**overrides)
+    return dataclasses.replace(
+        evolution_params, fitness_func=FitnessCache(evolution_params.fitness_func)
+    )
+
+
+def test_round_trip(parameters, tmp_path):
+    rng = RandomStream(0)
+    evolution_params = cached_params()
+    population = [
+        Schedule.create_constructive_schedule(parameters, rng=rng) for _ in range(3)
+    ]
+    population[1] = Schedule.from_genome(parameters, population[1].to_genome())
+    controller = EvolutionController(evolution_params)
+    for individual in population:
+        evolution_params.fitness_func(individual)
+    controller.offer(population[0], evolution_params.fitness_func(population[0]))
+    rng.gauss(0, 1)
+
+    checkpoint = Checkpoint.capture(
+        3, population, controller, evolution_params.fitness_func, rng
+    )
+    file_path = str(tmp_path / "run.checkpoint")
+    save_checkpoint(checkpoint, file_path)
+
+    assert load_checkpoint(file_path) == checkpoint
+
+
+def test_corrupted_file_is_rejected(parameters, tmp_path):
+    file_path = tmp_path / "run.checkpoint"
+    file_path.write_bytes(b"GSCP" + bytes(10))
+
+    with pytest.raises(CheckpointError):
+        load_checkpoint(str(file_path))
+
+
+@pytest.mark.parametrize("with_crossover", [False, True])
+def test_resume_is_identical_to_uninterrupted_run(parameters, tmp_path, with_crossover):
+    checkpoint_path = str(tmp_path / "run.checkpoint")
+    overrides = {
+        "num_of_generations": 8,
+        "checkpoint_interval": 4,
+        "crossover_func": GroupBlockCrossover() if with_crossover else None,
+    }
+
+    uninterrupted = GeneticSchedule(parameters, rng=RandomStream(7)).evolve(
+        cached_params(checkpoint_path=checkpoint_path, **overrides)
+    )
+    checkpoint = load_checkpoint(checkpoint_path)
+    assert checkpoint.generation == 4
+
+    resumed = GeneticSchedule(parameters, rng=RandomStream(123)).evolve(
+        cached_params(**overrides), checkpoint=checkpoint
+    )
+
+    assert resumed.to_genome() == uninterrupted.to_genome()
+
+
+def save_run_checkpoint(parameters, file_path: str, **overrides) -> Schedule:
+    return GeneticSchedule(parameters, rng=RandomStream(7)).evolve(
+        cached_params(
+            num_of_generations=5,
+            checkpoint_interval=4,
+            checkpoint_path=file_path,
+            **overrides,
+        )
+    )
+
+
+def test_checkpoint_of_another_config_is_rejected(parameters, tmp_path):
+    file_path = str(tmp_path / "run.checkpoint")
+    save_run_checkpoint(parameters, file_path)
+
+    with pytest.raises(CheckpointError, match="another config"):
+        load_checkpoint(file_path, make_parameters(seed=1))
+    with pytest.raises(CheckpointError, match="another config"):
+        GeneticSchedule(make_parameters(seed=1)).evolve(
+            cached_params(), checkpoint=load_checkpoint(file_path)
+        )
+
+
+def test_checkpoint_of_another_population_size_is_rejected(parameters, tmp_path):
+    file_path = str(tmp_path / "run.checkpoint")
+    save_run_checkpoint(parameters, file_path)
+
+    load_checkpoint(file_path, parameters, population_size=12)
+    with pytest.raises(CheckpointError, match="12 schedules"):
+        load_checkpoint(file_path, parameters, population_size=20)
+
+
+def test_resumed_warm_start_keeps_its_mutable_lessons(parameters, tmp_path):
+    previous = GeneticSchedule(parameters, rng=RandomStream(0)).evolve(
+        make_evolution_params()
+    )
+    config = generate_config(groups=8, seed=0)
+    config["halls"].pop()
+    changed = parse_config(yaml.safe_dump(config).encode())
+    warm = WarmStart.build(
+        changed,
+        genome_lessons(parameters, previous.to_genome()),
+        RandomStream(0),
+        previous_parameters=parameters,
+    )
+    assert 0 < len(warm.mutable_lessons) < len(warm.schedule)
+
+    file_path = str(tmp_path / "run.checkpoint")
+    overrides = {"num_of_generations": 8, "checkpoint_interval": 4}
+    uninterrupted = GeneticSchedule(changed, rng=RandomStream(7)).evolve(
+        cached_params(
+            checkpoint_path=file_path, mutable_lessons=warm.mutable_lessons, **overrides
+        ),
+        initial_population=[warm.schedule.clone() for _ in range(12)],
+    )
+    checkpoint = load_checkpoint(file_path, changed)
+    assert checkpoint.mutable_lessons == warm.mutable_lessons
+
+    resumed = GeneticSchedule(changed, rng=RandomStream(123)).evolve(
+        cached_params(**overrides), checkpoint=checkpoint
+    )
+
+    assert resumed.to_genome() == uninterrupted.to_genome()
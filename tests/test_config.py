@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+import stat
+
+import pytest
+
+from src.config import ConfigError, load_config
+
+CONFIG = "assets/config.yaml"
+
+
+def test_cache_dir_is_created_private(tmp_path):
+    cache_dir = os.path.join(tmp_path, "configs")
+
+    parsed = load_config(CONFIG, cache_dir)
+
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+    assert len(os.listdir(cache_dir)) == 1
+    assert repr(load_config(CONFIG, cache_dir).groups) == repr(parsed.groups)
+
+
+def test_cache_dir_writable_by_others_is_refused(tmp_path):
+    cache_dir = os.path.join(tmp_path, "configs")
+    os.mkdir(cache_dir)
+    os.chmod(cache_dir, 0o777)
+
+    with pytest.raises(ConfigError, match="not writable by others"):
+        load_config(CONFIG, cache_dir)
+    assert os.listdir(cache_dir) == []
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+
+from src.crossover import CROSSOVERS
+from src.rng import RandomStream
+from src.schedule import Schedule
+
+
+def parents(parameters, seed: int) -> tuple[Schedule, Schedule]:
+    return tuple(
+        Schedule.create_constructive_schedule(parameters, rng=RandomStream(seed + i))
+        for i in range(2)
+    )
+
+
+@pytest.mark.parametrize("name", CROSSOVERS)
+@pytest.mark.parametrize("seed", range(5))
+def test_offspring_adds_no_clashes(parameters, name, seed):
+    parent, other_parent = parents(parameters, seed)
+    child = CROSSOVERS[name]()(parent, other_parent, RandomStream(seed))
+
+    assert child.count_conflicts() <= parent.count_conflicts()
+
+
+@pytest.mark.parametrize("name", CROSSOVERS)
+def test_unrepaired_offspring_is_a_clone(parameters, name, monkeypatch):
+    parent, other_parent = parents(parameters, 0)
+    monkeypatch.setattr(Schedule, "repair_clashes", lambda *args, **kwargs: 1)
+
+    child = CROSSOVERS[name](swap_prob=1.0)(parent, other_parent, RandomStream(0))
+
+    assert child is not parent
+    assert child.to_genome() == parent.to_genome()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import os
+
+import yaml
+
+from benchmarks.generate import generate_config
+from src.config import parse_config
+from src.io.export import export_results
+from src.rng import RandomStream
+from src.schedule import Schedule
+
+
+def test_per_entity_files_do_not_collide(tmp_path):
+    config = generate_config(groups=4, seed=0)
+    names = ["K 1", "K_1", "k_1", "K_1_1"]
+    for group, name in zip(config["groups"], names):
+        group["name"] = name
+    parameters = parse_config(yaml.safe_dump(config).encode())
+    schedule = Schedule.create_constructive_schedule(parameters, rng=RandomStream(0))
+
+    export_results(schedule, str(tmp_path), per_entity=True)
+
+    directory = os.path.join(tmp_path, "final_students_schedule")
+    exported = []
+    for file_name in os.listdir(directory):
+        with open(os.path.join(directory, file_name)) as file:
+            exported.extend(yaml.safe_load(file))
+    assert sorted(exported) == sorted(names)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from src import batch
+from src.cache import FitnessCache
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness, evaluate_population
+from src.parallel import construct_population
+from src.rng import RandomStream
+from src.schedule import Schedule
+
+
+@pytest.mark.skipif(not batch.is_available(), reason="NumPy is not installed.")
+def test_restored_individuals_are_scored_without_an_index(parameters):
+    population = construct_population(parameters, RandomStream(0).seeds(6))
+    fitness_func = FitnessCache(WeightedFitness(**DEFAULT_WEIGHTS))
+    expected = [fitness_func.fitness_func(individual) for individual in population]
+
+    restored = [
+        Schedule.from_genome(parameters, individual.to_genome())
+        for individual in population[:3]
+    ]
+    fitness_scores = evaluate_population(fitness_func, [*restored, *population[3:]])
+
+    assert fitness_scores == pytest.approx(expected)
+    assert not any(individual.is_indexed() for individual in restored)
+    assert fitness_func.get(restored[0].genome_hash()) == fitness_scores[0]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import dataclasses
+
+from src.cache import FitnessCache
+from src.genetic import GeneticSchedule
+from src.parallel import PopulationExecutor, construct_population
+from src.rng import RandomStream
+from tests.conftest import make_evolution_params
+from tests.test_schedule import assert_totals_equal, rebuilt
+
+
+def test_construct_population_does_not_depend_on_workers(parameters):
+    seeds = RandomStream(0).seeds(6)
+    serial = construct_population(parameters, seeds)
+    pooled = construct_population(parameters, seeds, num_workers=2)
+
+    assert [s.to_genome() for s in serial] == [s.to_genome() for s in pooled]
+    assert [s.genome_hash() for s in serial] == [s.genome_hash() for s in pooled]
+
+
+def run(parameters, num_workers: int, seed: int = 3):
+    evolution_params = make_evolution_params(num_workers=num_workers)
+    evolution_params = dataclasses.replace(
+        evolution_params, fitness_func=FitnessCache(evolution_params.fitness_func)
+    )
+    best = GeneticSchedule(parameters, rng=RandomStream(seed)).evolve(evolution_params)
+    return best.to_genome(), evolution_params.fitness_func(best)
+
+
+def test_evolution_does_not_depend_on_workers(parameters):
+    assert run(parameters, 1) == run(parameters, 2)
+
+
+def test_seed_changes_the_run(parameters):
+    assert run(parameters, 1, seed=3) != run(parameters, 1, seed=4)
+
+
+def test_pool_keeps_the_running_totals(parameters):
+    rng = RandomStream(0)
+    population = construct_population(parameters, rng.seeds(4))
+    with PopulationExecutor(
+        parameters, make_evolution_params(num_workers=2)
+    ) as executor:
+        population, _ = executor.mutate_and_score(population, rng.seeds(4))
+
+    for individual in population:
+        assert individual.is_indexed()
+        assert individual.genome_hash() == rebuilt(individual).genome_hash()
+        assert_totals_equal(individual, rebuilt(individual))
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+import yaml
+
+from src import batch
+from src.config import parse_config
+from src.rng import RandomStream
+from src.schedule import Schedule
+from tests.conftest import make_evolution_params
+
+
+def rebuilt(schedule: Schedule) -> Schedule:
+    """The same grid with the index and the totals built from scratch."""
+    return Schedule.from_genome(schedule.parameters, schedule.to_genome())
+
+
+def totals(schedule: Schedule) -> tuple:
+    return (
+        schedule.count_total_windows(),
+        schedule.count_total_lecturer_windows(),
+        schedule.count_total_non_profile_slots(),
+        schedule.count_capacity_overflows(),
+        schedule.count_conflicts(),
+        schedule.count_time_slot_lessons(),
+    )
+
+
+def assert_totals_equal(schedule: Schedule, expected: Schedule) -> None:
+    *counts, overflow, conflicts, time_slot_counts = totals(schedule)
+    *expected_counts, expected_overflow, expected_conflicts, expected_slots = totals(
+        expected
+    )
+    assert counts == expected_counts
+    assert overflow == pytest.approx(expected_overflow)
+    assert conflicts == expected_conflicts
+    assert time_slot_counts == expected_slots
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_totals_match_rebuild(parameters, seed):
+    rng = RandomStream(seed)
+    schedule = Schedule.create_constructive_schedule(parameters, rng=rng)
+    evolution_params = make_evolution_params(mut_prob=0.3, time_slot_prob=0.5)
+
+    for _ in range(20):
+        schedule.mutate(evolution_params, rng=rng)
+        assert_totals_equal(schedule, rebuilt(schedule))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_totals_match_batch_kernel(parameters, seed):
+    if not batch.is_available():
+        pytest.skip("NumPy is not installed.")
+
+    rng = RandomStream(seed)
+    population = [
+        Schedule.create_constructive_schedule(parameters, rng=rng) for _ in range(4)
+    ]
+    evolution_params = make_evolution_params(mut_prob=0.5, time_slot_prob=0.8)
+    for schedule in population:
+        for _ in range(5):
+            schedule.mutate(evolution_params, rng=rng)
+
+    penalties = batch.population_penalties(parameters, population)
+    for schedule, row in zip(population, penalties.tolist()):
+        lesson_counts = schedule.count_time_slot_lessons()
+        assert row == pytest.approx(
+            [
+                schedule.count_total_windows(),
+                schedule.count_total_lecturer_windows(),
+                schedule.count_total_non_profile_slots(),
+                schedule.count_capacity_overflows(),
+                max(lesson_counts) - min(lesson_counts),
+                schedule.count_conflicts(),
+            ]
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_genome_hash_matches_rebuild(parameters, seed):
+    rng = RandomStream(seed)
+    schedule = Schedule.create_constructive_schedule(parameters, rng=rng)
+    evolution_params = make_evolution_params(mut_prob=0.3)
+    hashes = {schedule.genome_hash()}
+
+    for _ in range(10):
+        schedule.mutate(evolution_params, rng=rng)
+        assert schedule.genome_hash() == rebuilt(schedule).genome_hash()
+        hashes.add(schedule.genome_hash())
+
+    assert len(hashes) > 1
+
+
+def test_genome_hash_ignores_mutation_order(parameters):
+    schedule = Schedule.create_constructive_schedule(parameters, rng=RandomStream(0))
+    other = schedule.clone()
+    lesson, other_lesson = 0, len(schedule) - 1
+
+    schedule._assign(lesson, hall_id=0)
+    schedule._assign(other_lesson, lecturer_id=0)
+    other._assign(other_lesson, lecturer_id=0)
+    other._assign(lesson, hall_id=0)
+
+    assert schedule.genome_hash() == other.genome_hash()
+    assert schedule.to_genome() == other.to_genome()
+
+
+def test_clone_is_independent(parameters):
+    schedule = Schedule.create_constructive_schedule(parameters, rng=RandomStream(0))
+    clone = schedule.clone()
+    clone.mutate(make_evolution_params(mut_prob=1.0), rng=RandomStream(1))
+
+    assert_totals_equal(schedule, rebuilt(schedule))
+    assert_totals_equal(clone, rebuilt(clone))
+    assert schedule.genome_hash() == rebuilt(schedule).genome_hash()
+
+
+def penalty_change(schedule: Schedule, move: str, *args) -> tuple:
+    """Change of the penalties made by calling the `move` method, measured on
+    schedules rebuilt from scratch."""
+    before = rebuilt(schedule)
+    getattr(schedule, move)(*args)
+    after = rebuilt(schedule)
+    return (
+        after.count_total_windows() - before.count_total_windows(),
+        after.count_total_lecturer_windows() - before.count_total_lecturer_windows(),
+        after.count_total_non_profile_slots() - before.count_total_non_profile_slots(),
+        after.count_capacity_overflows() - before.count_capacity_overflows(),
+    )
+
+
+def assert_delta(delta, change) -> None:
+    assert delta[:3] == change[:3]
+    assert math.isclose(delta[3], change[3], abs_tol=1e-9)
+
+
+def clash_free(schedule: Schedule) -> list[int]:
+    return [
+        lesson for lesson in range(len(schedule)) if not any(schedule.clashes(lesson))
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_time_slot_swap_delta(parameters, seed):
+    rng = RandomStream(seed)
+    schedule = Schedule.create_constructive_schedule(parameters, rng=rng)
+    lessons = clash_free(schedule)
+    checked = 0
+
+    for _ in range(200):
+        lesson = rng.choice(lessons)
+        group_lessons = [
+            other
+            for other in lessons
+            if schedule.group_ids[other] == schedule.group_ids[lesson]
+            and other != lesson
+        ]
+        if not group_lessons:
+            continue
+        other = rng.choice(group_lessons)
+
+        delta = schedule.time_slot_swap_delta(lesson, other)
+        if delta is None:
+            continue
+        change = penalty_change(schedule, "swap_time_slots", lesson, other)
+        assert_delta(delta, change)
+        assert not any(schedule.clashes(lesson)) and not any(schedule.clashes(other))
+        checked += 1
+
+    assert checked
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_hall_swap_delta(parameters, seed):
+    rng = RandomStream(seed)
+    schedule = Schedule.create_constructive_schedule(parameters, rng=rng)
+    checked = 0
+
+    for _ in range(200):
+        lesson = rng.randrange(len(schedule))
+        time_slot_id = schedule.time_slot_ids[lesson]
+        others = [
+            other
+            for other in range(len(schedule))
+            if schedule.time_slot_ids[other] == time_slot_id and other != lesson
+        ]
+        if not others:
+            continue
+        other = rng.choice(others)
+
+        delta = schedule.hall_swap_delta(lesson, other)
+        if delta is None:
+            continue
+        change = penalty_change(schedule, "swap_halls", lesson, other)
+        assert_delta(delta, change)
+        checked += 1
+
+    assert checked
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_lecturer_delta(parameters, seed):
+    rng = RandomStream(seed)
+    schedule = Schedule.create_constructive_schedule(parameters, rng=rng)
+    checked = 0
+
+    for _ in range(200):
+        lesson = rng.randrange(len(schedule))
+        lecturer_id = rng.randrange(len(parameters.lecturers))
+
+        delta = schedule.lecturer_delta(lesson, lecturer_id)
+        if delta is None:
+            continue
+        change = penalty_change(schedule, "reassign_lecturer", lesson, lecturer_id)
+        assert_delta(delta, change)
+        checked += 1
+
+    assert checked
+
+
+def test_repair_clashes_resolves_copied_lessons(parameters):
+    rng = RandomStream(0)
+    schedule = Schedule.create_constructive_schedule(parameters, rng=rng)
+    other = Schedule.create_constructive_schedule(parameters, rng=rng)
+    lessons = list(range(0, len(schedule), 3))
+
+    schedule.copy_lessons(other, lessons)
+    unresolved = schedule.repair_clashes(lessons, rng=rng)
+
+    assert unresolved == sum(any(schedule.clashes(lesson)) for lesson in lessons)
+    assert_totals_equal(schedule, rebuilt(schedule))
+
+
+def test_constructive_schedules_share_lesson_order(parameters):
+    population = [
+        Schedule.create_constructive_schedule(parameters, rng=RandomStream(seed))
+        for seed in range(4)
+    ]
+
+    assert batch.can_stack(population)
+    for schedule in population:
+        assert list(zip(schedule.group_ids, schedule.subject_ids)) == (
+            parameters.required_lessons()
+        )
+
+
+OVERBOOKED_CONFIG = {
+    "time_slots": [{"day": "Monday", "time": time} for time in (1, 2, 3)],
+    "subjects": [{"name": "Long", "hours": 3}, {"name": "Short", "hours": 1}],
+    "groups": [
+        {"name": "A", "capacity": 10, "subject_names": ["Long"]},
+        {"name": "B", "capacity": 10, "subject_names": ["Short"]},
+    ],
+    "lecturers": [{"name": "L", "can_teach_subjects_names": ["Long", "Short"]}],
+    "halls": [{"name": "H", "capacity": 10}],
+}
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_lessons_placed_with_clashes_are_repaired(seed, monkeypatch):
+    parameters = parse_config(yaml.safe_dump(OVERBOOKED_CONFIG).encode())
+    repaired = []
+    repair_clashes = Schedule.repair_clashes
+
+    def recording_repair(schedule, lessons, *args, **kwargs):
+        repaired.extend(any(schedule.clashes(lesson)) for lesson in lessons)
+        return repair_clashes(schedule, lessons, *args, **kwargs)
+
+    monkeypatch.setattr(Schedule, "repair_clashes", recording_repair)
+    with pytest.warns(RuntimeWarning, match="could not be placed"):
+        schedule = Schedule.create_constructive_schedule(
+            parameters, rng=RandomStream(seed)
+        )
+
+    assert repaired and all(repaired)
+    assert schedule.count_conflicts() == 2
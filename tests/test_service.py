@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from src.crossover import DayCrossover
+from src.service import JobSpec
+
+CONFIG = "time_slots: []"
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"population_size": "10"},
+        {"population_size": True},
+        {"mut_prob": None},
+        {"max_wall_time": "60"},
+        {"weights": {"conflict_weight": "50"}},
+        {"weights": [1, 2]},
+        {"selector": "best"},
+        {"crossover": "uniform"},
+        {"generations": 10},
+    ],
+)
+def test_invalid_job_is_rejected(fields):
+    with pytest.raises(ValueError):
+        JobSpec.from_json({"config": CONFIG, **fields})
+
+
+def test_job_fields_reach_the_evolution():
+    spec = JobSpec.from_json(
+        {
+            "config": CONFIG,
+            "population_size": 10,
+            "mut_prob": 1,
+            "max_wall_time": None,
+            "crossover": "day",
+            "crossover_prob": 0.5,
+            "weights": {"conflict_weight": 10},
+        }
+    )
+    evolution_params = spec.evolution_parameters()
+
+    assert evolution_params.population_size == 10
+    assert isinstance(evolution_params.crossover_func, DayCrossover)
+    assert evolution_params.crossover_prob == 0.5
+    assert evolution_params.fitness_func.fitness_func.conflict_weight == 10
+    assert (
+        JobSpec.from_json({"config": CONFIG}).evolution_parameters().crossover_func
+        is None
+    )
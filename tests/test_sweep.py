@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.crossover import DayCrossover
+from src.fitness import DEFAULT_WEIGHTS, WeightedFitness
+from src.sweep import Range, SearchSpace, SuccessiveHalving, run_sweep, trial_parameters
+from tests.conftest import make_evolution_params
+
+
+def test_space_chooses_the_crossover():
+    space = SearchSpace({"crossover": [None, "day"], "crossover_prob": [0.5]})
+    base = make_evolution_params()
+
+    operators = [
+        trial_parameters(base, values, 1).crossover_func
+        for values in space.trials(None)
+    ]
+
+    assert operators[0] is None
+    assert isinstance(operators[1], DayCrossover)
+
+
+@pytest.mark.parametrize("crossovers", [["uniform"], Range(0, 1)])
+def test_unknown_crossover_is_rejected(crossovers):
+    with pytest.raises(ValueError, match="Crossovers"):
+        SearchSpace({"crossover": crossovers})
+
+
+def test_crossover_prob_without_operator_is_rejected(parameters):
+    space = SearchSpace({"crossover_prob": [0.2, 0.8]})
+
+    with pytest.raises(ValueError, match="no effect"):
+        run_sweep(
+            parameters,
+            make_evolution_params(),
+            space.trials(None),
+            WeightedFitness(**DEFAULT_WEIGHTS),
+            halving=SuccessiveHalving(1, 1),
+        )
+
+
+@pytest.mark.parametrize("search", ["grid", "random"])
+def test_range_values_follow_the_field_type(search):
+    space = SearchSpace(
+        {
+            "mut_prob": Range(0, 1, num=5),
+            "population_size": Range(10.0, 20.0, num=3),
+        },
+        search=search,
+        samples=10,
+    )
+
+    trials = space.trials(random.Random(0))
+
+    assert len({trial["mut_prob"] for trial in trials}) > 2
+    assert all(type(trial["mut_prob"]) is float for trial in trials)
+    assert all(type(trial["population_size"]) is int for trial in trials)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+import yaml
+
+from benchmarks.generate import generate_config
+from src.config import parse_config
+from src.genetic import GeneticSchedule
+from src.io.yaml import save_results
+from src.rng import RandomStream
+from src.warm_start import WarmStart, genome_lessons, load_result_lessons
+from tests.conftest import make_evolution_params
+
+
+def evolve(parameters, seed: int = 0):
+    return GeneticSchedule(parameters, rng=RandomStream(seed)).evolve(
+        make_evolution_params()
+    )
+
+
+def warm_evolve(parameters, warm: WarmStart):
+    evolution_params = make_evolution_params(mutable_lessons=warm.mutable_lessons)
+    return GeneticSchedule(parameters, rng=RandomStream(1)).evolve(
+        evolution_params,
+        initial_population=[
+            warm.schedule.clone() for _ in range(evolution_params.population_size)
+        ],
+    )
+
+
+def test_identical_config_moves_nothing(parameters):
+    previous = evolve(parameters)
+    warm = WarmStart.build(
+        parameters,
+        genome_lessons(parameters, previous.to_genome()),
+        RandomStream(0),
+        previous_parameters=parameters,
+    )
+
+    assert (warm.kept, warm.placed, warm.displaced, warm.removed) == (
+        len(previous),
+        0,
+        0,
+        0,
+    )
+    assert warm.mutable_lessons == []
+    assert warm.count_moved(warm_evolve(parameters, warm)) == 0
+
+
+def test_identical_config_from_saved_results(parameters, tmp_path):
+    previous = evolve(parameters)
+    save_results(previous, str(tmp_path))
+    lessons = load_result_lessons(os.path.join(tmp_path, "final_halls_schedule.yaml"))
+
+    warm = WarmStart.build(parameters, lessons, RandomStream(0))
+
+    assert warm.placed == 0
+    assert warm.count_moved(warm_evolve(parameters, warm)) == 0
+
+
+def test_changed_config_only_frees_affected_lessons(parameters):
+    previous = evolve(parameters)
+    config = generate_config(groups=8, seed=0)
+    removed_hall = config["halls"].pop()["name"]
+    changed = parse_config(yaml.safe_dump(config).encode())
+
+    warm = WarmStart.build(
+        changed,
+        genome_lessons(parameters, previous.to_genome()),
+        RandomStream(0),
+        previous_parameters=parameters,
+    )
+
+    in_removed_hall = sum(
+        str(parameters.halls[hall_id]) == removed_hall for hall_id in previous.hall_ids
+    )
+    assert warm.displaced == in_removed_hall
+    assert warm.placed == in_removed_hall
+    assert warm.kept + warm.placed == len(warm.schedule)
+    assert len(warm.mutable_lessons) < len(warm.schedule) // 2
+    assert set(range(warm.kept, len(warm.schedule))) <= set(warm.mutable_lessons)
+
+
+def test_lost_qualification_displaces_the_lesson(parameters):
+    previous = evolve(parameters)
+    lesson = next(
+        lesson
+        for lesson in range(len(previous))
+        if previous.subject_ids[lesson]
+        in parameters.lecturer_subject_ids[previous.lecturer_ids[lesson]]
+    )
+    lecturer = parameters.lecturers[previous.lecturer_ids[lesson]]
+    subject = parameters.subjects[previous.subject_ids[lesson]]
+
+    config = generate_config(groups=8, seed=0)
+    for entry in config["lecturers"]:
+        if entry["name"] == lecturer.name:
+            entry["can_teach_subjects_names"] = [
+                name
+                for name in entry["can_teach_subjects_names"]
+                if name != subject.name
+            ]
+    changed = parse_config(yaml.safe_dump(config).encode())
+
+    previous_lessons = genome_lessons(parameters, previous.to_genome())
+    without_diff = WarmStart.build(changed, previous_lessons, RandomStream(0))
+    with_diff = WarmStart.build(
+        changed, previous_lessons, RandomStream(0), previous_parameters=parameters
+    )
+
+    assert without_diff.displaced == 0
+    taught = sum(
+        lecturer_id == lecturer.id and subject_id == subject.id
+        for lecturer_id, subject_id in zip(previous.lecturer_ids, previous.subject_ids)
+    )
+    assert with_diff.displaced == taught
+    assert with_diff.placed == taught
+
+
+@pytest.mark.parametrize(
+    ("file_name", "contents"),
+    [
+        ("missing.yaml", None),
+        ("missing.genome", None),
+        ("invalid.yaml", "a: [b"),
+        ("list.yaml", "- 1\n- 2\n"),
+        ("short.genome", "abc"),
+    ],
+)
+def test_cli_rejects_bad_warm_start(tmp_path, file_name, contents):
+    warm_start = os.path.join(tmp_path, file_name)
+    if contents is not None:
+        with open(warm_start, "w") as file:
+            file.write(contents)
+
+    process = subprocess.run(
+        [
+            sys.executable,
+            "main.py",
+            "--metrics",
+            "none",
+            "--warm-start",
+            warm_start,
+            "--previous-config",
+            "assets/config.yaml",
+            "-o",
+            str(tmp_path),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+    assert process.returncode == 1
+    assert process.stderr.startswith("Error: ")
+    assert "Traceback" not in process.stderr